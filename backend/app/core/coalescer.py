@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Batch:
+    """Merged fields of the writes to one key that will be flushed together."""
+    
+    __slots__ = ("fields", "previous", "done", "result", "error", "timer")
+    
+    def __init__(self, fields: dict, previous: Optional["_Batch"]):
+        self.fields = fields
+        # The key's preceding batch, flushed first so writes land in order
+        self.previous = previous
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.timer: Optional[threading.Timer] = None
+
+
+class WriteCoalescer(Generic[T]):
+    """
+    Per-worker merging of bursts of partial updates to the same key.
+    
+    The first write to a key opens a batch and later writes within
+    `window_seconds` merge into it, last writer wins per field; the batch
+    is then flushed once. With `run`, every caller blocks until the flush
+    has committed and gets its result. With `defer`, callers return at
+    once with the merged fields and the flush happens when the window
+    closes (or on `flush` or `close`), so an acknowledged write can still
+    fail or be lost if the worker dies within the window.
+    """
+    
+    def __init__(self, window_seconds: float, flush: Callable[[Hashable, dict], T]):
+        self.window_seconds = window_seconds
+        self._flush_fields = flush
+        self._open: Dict[Hashable, _Batch] = {}
+        self._last: Dict[Hashable, _Batch] = {}
+        self._lock = threading.Lock()
+    
+    def _join(self, key: Hashable, fields: dict) -> "tuple[_Batch, bool, dict]":
+        """Merge into the key's open batch, or open one. Returns (batch, opened, merged fields)."""
+        with self._lock:
+            batch = self._open.get(key)
+            opened = batch is None
+            if opened:
+                batch = self._open[key] = self._last[key] = _Batch(dict(fields), self._last.get(key))
+            else:
+                batch.fields.update(fields)
+            return batch, opened, dict(batch.fields)
+    
+    def run(self, key: Hashable, fields: dict) -> T:
+        """Merge a write and wait until its batch is committed; returns the flush result."""
+        batch, opened, _ = self._join(key, fields)
+        if opened:
+            time.sleep(self.window_seconds)
+            self._flush(key, batch)
+        else:
+            batch.done.wait()
+        
+        if batch.error is not None:
+            raise batch.error
+        return batch.result
+    
+    def defer(self, key: Hashable, fields: dict) -> dict:
+        """Merge a write to be flushed when the window closes; returns the merged fields."""
+        batch, opened, merged = self._join(key, fields)
+        if opened:
+            batch.timer = threading.Timer(self.window_seconds, self._flush_deferred, args=(key, batch))
+            batch.timer.daemon = True
+            batch.timer.start()
+        return merged
+    
+    def flush(self, key: Hashable):
+        """Flush the key's open batch now, if any, and wait until the key's writes have landed."""
+        with self._lock:
+            batch = self._last.get(key)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+            self._flush_deferred(key, batch)
+        else:
+            self._flush(key, batch)
+    
+    def close(self):
+        """Flush every open batch now, e.g. on shutdown."""
+        with self._lock:
+            pending = list(self._open.items())
+        for key, batch in pending:
+            if batch.timer is not None:
+                batch.timer.cancel()
+            self._flush_deferred(key, batch)
+    
+    def _flush_deferred(self, key: Hashable, batch: _Batch):
+        self._flush(key, batch)
+        if batch.error is not None:
+            logger.error("Deferred flush of %s failed: %r", key, batch.error)
+    
+    def _flush(self, key: Hashable, batch: _Batch):
+        with self._lock:
+            flushing = self._open.get(key) is batch
+            if flushing:
+                del self._open[key]
+        if not flushing:
+            # Already being flushed (a timer racing close); wait for it
+            batch.done.wait()
+            return
+        
+        if batch.previous is not None:
+            batch.previous.done.wait()
+            batch.previous = None
+        try:
+            batch.result = self._flush_fields(key, batch.fields)
+        except Exception as exc:
+            batch.error = exc
+        finally:
+            with self._lock:
+                if self._last.get(key) is batch:
+                    del self._last[key]
+            batch.done.set()
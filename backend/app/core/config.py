@@ -1,22 +1,124 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
-    # Server
+    # Server (`python -m app`)
+    host: str = "0.0.0.0"
     port: int = 5000
+    workers: int = 0  # 0 = one per available CPU
+    threadpool_size: int = 40
+    keep_alive_seconds: int = 5
+    max_requests: int = 0  # recycle a worker after this many requests, 0 = never
+    max_requests_jitter: int = 0
+    graceful_shutdown_seconds: int = 30
+    backlog: int = 2048
+    access_log: bool = True
     
     # Database
     database_url: str
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    tasks_partition_count: int = 0
+    
+    # Embedded SQLite mode (DATABASE_URL=sqlite:///path/to/app.db)
+    sqlite_synchronous: str = "NORMAL"  # with WAL, durable except for the last commits on power loss
+    sqlite_mmap_size: int = 268435456  # bytes of the file read through mmap
+    sqlite_cache_size_kb: int = 65536  # page cache per connection
+    sqlite_busy_timeout_ms: int = 5000
     
     # JWT
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     jwt_expiration_days: int = 7
     
+    # Password hashing (tune with `python -m scripts.calibrate_password_hash`)
+    password_hash_scheme: str = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    
     # CORS
     frontend_url: str = "http://localhost:5173"
     
+    # Bootstrap
+    bootstrap_task_limit: int = 50
+    
+    # Response compression
+    compression_minimum_size: int = 1024
+    compression_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # Manual task ordering: columns holding longer order keys get rebalanced
+    order_key_rebalance_length: int = 32
+    
+    # Subtasks and dependencies
+    task_max_depth: int = 5  # nesting levels below a top-level task
+    task_max_children: int = 200  # subtasks per task
+    task_max_dependencies: int = 50  # blockers per task
+    task_dependency_max_depth: int = 100  # longest blocker chain that graph queries follow
+    
+    # Task analytics (rollups of task_events by scripts/rollup_task_events.py)
+    analytics_rollup_lookback_days: int = 1  # days before the watermark recomputed on each run
+    analytics_default_days: int = 30
+    analytics_max_days: int = 366
+    
+    # Archival of completed tasks
+    archive_after_days: int = 30
+    archive_batch_size: int = 1000
+    
+    # Coalescing of bursts of PUT /tasks/{id} (per worker): "off", "sync"
+    # (respond after the merged commit) or "ack" (respond 202, commit when
+    # the window closes)
+    task_update_coalescing: Literal["off", "sync", "ack"] = "off"
+    task_update_coalesce_window_ms: int = 50
+    
+    # Project membership cache (per worker): users whose access is kept
+    # between requests
+    permission_cache_max_entries: int = 10000
+    
+    # Idempotency keys for create endpoints (per worker)
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 10000
+    idempotency_wait_timeout_seconds: float = 30.0
+    
+    # Bulk task import
+    import_max_bytes: int = 100 * 1024 * 1024
+    import_spool_memory_bytes: int = 1024 * 1024
+    import_chunk_size: int = 5000
+    import_max_errors: int = 100
+    
+    # POST /batch
+    batch_max_operations: int = 100
+    
+    # Slow query log (per worker)
+    query_log_enabled: bool = True
+    slow_query_threshold_ms: float = 200.0
+    slow_query_explain_sample_rate: float = 0.0
+    query_stats_max_entries: int = 500
+    
+    # Request tracing (per worker): exporter "none", "jsonl" or "otlp"; requests
+    # with a sampled traceparent are always traced, others at the sample rate
+    tracing_exporter: str = "none"
+    tracing_sample_rate: float = 0.0
+    tracing_service_name: str = "taskmanager-api"
+    tracing_jsonl_path: str = "traces-{pid}.jsonl"
+    tracing_jsonl_max_bytes: int = 100 * 1024 * 1024
+    tracing_jsonl_backup_count: int = 5
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_queue_size: int = 10000
+    tracing_export_batch_size: int = 512
+    
+    # Admin endpoints: comma-separated list of user emails
+    admin_emails: str = ""
+    
+    # Sync
+    sync_overlap_seconds: int = 5
+    sync_tombstone_retention_days: int = 30
+    sync_compaction_interval_minutes: int = 60
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
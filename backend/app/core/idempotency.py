@@ -0,0 +1,163 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, TypeVar
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+
+from .config import settings
+
+T = TypeVar("T")
+
+MAX_KEY_LENGTH = 255
+
+
+class _Entry:
+    """A stored response, or a request still in flight, for one idempotency key."""
+    
+    __slots__ = ("fingerprint", "done", "response", "expires_at")
+    
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.response = None
+        self.expires_at: Optional[float] = None
+
+
+class IdempotencyStore:
+    """
+    Bounded, per-worker map of idempotency key -> stored response.
+    
+    The first request for a key runs the operation; repeats within the TTL
+    get the stored response without running it again. Repeats that arrive
+    while the first is still running wait for it instead of racing it.
+    Failed operations are not stored, so a retry after an error runs again.
+    Past capacity, the least recently used stored response is evicted; keys
+    still in flight never are, so a retry cannot run the operation twice.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: int, wait_timeout_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        # Every key, least recently used first
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # Keys with a stored response, soonest to expire first (the TTL is fixed)
+        self._expiring: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def run(self, key: Hashable, fingerprint: str, operation: Callable[[], T]) -> "tuple[T, bool]":
+        """Run `operation` once per key. Returns (response, replayed)."""
+        while True:
+            with self._lock:
+                self._purge_expired(time.monotonic())
+                entry = self._entries.get(key)
+                owner = entry is None
+                if owner:
+                    self._evict_for_insert()
+                    entry = self._entries[key] = _Entry(fingerprint)
+                else:
+                    self._entries.move_to_end(key)
+            
+            if owner:
+                return self._run_owner(key, entry, operation), False
+            
+            if entry.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            if not entry.done.wait(self.wait_timeout_seconds):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress"
+                )
+            if entry.response is not None:
+                return entry.response, True
+            # The first attempt failed and released the key; try again
+    
+    def _run_owner(self, key: Hashable, entry: _Entry, operation: Callable[[], T]) -> T:
+        try:
+            response = operation()
+        except BaseException:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry.done.set()
+            raise
+        
+        with self._lock:
+            entry.response = response
+            entry.expires_at = time.monotonic() + self.ttl_seconds
+            if self._entries.get(key) is entry:
+                self._expiring[key] = entry
+        entry.done.set()
+        return response
+    
+    def _purge_expired(self, now: float):
+        """Drop every expired entry. Caller holds the lock."""
+        while self._expiring:
+            key, entry = next(iter(self._expiring.items()))
+            if entry.expires_at > now:
+                break
+            del self._expiring[key]
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+    
+    def _evict_for_insert(self):
+        """
+        Make room for a new key by dropping the least recently used stored
+        responses. Raises 503 if every key is still in flight. Caller holds
+        the lock.
+        """
+        while len(self._entries) >= self.max_entries:
+            victim = next((key for key, entry in self._entries.items() if entry.expires_at is not None), None)
+            if victim is None:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many requests with an Idempotency-Key are in progress",
+                    headers={"Retry-After": "1"}
+                )
+            del self._entries[victim]
+            del self._expiring[victim]
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.idempotency_max_entries,
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    wait_timeout_seconds=settings.idempotency_wait_timeout_seconds
+)
+
+
+def run_idempotent(
+    response: Response,
+    idempotency_key: Optional[str],
+    user_id,
+    operation_name: str,
+    payload: BaseModel,
+    operation: Callable[[], T]
+) -> T:
+    """
+    Run a create operation honoring an optional Idempotency-Key header.
+    Keys are scoped per user and per operation; replayed responses are
+    marked with an `Idempotent-Replayed: true` header.
+    """
+    if idempotency_key is None:
+        return operation()
+    
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"
+        )
+    
+    fingerprint = hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+    result, replayed = idempotency_store.run(
+        (str(user_id), operation_name, idempotency_key),
+        fingerprint,
+        operation
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
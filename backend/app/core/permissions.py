@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Set
+from uuid import UUID
+
+from app.db.models import ProjectRole, PROJECT_ROLE_CODES
+
+from .config import settings
+
+
+class ProjectAccess:
+    """The projects a user is a member of, with their role and owner in each."""
+    
+    __slots__ = ("roles", "owners")
+    
+    def __init__(self, roles: Dict[UUID, ProjectRole], owners: Dict[UUID, UUID]):
+        self.roles = roles
+        self.owners = owners
+    
+    @property
+    def project_ids(self) -> List[UUID]:
+        return list(self.roles)
+    
+    @property
+    def owner_ids(self) -> Set[UUID]:
+        """Owners of the projects, i.e. the tenants whose tasks the user can see."""
+        return set(self.owners.values())
+    
+    def allows(self, project_id: UUID, role: ProjectRole) -> bool:
+        granted = self.roles.get(project_id)
+        return granted is not None and PROJECT_ROLE_CODES[granted] >= PROJECT_ROLE_CODES[role]
+
+
+class PermissionCache:
+    """
+    Bounded, per-worker map of user id -> project access.
+    
+    Entries are tagged with the `permissions_version` of the user row they
+    were loaded for. Every membership change bumps the affected users'
+    version in the same transaction, and the user row is loaded on each
+    request anyway, so a stale entry is detected without an extra query -
+    in every worker, not only the one that made the change.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple[int, ProjectAccess]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, user_id: Hashable, version: int) -> Optional[ProjectAccess]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+    
+    def put(self, user_id: Hashable, version: int, access: ProjectAccess):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > version:
+                # A concurrent request already loaded a newer membership
+                return
+            self._entries[user_id] = (version, access)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def discard(self, user_id: Hashable):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+permission_cache = PermissionCache(max_entries=settings.permission_cache_max_entries)
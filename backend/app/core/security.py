@@ -1,15 +1,66 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from .config import settings
+from passlib.exc import MissingBackendError
+from .config import Settings, settings
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+try:
+    import argon2  # noqa: F401
+    ARGON2_AVAILABLE = True
+except ImportError:  # argon2-cffi is optional; bcrypt needs nothing extra
+    ARGON2_AVAILABLE = False
+
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+
+def build_password_context(config: Settings) -> CryptContext:
+    """
+    Build the password hashing context from settings.
+    New hashes use `password_hash_scheme` with the configured cost. Hashes
+    made with another scheme or cost still verify but are flagged for rehash,
+    because min and max rounds are pinned to the configured value.
+    Fails here, at startup, if the configured scheme has no backend
+    installed, rather than on every signup and login.
+    """
+    if config.password_hash_scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"password_hash_scheme must be one of {', '.join(PASSWORD_SCHEMES)}")
+    
+    schemes = [config.password_hash_scheme] + [
+        scheme for scheme in PASSWORD_SCHEMES
+        if scheme != config.password_hash_scheme and (scheme != "argon2" or ARGON2_AVAILABLE)
+    ]
+    context = CryptContext(
+        schemes=schemes,
+        default=config.password_hash_scheme,
+        deprecated=schemes[1:],
+        bcrypt__default_rounds=config.bcrypt_rounds,
+        bcrypt__min_rounds=config.bcrypt_rounds,
+        bcrypt__max_rounds=config.bcrypt_rounds,
+        argon2__default_rounds=config.argon2_time_cost,
+        argon2__min_rounds=config.argon2_time_cost,
+        argon2__max_rounds=config.argon2_time_cost,
+        argon2__memory_cost=config.argon2_memory_cost,
+        argon2__parallelism=config.argon2_parallelism
+    )
+    try:
+        # Loads (and self-tests) the backend without hashing at full cost
+        context.handler(config.password_hash_scheme).get_backend()
+    except MissingBackendError as exc:
+        package = "argon2-cffi" if config.password_hash_scheme == "argon2" else "bcrypt"
+        raise RuntimeError(
+            f"PASSWORD_HASH_SCHEME={config.password_hash_scheme} needs the {package} package "
+            f"(pip install {package}): {exc}"
+        ) from exc
+    return context
+
+
+# Password hashing context (bcrypt by default, cost from settings)
+pwd_context = build_password_context(settings)
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
+    """Hash a password with the configured scheme and cost."""
     return pwd_context.hash(password)
 
 
@@ -18,6 +69,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password against its hash. When it matches but the hash uses an
+    outdated scheme or cost, also return a fresh hash to store in its place.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     if expires_delta:
@@ -0,0 +1,374 @@
+"""
+Lightweight per-request span tracing.
+
+TracingMiddleware opens a root span per sampled request, continuing the
+trace of an incoming W3C `traceparent` header and returning the trace in
+the response's `traceparent` header. `span()` opens a child of the
+current span; with no sampled span in context it returns a shared no-op,
+so instrumented code costs a ContextVar lookup when tracing is off.
+Finished spans are queued and written by a background thread to a
+rotating JSONL file or posted to an OTLP/HTTP collector (JSON encoding).
+"""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# version-trace_id-parent_id-flags, lowercase hex
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# OTLP SpanKind values
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(header: str) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span_id, sampled) of a traceparent header, or None if it is invalid."""
+    match = _TRACEPARENT.match(header.strip())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def _new_id(bits: int) -> str:
+    value = 0
+    while not value:
+        value = random.getrandbits(bits)
+    return f"{value:0{bits // 4}x}"
+
+
+class Span:
+    """One timed operation of a sampled trace. Used as a context manager, it becomes the current span."""
+    
+    __slots__ = (
+        "tracer", "trace_id", "span_id", "parent_id", "name", "kind",
+        "attributes", "start_ns", "end_ns", "error", "_token"
+    )
+    
+    def __init__(
+        self,
+        tracer: "Tracer",
+        trace_id: str,
+        parent_id: Optional[str],
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._token = None
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+    
+    def end(self):
+        # May run before the span's block exits (a root span ends when its response is sent)
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer.export(self)
+    
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and self.error is None and self.end_ns is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.end()
+        return False
+    
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": datetime.utcfromtimestamp(self.start_ns / 1e9).isoformat() + "Z",
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when the request is not sampled."""
+    
+    __slots__ = ()
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def __enter__(self) -> "_NoopSpan":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of the current request, None if it is not sampled."""
+    return _current_span.get()
+
+
+def span(name: str, kind: str = "internal", **attributes):
+    """Context manager timing `name` as a child of the current span; a no-op outside a sampled trace."""
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.tracer, parent.trace_id, parent.span_id, name, kind, attributes)
+
+
+class JsonlExporter:
+    """
+    Writes one JSON object per span to a size-rotated local file. A
+    `{pid}` in the path is replaced by the process id, so that server
+    workers do not rotate each other's file.
+    """
+    
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self._handler = RotatingFileHandler(
+            path.format(pid=os.getpid()),
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger = logging.getLogger(f"{__name__}.spans")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self._handler)
+    
+    def export(self, spans: List[Span]):
+        for finished in spans:
+            self._logger.info(json.dumps(finished.to_dict(), default=str))
+    
+    def close(self):
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+
+
+class OtlpHttpExporter:
+    """Posts batches of spans to an OTLP/HTTP collector as JSON (e.g. http://collector:4318/v1/traces)."""
+    
+    def __init__(self, endpoint: str, service_name: str, timeout_seconds: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout_seconds = timeout_seconds
+    
+    @staticmethod
+    def _value(value: Any) -> dict:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+    
+    def _span(self, finished: Span) -> dict:
+        encoded = {
+            "traceId": finished.trace_id,
+            "spanId": finished.span_id,
+            "name": finished.name,
+            "kind": SPAN_KINDS.get(finished.kind, 1),
+            "startTimeUnixNano": str(finished.start_ns),
+            "endTimeUnixNano": str(finished.end_ns),
+            "attributes": [
+                {"key": key, "value": self._value(value)}
+                for key, value in finished.attributes.items()
+                if value is not None
+            ],
+            # STATUS_CODE_ERROR, or STATUS_CODE_UNSET
+            "status": {"code": 2, "message": finished.error} if finished.error else {"code": 0},
+        }
+        if finished.parent_id:
+            encoded["parentSpanId"] = finished.parent_id
+        return encoded
+    
+    def export(self, spans: List[Span]):
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "app"}, "spans": [self._span(finished) for finished in spans]}],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+            response.read()
+    
+    def close(self):
+        pass
+
+
+_STOP = object()
+
+
+class Tracer:
+    """
+    Sampling and export of one worker's spans.
+    
+    A request carrying a `traceparent` follows its caller's sampling
+    decision; other requests are sampled with probability `sample_rate`.
+    Spans are exported by a background thread in batches of up to
+    `batch_size`; when the queue is full new spans are dropped (and
+    counted) rather than slowing requests down.
+    """
+    
+    def __init__(self, exporter, sample_rate: float = 0.0, queue_size: int = 10000, batch_size: int = 512):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+    
+    def start_trace(self, name: str, traceparent: Optional[str] = None) -> Optional[Span]:
+        """Root span of a request (a child of the caller's span if `traceparent` is valid), or None if not sampled."""
+        if not self.enabled:
+            return None
+        parent = parse_traceparent(traceparent) if traceparent else None
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = None, None
+            sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled:
+            return None
+        return Span(self, trace_id or _new_id(128), parent_id, name, "server")
+    
+    def export(self, finished: Span):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _start(self):
+        # Started lazily so each server worker gets its own thread after forking
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            stop = item is _STOP
+            batch = [] if stop else [item]
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as exc:
+                    logger.warning("Exporting %d spans failed: %r", len(batch), exc)
+            if stop:
+                return
+    
+    def shutdown(self, timeout_seconds: float = 5.0):
+        """Export the queued spans and stop the export thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout_seconds)
+            self._thread = None
+        if self.exporter is not None:
+            self.exporter.close()
+        if self.dropped:
+            logger.warning("%d spans were dropped because the export queue was full", self.dropped)
+
+
+class TracedRoute(APIRoute):
+    """
+    APIRoute whose request handler (parsing the request, resolving
+    dependencies, calling the route function and validating, serializing
+    and rendering the response) is timed as `route <name>`. The span is
+    only recorded within a sampled request.
+    """
+    
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        name = f"route {self.name}"
+        
+        @wraps(handler)
+        async def traced(request):
+            with span(name):
+                return await handler(request)
+        return traced
+
+
+def _exporter_from_settings():
+    if settings.tracing_exporter == "jsonl":
+        return JsonlExporter(
+            settings.tracing_jsonl_path,
+            max_bytes=settings.tracing_jsonl_max_bytes,
+            backup_count=settings.tracing_jsonl_backup_count
+        )
+    if settings.tracing_exporter == "otlp":
+        return OtlpHttpExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name)
+    return None
+
+
+tracer = Tracer(
+    exporter=_exporter_from_settings(),
+    sample_rate=settings.tracing_sample_rate,
+    queue_size=settings.tracing_queue_size,
+    batch_size=settings.tracing_export_batch_size
+)
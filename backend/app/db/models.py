@@ -1,11 +1,19 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    Column, String, Text, Date, DateTime, BigInteger, Integer, SmallInteger, ForeignKey, ForeignKeyConstraint,
+    PrimaryKeyConstraint, Index, CheckConstraint, UniqueConstraint, event, text
+)
 from sqlalchemy.orm import relationship
 import enum
 
+from app.core.config import settings
 from .base import Base
+from .partitioning import task_partition_ddl
+from .types import CodedEnum, GUID
+
+# Hash-partition tasks by user_id on PostgreSQL (0 keeps a single table)
+TASKS_PARTITIONED = settings.tasks_partition_count > 0
 
 
 class TaskStatus(str, enum.Enum):
@@ -22,13 +30,85 @@ class TaskPriority(str, enum.Enum):
     URGENT = "urgent"
 
 
+# Stored codes; never renumber, only append
+TASK_STATUS_CODES = {
+    TaskStatus.TODO: 0,
+    TaskStatus.IN_PROGRESS: 1,
+    TaskStatus.COMPLETED: 2,
+    TaskStatus.BLOCKED: 3,
+}
+
+TASK_PRIORITY_CODES = {
+    TaskPriority.LOW: 0,
+    TaskPriority.MEDIUM: 1,
+    TaskPriority.HIGH: 2,
+    TaskPriority.URGENT: 3,
+}
+
+
+class TaskEventKind(str, enum.Enum):
+    CREATED = "created"
+    STATUS_CHANGED = "status_changed"
+    PRIORITY_CHANGED = "priority_changed"
+    DELETED = "deleted"
+
+
+TASK_EVENT_KIND_CODES = {
+    TaskEventKind.CREATED: 0,
+    TaskEventKind.STATUS_CHANGED: 1,
+    TaskEventKind.PRIORITY_CHANGED: 2,
+    TaskEventKind.DELETED: 3,
+}
+
+
+class ProjectRole(str, enum.Enum):
+    VIEWER = "viewer"
+    EDITOR = "editor"
+    OWNER = "owner"
+
+
+# Ordered by privilege: a role may do everything the lower codes may
+PROJECT_ROLE_CODES = {
+    ProjectRole.VIEWER: 0,
+    ProjectRole.EDITOR: 1,
+    ProjectRole.OWNER: 2,
+}
+
+
+def task_status_type() -> CodedEnum:
+    return CodedEnum(TaskStatus, TASK_STATUS_CODES)
+
+
+def task_priority_type() -> CodedEnum:
+    return CodedEnum(TaskPriority, TASK_PRIORITY_CODES)
+
+
+def _codes_check(column: str, codes: dict) -> str:
+    return f"{column} IN ({', '.join(str(code) for code in sorted(codes.values()))})"
+
+
+# SQLite only auto-increments an INTEGER PRIMARY KEY
+EVENT_ID_TYPE = BigInteger().with_variant(Integer, "sqlite")
+
+# Fractional order keys (app/utils/ordering.py) must compare byte by byte
+ORDER_KEY_TYPE = String(255).with_variant(String(255, collation="C"), "postgresql")
+
+
+class SyncEntity(str, enum.Enum):
+    PROJECT = "project"
+    TASK = "task"
+
+
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(Text, nullable=False)
+    # Bumped whenever the user's project memberships change; cached
+    # permissions carry the version they were loaded at
+    permissions_version = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
@@ -46,16 +126,21 @@ class User(Base):
 class Project(Base):
     __tablename__ = "projects"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     color = Column(String(50), default="#3B82F6", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="projects")
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        Index("idx_projects_user_updated_at", "user_id", "updated_at"),
+    )
     
     def to_dict(self):
         return {
@@ -65,21 +150,31 @@ class Project(Base):
             "description": self.description,
             "color": self.color,
             "task_count": len(self.tasks) if self.tasks else 0,
-            "created_at": self.created_at.isoformat()
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
         }
 
 
 class Task(Base):
     __tablename__ = "tasks"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    # Owner of the task's project, whoever created it: a shared project's
+    # tasks stay in one partition. A partitioned table's primary key must
+    # include the partition key.
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, primary_key=TASKS_PARTITIONED)
+    project_id = Column(GUID(), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    # Parent task of a subtask. Deliberately not a foreign key, so the table
+    # can be repartitioned without rewriting it; TaskService deletes whole
+    # subtrees and archival skips tasks that still have subtasks.
+    parent_id = Column(GUID(), nullable=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    status = Column(String(50), default=TaskStatus.TODO.value, nullable=False)
-    priority = Column(String(50), default=TaskPriority.MEDIUM.value, nullable=False)
+    status = Column(task_status_type(), default=TaskStatus.TODO, nullable=False)
+    priority = Column(task_priority_type(), default=TaskPriority.MEDIUM, nullable=False)
     due_date = Column(DateTime, nullable=True)
+    # Manual position within the (project, status) column
+    order_key = Column(ORDER_KEY_TYPE, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -87,16 +182,190 @@ class Task(Base):
     user = relationship("User", back_populates="tasks")
     project = relationship("Project", back_populates="tasks")
     
+    __table_args__ = (
+        CheckConstraint(_codes_check("status", TASK_STATUS_CODES), name="chk_task_status"),
+        CheckConstraint(_codes_check("priority", TASK_PRIORITY_CODES), name="chk_task_priority"),
+        # Cross-project reads ("every task visible to me") probe these once
+        # per project the user is a member of
+        Index("idx_tasks_project_updated_at", "project_id", "updated_at"),
+        Index("idx_tasks_project_created_at", "project_id", "created_at"),
+        Index("idx_tasks_project_due_date", "project_id", "due_date"),
+        Index("idx_tasks_project_status_order_key", "project_id", "status", "order_key"),
+        Index("idx_tasks_parent_id", "parent_id"),
+        # Open tasks with a due date only: serves the overdue query without
+        # scanning completed or undated tasks
+        Index(
+            "idx_tasks_project_open_due_date",
+            "project_id",
+            "due_date",
+            postgresql_where=(status != TaskStatus.COMPLETED) & due_date.isnot(None),
+            sqlite_where=(status != TaskStatus.COMPLETED) & due_date.isnot(None)
+        ),
+        # Target of the composite task_dependencies foreign keys; a
+        # partitioned table's primary key already is (id, user_id)
+        *([] if TASKS_PARTITIONED else [UniqueConstraint("id", "user_id", name="uq_tasks_id_user_id")]),
+        {"postgresql_partition_by": "HASH (user_id)"} if TASKS_PARTITIONED else {},
+    )
+    
     def to_dict(self):
         return {
             "id": str(self.id),
             "user_id": str(self.user_id),
             "project_id": str(self.project_id),
+            "parent_id": str(self.parent_id) if self.parent_id else None,
             "title": self.title,
             "description": self.description,
-            "status": self.status,
-            "priority": self.priority,
+            "status": self.status.value,
+            "priority": self.priority.value,
             "due_date": self.due_date.isoformat() if self.due_date else None,
+            "order_key": self.order_key,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
+
+
+class ProjectMember(Base):
+    """
+    A user's role in a project. The owner (projects.user_id) has a row as
+    well, so access checks only ever read this table.
+    """
+    __tablename__ = "project_members"
+    
+    project_id = Column(GUID(), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(CodedEnum(ProjectRole, PROJECT_ROLE_CODES), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint(_codes_check("role", PROJECT_ROLE_CODES), name="chk_project_member_role"),
+        # A user's projects and roles, read from the index alone
+        Index("idx_project_members_user_project_role", "user_id", "project_id", "role"),
+    )
+
+
+@event.listens_for(Task.__table__, "after_create")
+def create_task_partitions(target, connection, **kw):
+    """Create the hash partitions when a partitioned tasks table is created."""
+    if not TASKS_PARTITIONED or connection.dialect.name != "postgresql":
+        return
+    for statement in task_partition_ddl(settings.tasks_partition_count):
+        connection.execute(text(statement))
+
+
+class TaskArchive(Base):
+    """Completed tasks moved out of the hot tasks table by the archival job."""
+    __tablename__ = "tasks_archive"
+    
+    id = Column(GUID(), primary_key=True)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(GUID(), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    parent_id = Column(GUID(), nullable=True)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(task_status_type(), nullable=False)
+    priority = Column(task_priority_type(), nullable=False)
+    due_date = Column(DateTime, nullable=True)
+    order_key = Column(ORDER_KEY_TYPE, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_tasks_archive_user_id", "user_id"),
+        Index("idx_tasks_archive_project_id", "project_id"),
+    )
+
+
+class TaskDependency(Base):
+    """Edge meaning `task_id` is blocked by `depends_on_id`; both tasks belong to `user_id`."""
+    __tablename__ = "task_dependencies"
+    
+    task_id = Column(GUID(), primary_key=True)
+    depends_on_id = Column(GUID(), primary_key=True)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # Composite keys, so they stay valid when tasks is partitioned by user_id
+        ForeignKeyConstraint(
+            ["task_id", "user_id"], ["tasks.id", "tasks.user_id"],
+            name="fk_task_dependencies_task", ondelete="CASCADE"
+        ),
+        ForeignKeyConstraint(
+            ["depends_on_id", "user_id"], ["tasks.id", "tasks.user_id"],
+            name="fk_task_dependencies_depends_on", ondelete="CASCADE"
+        ),
+        CheckConstraint("task_id <> depends_on_id", name="chk_task_dependency_not_self"),
+        Index("idx_task_dependencies_depends_on_id", "depends_on_id"),
+    )
+
+
+class TaskEvent(Base):
+    """
+    Append-only history of task writes. `from_value` and `to_value` hold
+    status codes (priority codes for priority changes); a create has only
+    `to_value`, a delete only `from_value`.
+    """
+    __tablename__ = "task_events"
+    
+    id = Column(EVENT_ID_TYPE, primary_key=True, autoincrement=True)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(GUID(), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    # Not a foreign key: events outlive their task
+    task_id = Column(GUID(), nullable=False)
+    kind = Column(CodedEnum(TaskEventKind, TASK_EVENT_KIND_CODES), nullable=False)
+    from_value = Column(SmallInteger, nullable=True)
+    to_value = Column(SmallInteger, nullable=True)
+    occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint(_codes_check("kind", TASK_EVENT_KIND_CODES), name="chk_task_event_kind"),
+        Index("idx_task_events_occurred_at", "occurred_at"),
+        Index("idx_task_events_task_id_occurred_at", "task_id", "occurred_at"),
+    )
+
+
+class TaskDailyStats(Base):
+    """Per-user, per-project daily aggregates of task_events, maintained by the rollup job."""
+    __tablename__ = "task_daily_stats"
+    
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(GUID(), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    created = Column(Integer, default=0, nullable=False)
+    completed = Column(Integer, default=0, nullable=False)
+    deleted = Column(Integer, default=0, nullable=False)
+    # Spells in in_progress that ended this day, and their total length
+    in_progress_count = Column(Integer, default=0, nullable=False)
+    in_progress_seconds = Column(BigInteger, default=0, nullable=False)
+    
+    __table_args__ = (
+        # Serves the per-user date range reads of the analytics endpoints
+        PrimaryKeyConstraint("user_id", "day", "project_id"),
+    )
+
+
+class RollupWatermark(Base):
+    """How far a rollup job has processed its source table."""
+    __tablename__ = "rollup_watermarks"
+    
+    name = Column(String(50), primary_key=True)
+    rolled_up_to = Column(DateTime, nullable=False)
+
+
+class Tombstone(Base):
+    """Marker left behind by a deleted project or task so clients can sync deletions."""
+    __tablename__ = "tombstones"
+    
+    entity_id = Column(GUID(), primary_key=True)
+    entity_type = Column(String(20), nullable=False)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Project of a deleted task, so members of a shared project see the
+    # deletion; not a foreign key, since the project may be gone too
+    project_id = Column(GUID(), nullable=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_tombstones_user_deleted_at", "user_id", "deleted_at"),
+        Index("idx_tombstones_project_deleted_at", "project_id", "deleted_at"),
+    )
@@ -0,0 +1,20 @@
+from typing import List
+
+
+def task_partition_name(remainder: int, parent: str = "tasks") -> str:
+    """Name of the hash partition of a tasks table holding the given remainder."""
+    return f"{parent}_p{remainder}"
+
+
+def task_partition_ddl(partition_count: int, parent: str = "tasks") -> List[str]:
+    """
+    DDL for the hash partitions of a tasks table partitioned by user_id.
+    Every TaskService query filters on user_id, so PostgreSQL prunes
+    each one down to a single partition.
+    """
+    return [
+        f"CREATE TABLE IF NOT EXISTS {task_partition_name(remainder, parent)} "
+        f"PARTITION OF {parent} "
+        f"FOR VALUES WITH (MODULUS {partition_count}, REMAINDER {remainder})"
+        for remainder in range(partition_count)
+    ]
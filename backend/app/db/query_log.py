@@ -0,0 +1,231 @@
+"""
+Per-statement timing for the SQLAlchemy engine.
+
+Every statement is timed and attributed to the current route (set by
+QueryRouteMiddleware) and to the service method that issued it. Statements
+slower than `slow_query_threshold_ms` are logged with redacted parameters,
+and a sampled share of slow SELECTs get an EXPLAIN (ANALYZE, BUFFERS) plan
+on PostgreSQL. Aggregates live in memory per worker since startup.
+"""
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request being served, set by QueryRouteMiddleware
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+DB_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(DB_DIR)
+
+_IN_LIST = re.compile(r"IN \((?:%\(\w+\)s|\?|:\w+|%s)(?:, (?:%\(\w+\)s|\?|:\w+|%s))*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class QueryStat:
+    """Aggregated timings of one statement issued from one route."""
+    statement: str
+    route: str
+    caller: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    errors: int = 0
+    last_plan: Optional[str] = None
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and expanded IN lists so equal statements share a key."""
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace parameter values with their type (and length for strings/bytes)."""
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: describe the first row only
+            return [redact_parameters(parameters[0]), f"... {len(parameters)} rows"]
+        return [redact_parameters(value) for value in parameters]
+    if parameters is None:
+        return None
+    if isinstance(parameters, (str, bytes)):
+        return f"<{type(parameters).__name__}:{len(parameters)}>"
+    return f"<{type(parameters).__name__}>"
+
+
+def current_caller() -> str:
+    """Name the innermost application function (usually a service method) on the call stack."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.startswith(APP_DIR) and not code.co_filename.startswith(DB_DIR):
+            return getattr(code, "co_qualname", code.co_name)
+        frame = frame.f_back
+    return "-"
+
+
+class QueryLog:
+    """Thread-safe, bounded statement statistics for one worker."""
+    
+    def __init__(
+        self,
+        threshold_ms: float = 200.0,
+        explain_sample_rate: float = 0.0,
+        max_entries: int = 500
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.max_entries = max_entries
+        self.started_at = datetime.utcnow()
+        self._stats: Dict[Tuple[str, str], QueryStat] = {}
+        self._route_names: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+    
+    def install(self, engine: Engine):
+        """Attach the timing hooks to an engine."""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+    
+    def route(self) -> str:
+        """Label for the current request, using the route template once routing has happened."""
+        scope = request_scope.get()
+        if scope is None:
+            return "-"
+        
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return f"{scope['method']} {scope['path']}"
+        
+        name = self._route_names.get(endpoint)
+        if name is None:
+            name = getattr(endpoint, "__qualname__", str(endpoint))
+            for route in getattr(scope.get("app"), "routes", []):
+                if getattr(route, "endpoint", None) is endpoint:
+                    name = route.path
+                    break
+            self._route_names[endpoint] = name
+        return f"{scope['method']} {name}"
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_log_started", []).append(time.perf_counter())
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_log_started")
+        if not started:
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        slow = elapsed_ms >= self.threshold_ms
+        
+        plan = None
+        if slow and not executemany and self._should_explain(conn, statement):
+            plan = self._explain(conn, statement, parameters)
+        
+        caller = self.record(statement, elapsed_ms, slow, plan)
+        
+        if slow:
+            logger.warning(
+                "Slow query %.1f ms [%s] %s: %s params=%s%s",
+                elapsed_ms,
+                self.route(),
+                caller,
+                normalize_statement(statement),
+                redact_parameters(parameters),
+                f"\n{plan}" if plan else ""
+            )
+    
+    def _handle_error(self, exception_context):
+        # after_cursor_execute does not run for a failed statement; pop its
+        # start time here so that it is not left on the pooled connection
+        conn = exception_context.connection
+        started = conn.info.get("query_log_started") if conn is not None else None
+        if not started or exception_context.statement is None:
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        self.record(exception_context.statement, elapsed_ms, failed=True)
+    
+    def record(
+        self,
+        statement: str,
+        elapsed_ms: float,
+        slow: bool = False,
+        plan: Optional[str] = None,
+        failed: bool = False
+    ) -> str:
+        """Add one execution to the aggregates and return its caller."""
+        key = (self.route(), normalize_statement(statement))
+        with self._lock:
+            stat = self._stats.get(key)
+        
+        # Walking the stack is only worth it the first time and for slow statements
+        caller = current_caller() if stat is None or slow else stat.caller
+        
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                if len(self._stats) >= self.max_entries:
+                    # Keep the heavy hitters: evict the cheapest statement
+                    cheapest = min(self._stats, key=lambda k: self._stats[k].total_ms)
+                    del self._stats[cheapest]
+                stat = self._stats[key] = QueryStat(statement=key[1], route=key[0], caller=caller)
+            stat.calls += 1
+            stat.total_ms += elapsed_ms
+            stat.max_ms = max(stat.max_ms, elapsed_ms)
+            if failed:
+                stat.errors += 1
+            if slow:
+                stat.caller = caller
+            if plan:
+                stat.last_plan = plan
+        return caller
+    
+    def top(self, limit: int = 20) -> List[QueryStat]:
+        """Statements with the highest total time since startup."""
+        with self._lock:
+            stats = sorted(self._stats.values(), key=lambda stat: stat.total_ms, reverse=True)
+            return [QueryStat(**vars(stat)) for stat in stats[:limit]]
+    
+    def _should_explain(self, conn, statement: str) -> bool:
+        if conn.dialect.name != "postgresql" or random.random() >= self.explain_sample_rate:
+            return False
+        # ANALYZE runs the statement again, so only side-effect free reads qualify
+        head = statement.lstrip()[:6].upper()
+        return head == "SELECT" and " FOR UPDATE" not in statement.upper()
+    
+    def _explain(self, conn, statement: str, parameters) -> Optional[str]:
+        """Run EXPLAIN (ANALYZE, BUFFERS) on the raw connection, bypassing these hooks."""
+        dbapi_connection = conn.connection.dbapi_connection
+        in_transaction = not getattr(dbapi_connection, "autocommit", False)
+        cursor = dbapi_connection.cursor()
+        try:
+            # A failing EXPLAIN must not abort the caller's transaction
+            if in_transaction:
+                cursor.execute("SAVEPOINT query_log_explain")
+            try:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception:
+                logger.exception("EXPLAIN of slow query failed")
+                if in_transaction:
+                    cursor.execute("ROLLBACK TO SAVEPOINT query_log_explain")
+                plan = None
+            if in_transaction:
+                cursor.execute("RELEASE SAVEPOINT query_log_explain")
+            return plan
+        finally:
+            cursor.close()
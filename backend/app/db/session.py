@@ -1,24 +1,126 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+from fastapi import Request
 from typing import Generator
 from app.core.config import settings
+from app.core.tracing import current_span, span, tracer
+from app.db import tracing
+from app.db.query_log import QueryLog
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+# Methods served by the read-only SQLite pool
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _sqlite_pragmas(query_only: bool = False):
+    """Connect hook applying the embedded-mode pragmas to every new SQLite connection."""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+            cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+            cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+            cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            if query_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+        # Leave transaction control to SQLAlchemy (see _sqlite_begin)
+        dbapi_connection.isolation_level = None
+    return on_connect
+
+
+def _sqlite_begin(conn):
+    """
+    Begin hook emitting BEGIN for every SQLAlchemy transaction. pysqlite
+    only opens one before a data-modifying statement, so a SAVEPOINT
+    would start its own transaction and releasing it would commit (and
+    the reads of one session would not share a snapshot).
+    """
+    conn.exec_driver_sql("BEGIN")
+
+
+def _create_engines():
+    """
+    (writer, reader) engines for the configured database. PostgreSQL uses
+    one pooled engine for both. A SQLite file gets a single-connection
+    writer engine, so writes queue in the pool instead of failing on the
+    database lock, and a pool of read-only connections that WAL lets run
+    alongside it. An in-memory SQLite database is one shared connection.
+    """
+    url = make_url(settings.database_url)
+    if url.get_backend_name() != "sqlite":
+        engine = create_engine(
+            url,
+            pool_pre_ping=True,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow
+        )
+        return engine, engine
+    
+    connect_args = {"check_same_thread": False}
+    if url.database in (None, "", ":memory:") or url.query.get("mode") == "memory":
+        engine = create_engine(url, connect_args=connect_args, poolclass=StaticPool)
+        event.listen(engine, "connect", _sqlite_pragmas())
+        event.listen(engine, "begin", _sqlite_begin)
+        return engine, engine
+    
+    writer = create_engine(url, connect_args=connect_args, pool_size=1, max_overflow=0)
+    event.listen(writer, "connect", _sqlite_pragmas())
+    event.listen(writer, "begin", _sqlite_begin)
+    reader = create_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow
+    )
+    event.listen(reader, "connect", _sqlite_pragmas(query_only=True))
+    event.listen(reader, "begin", _sqlite_begin)
+    return writer, reader
+
+
+# Create database engines
+engine, read_engine = _create_engines()
+
+# Time every statement; slow ones are logged and can be explained
+query_log = QueryLog(
+    threshold_ms=settings.slow_query_threshold_ms,
+    explain_sample_rate=settings.slow_query_explain_sample_rate,
+    max_entries=settings.query_stats_max_entries
 )
+if settings.query_log_enabled:
+    query_log.install(engine)
+    if read_engine is not engine:
+        query_log.install(read_engine)
+
+# Spans for statements of sampled requests
+if tracer.enabled:
+    tracing.install(engine)
+    if read_engine is not engine:
+        tracing.install(read_engine)
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 
-def get_db() -> Generator[Session, None, None]:
-    """Dependency to get database session."""
-    db = SessionLocal()
+def get_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Dependency to get database session. Reads are served from the
+    read-only pool in SQLite mode.
+    """
+    factory = ReadSessionLocal if request.method in READ_METHODS else SessionLocal
+    db = factory()
     try:
+        if current_span() is not None:
+            # In a sampled request, check the connection out now so that
+            # waiting on the pool shows up as its own span
+            with span("db.checkout"):
+                db.connection()
         yield db
     finally:
         db.close()
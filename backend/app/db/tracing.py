@@ -0,0 +1,58 @@
+"""
+Spans for the statements of a SQLAlchemy engine, as children of the
+current request's span. Outside a sampled request the hooks only check
+the span context.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.tracing import Span, current_span
+from app.db.query_log import current_caller, normalize_statement
+
+# Longest statement text recorded on a span
+MAX_STATEMENT_LENGTH = 2000
+
+
+def install(engine: Engine):
+    """Attach the span hooks to an engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = current_span()
+    if parent is None:
+        return
+    conn.info.setdefault("trace_spans", []).append(Span(
+        parent.tracer,
+        parent.trace_id,
+        parent.span_id,
+        "db.query",
+        "client",
+        {
+            "db.system": conn.dialect.name,
+            "db.statement": normalize_statement(statement)[:MAX_STATEMENT_LENGTH],
+            "code.function": current_caller(),
+        }
+    ))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if not spans:
+        return
+    finished = spans.pop()
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        finished.set_attribute("db.rowcount", cursor.rowcount)
+    finished.end()
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    if not spans:
+        return
+    finished = spans.pop()
+    finished.error = f"{type(exception_context.original_exception).__name__}: {exception_context.original_exception}"
+    finished.end()
@@ -0,0 +1,77 @@
+import enum
+import uuid
+from typing import Dict, Optional, Type
+from sqlalchemy import LargeBinary, SmallInteger
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+
+class GUID(TypeDecorator):
+    """
+    Dialect-portable UUID column.
+    
+    Uses the native UUID type on PostgreSQL and a 16-byte BLOB elsewhere
+    (half the size of the 32/36-character text forms, and it compares and
+    indexes as raw bytes). Python code always sees uuid.UUID values; bound
+    strings are parsed, so path parameters can be compared directly.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
+    
+    def process_result_value(self, value, dialect) -> Optional[uuid.UUID]:
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(bytes=bytes(value))
+    
+    @property
+    def python_type(self):
+        return uuid.UUID
+
+
+class CodedEnum(TypeDecorator):
+    """
+    Store a string enum as a fixed small-integer code.
+    
+    Rows and indexes carry a 2-byte SMALLINT instead of variable-length
+    text; Python code keeps working with the enum members (or their string
+    values, which are accepted anywhere a member is).
+    """
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class: Type[enum.Enum], codes: Dict[enum.Enum, int]):
+        super().__init__()
+        self.enum_class = enum_class
+        # Kept as a tuple so the type stays hashable for SQLAlchemy's statement cache
+        self.codes = tuple(sorted(codes.items(), key=lambda item: item[1]))
+        self._code_of = dict(codes)
+        self._member_of = {code: member for member, code in codes.items()}
+    
+    def process_bind_param(self, value, dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return self._code_of[self.enum_class(value)]
+    
+    def process_literal_param(self, value, dialect) -> str:
+        return str(self.process_bind_param(value, dialect))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._member_of[value]
+    
+    @property
+    def python_type(self):
+        return self.enum_class
@@ -3,7 +3,9 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db.models import User
+from app.core.config import settings
 from app.core.security import decode_access_token
+from app.core.tracing import span
 
 # Bearer token security scheme
 security = HTTPBearer()
@@ -21,7 +23,8 @@ async def get_current_user(
     token = credentials.credentials
     
     # Decode and validate token
-    user_id = decode_access_token(token)
+    with span("auth.decode_token"):
+        user_id = decode_access_token(token)
     
     if user_id is None:
         raise HTTPException(
@@ -31,7 +34,8 @@ async def get_current_user(
         )
     
     # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    with span("auth.load_user"):
+        user = db.query(User).filter(User.id == user_id).first()
     
     if user is None:
         raise HTTPException(
@@ -41,3 +45,23 @@ async def get_current_user(
         )
     
     return user
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Admin authorization dependency.
+    Allows only users whose email is listed in ADMIN_EMAILS, otherwise raises 403.
+    """
+    admin_emails = {
+        email.strip().lower()
+        for email in settings.admin_emails.split(",")
+        if email.strip()
+    }
+    
+    if current_user.email.lower() not in admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    return current_user
@@ -1,12 +1,16 @@
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
 
 from app.core.config import settings
+from app.core.tracing import tracer
 from app.db.base import Base
 from app.db.session import engine
-from app.routes import auth_router, tasks_router, projects_router
+from app.middleware import CompressionMiddleware, QueryRouteMiddleware, TracingMiddleware
+from app.routes import auth_router, tasks_router, projects_router, sync_router, bootstrap_router, admin_router, analytics_router, batch_router
+from app.routes.tasks import task_update_coalescer
 from app.utils.exceptions import (
     validation_exception_handler,
     integrity_error_handler,
@@ -34,6 +38,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (gzip, or Brotli when installed and accepted)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_level,
+    brotli_quality=settings.compression_brotli_quality
+)
+
+# Attribute database statements to the route serving the request
+app.add_middleware(QueryRouteMiddleware)
+
+# Root span and traceparent propagation for sampled requests (outermost, so
+# it covers the other middleware)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 # Register exception handlers
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(IntegrityError, integrity_error_handler)
@@ -43,6 +62,29 @@ app.add_exception_handler(Exception, generic_exception_handler)
 app.include_router(auth_router)
 app.include_router(projects_router)
 app.include_router(tasks_router)
+app.include_router(sync_router)
+app.include_router(bootstrap_router)
+app.include_router(admin_router)
+app.include_router(analytics_router)
+app.include_router(batch_router)
+
+
+@app.on_event("startup")
+def configure_threadpool():
+    """Size the threadpool that runs sync endpoints and dependencies."""
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+
+@app.on_event("shutdown")
+def flush_coalesced_updates():
+    """Commit task updates still waiting in the coalescing window."""
+    task_update_coalescer.close()
+
+
+@app.on_event("shutdown")
+def flush_spans():
+    """Export spans still queued for the exporter."""
+    tracer.shutdown()
 
 
 @app.get("/")
@@ -0,0 +1,4 @@
+# Middleware module
+from .compression import CompressionMiddleware
+from .query_route import QueryRouteMiddleware
+from .tracing import TracingMiddleware
@@ -0,0 +1,116 @@
+import gzip
+from typing import Optional
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; fall back to gzip only
+    brotli = None
+
+# Bodies larger than this are compressed in the threadpool to keep the event loop free
+THREADPOOL_THRESHOLD = 64 * 1024
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with Brotli or gzip, whichever the client accepts,
+    once the body reaches `minimum_size` bytes. Streamed responses and
+    responses that already carry a Content-Encoding pass through untouched.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message: Optional[Message] = None
+        
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+            ):
+                await send(start)
+                await send(message)
+                return
+            
+            if len(body) > THREADPOOL_THRESHOLD:
+                body = await to_thread.run_sync(self._compress, body, encoding)
+            else:
+                body = self._compress(body, encoding)
+            
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_compressed)
+    
+    @staticmethod
+    def _choose_encoding(accept_encoding: str) -> Optional[str]:
+        """
+        Pick the supported encoding with the highest q-value in an
+        Accept-Encoding header, preferring Brotli over gzip on a tie.
+        Codings not listed get the q-value of `*`, if given.
+        """
+        weights = {}
+        for part in accept_encoding.lower().split(","):
+            name, _, params = part.strip().partition(";")
+            weight = 1.0
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key.strip() == "q":
+                    try:
+                        weight = float(value)
+                    except ValueError:
+                        weight = 0.0
+            weights[name.strip()] = weight
+        
+        supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+        best, best_weight = None, 0.0
+        for encoding in supported:
+            weight = weights.get(encoding, weights.get("*", 0.0))
+            if weight > best_weight:
+                best, best_weight = encoding, weight
+        return best
+    
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
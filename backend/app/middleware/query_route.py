@@ -0,0 +1,25 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.db.query_log import request_scope
+
+
+class QueryRouteMiddleware:
+    """
+    Expose the ASGI scope of the current request to the query log so each
+    statement can be attributed to the route that issued it. The router
+    fills in the matched endpoint on the same scope once it has run.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
@@ -0,0 +1,66 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import Tracer
+
+
+class TracingMiddleware:
+    """
+    Open the root span of each sampled request and propagate the W3C
+    trace context: an incoming `traceparent` header continues the caller's
+    trace, and the response carries a `traceparent` naming this request's
+    span (or the incoming header unchanged, when the request is not
+    sampled). The span is named after the matched route template and ends
+    once the response is sent, before any background tasks run.
+    """
+    
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        
+        root = self.tracer.start_trace(scope["method"], traceparent)
+        if root is None and traceparent is None:
+            await self.app(scope, receive, send)
+            return
+        
+        header = (b"traceparent", (root.traceparent() if root is not None else traceparent).encode("latin-1"))
+        
+        def name_root():
+            # The router records the matched route on the scope
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+                root.set_attribute("http.route", route.path)
+        
+        async def send_with_traceparent(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), header]
+                if root is not None:
+                    root.set_attribute("http.status_code", message["status"])
+            await send(message)
+            # The request ends with its response, not with the background tasks that follow it
+            if root is not None and message["type"] == "http.response.body" and not message.get("more_body", False):
+                name_root()
+                root.end()
+        
+        if root is None:
+            await self.app(scope, receive, send_with_traceparent)
+            return
+        
+        root.set_attribute("http.method", scope["method"])
+        root.set_attribute("http.target", scope["path"])
+        with root:
+            try:
+                await self.app(scope, receive, send_with_traceparent)
+            finally:
+                name_root()
@@ -2,5 +2,10 @@
 from .auth import router as auth_router
 from .tasks import router as tasks_router
 from .projects import router as projects_router
+from .sync import router as sync_router
+from .bootstrap import router as bootstrap_router
+from .admin import router as admin_router
+from .analytics import router as analytics_router
+from .batch import router as batch_router
 
-__all__ = ["auth_router", "tasks_router", "projects_router"]
+__all__ = ["auth_router", "tasks_router", "projects_router", "sync_router", "bootstrap_router", "admin_router", "analytics_router", "batch_router"]
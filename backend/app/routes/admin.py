@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+from app.core.tracing import TracedRoute
+from app.db.models import User
+from app.db.session import query_log
+from app.schemas.admin import QueryStatResponse, QueryStatsResponse
+from app.dependencies.auth import get_admin_user
+
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=TracedRoute)
+
+
+@router.get("/queries", response_model=QueryStatsResponse)
+def get_query_stats(
+    limit: int = Query(20, ge=1, le=500),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Get the statements with the highest total time in this worker since
+    startup, with the route and service method that issued them.
+    """
+    return QueryStatsResponse(
+        since=query_log.started_at.isoformat(),
+        statements=[
+            QueryStatResponse(
+                statement=stat.statement,
+                route=stat.route,
+                caller=stat.caller,
+                calls=stat.calls,
+                total_ms=round(stat.total_ms, 3),
+                mean_ms=round(stat.total_ms / stat.calls, 3),
+                max_ms=round(stat.max_ms, 3),
+                errors=stat.errors,
+                last_plan=stat.last_plan
+            )
+            for stat in query_log.top(limit)
+        ]
+    )
@@ -0,0 +1,41 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.core.tracing import TracedRoute
+from app.db.session import get_db
+from app.db.models import User
+from app.schemas.analytics import ThroughputResponse, CycleTimeResponse
+from app.services.analytics_service import AnalyticsService
+from app.dependencies.auth import get_current_user
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"], route_class=TracedRoute)
+
+
+@router.get("/throughput", response_model=ThroughputResponse)
+def get_throughput(
+    start: Optional[str] = Query(None, alias="from", description="First day (inclusive), YYYY-MM-DD"),
+    end: Optional[str] = Query(None, alias="to", description="Last day (exclusive), YYYY-MM-DD"),
+    project_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get tasks created, completed and deleted per day, from the daily
+    rollups (up to date as of `rolled_up_to`). Defaults to the last 30 days.
+    """
+    return AnalyticsService.get_throughput(db, current_user, start, end, project_id)
+
+
+@router.get("/cycle-time", response_model=CycleTimeResponse)
+def get_cycle_time(
+    start: Optional[str] = Query(None, alias="from", description="First day (inclusive), YYYY-MM-DD"),
+    end: Optional[str] = Query(None, alias="to", description="Last day (exclusive), YYYY-MM-DD"),
+    project_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the average time tasks spent in in_progress, by the day they left
+    it, from the daily rollups.
+    """
+    return AnalyticsService.get_cycle_time(db, current_user, start, end, project_id)
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
+from app.core.tracing import TracedRoute
 from app.db.session import get_db
 from app.db.models import User
 from app.schemas.auth import UserCreate, UserLogin, AuthResponse, UserResponse
 from app.services.auth_service import AuthService
 from app.dependencies.auth import get_current_user
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=TracedRoute)
 
 
 @router.post("/signup", response_model=AuthResponse)
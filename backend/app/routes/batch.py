@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.tracing import TracedRoute
+from app.db.session import get_db
+from app.db.models import User
+from app.routes.tasks import task_update_coalescer
+from app.schemas.batch import BatchRequest, BatchResponse
+from app.services.batch_service import BatchService
+from app.dependencies.auth import get_current_user
+
+router = APIRouter(prefix="/batch", tags=["Batch"], route_class=TracedRoute)
+
+
+@router.post("", response_model=BatchResponse)
+def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Run a list of project and task operations in order, in one transaction.
+    Each result holds the status and body the standalone call would have
+    returned. Operations can refer to ids created earlier in the batch as
+    `${op_id}`.
+    """
+    coalescer = task_update_coalescer if settings.task_update_coalescing != "off" else None
+    return BatchService.run_batch(db, current_user, batch, request.app.routes, coalescer)
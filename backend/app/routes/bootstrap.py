@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.core.tracing import TracedRoute
+from app.db.session import get_db
+from app.db.models import User
+from app.schemas.bootstrap import BootstrapResponse
+from app.services.bootstrap_service import BootstrapService
+from app.dependencies.auth import get_current_user
+
+router = APIRouter(prefix="/bootstrap", tags=["Bootstrap"], route_class=TracedRoute)
+
+
+@router.get("", response_model=BootstrapResponse)
+def bootstrap(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the current user, their projects with task counts and their
+    most recent tasks in a single round trip.
+    """
+    return BootstrapService.get_bootstrap(db, current_user)
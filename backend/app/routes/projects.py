@@ -1,24 +1,32 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from app.core.idempotency import run_idempotent
+from app.core.tracing import TracedRoute
 from app.db.session import get_db
 from app.db.models import User
-from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.schemas.project import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectMemberCreate, ProjectMemberUpdate, ProjectMemberResponse
+)
 from app.services.project_service import ProjectService
 from app.dependencies.auth import get_current_user
 
-router = APIRouter(prefix="/projects", tags=["Projects"])
+router = APIRouter(prefix="/projects", tags=["Projects"], route_class=TracedRoute)
 
 
 @router.get("", response_model=List[ProjectResponse])
 def get_projects(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. name,color,task_count"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all projects for the authenticated user.
+    Get all projects the authenticated user owns or is a member of.
+    Pass `fields` to return only the listed fields.
     """
-    return ProjectService.get_user_projects(db, current_user)
+    projects = ProjectService.get_user_projects(db, current_user, fields)
+    return JSONResponse(projects) if fields else projects
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -36,13 +44,23 @@ def get_project(
 @router.post("", response_model=ProjectResponse)
 def create_project(
     project_data: ProjectCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create a new project for the authenticated user.
+    Retries carrying the same `Idempotency-Key` get the original response.
     """
-    return ProjectService.create_project(db, current_user, project_data)
+    return run_idempotent(
+        response,
+        idempotency_key,
+        current_user.id,
+        "create_project",
+        project_data,
+        lambda: ProjectService.create_project(db, current_user, project_data)
+    )
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
@@ -53,7 +71,7 @@ def update_project(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Update a project owned by the authenticated user.
+    Update a project. Requires the editor or owner role.
     """
     return ProjectService.update_project(db, current_user, project_id, project_data)
 
@@ -65,6 +83,60 @@ def delete_project(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Delete a project owned by the authenticated user.
+    Delete a project owned by the authenticated user, for every member.
     """
     return ProjectService.delete_project(db, current_user, project_id)
+
+
+@router.get("/{project_id}/members", response_model=List[ProjectMemberResponse])
+def get_project_members(
+    project_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List a project's members and their roles.
+    """
+    return ProjectService.get_members(db, current_user, project_id)
+
+
+@router.post("/{project_id}/members", response_model=ProjectMemberResponse)
+def add_project_member(
+    project_id: str,
+    member_data: ProjectMemberCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Share a project with a registered user, as editor or viewer.
+    Only the owner can add members.
+    """
+    return ProjectService.add_member(db, current_user, project_id, member_data)
+
+
+@router.put("/{project_id}/members/{user_id}", response_model=ProjectMemberResponse)
+def update_project_member(
+    project_id: str,
+    user_id: str,
+    member_data: ProjectMemberUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Change a member's role. Only the owner can change roles.
+    """
+    return ProjectService.update_member(db, current_user, project_id, user_id, member_data)
+
+
+@router.delete("/{project_id}/members/{user_id}")
+def remove_project_member(
+    project_id: str,
+    user_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Remove a member from a project. The owner can remove anyone else;
+    members can remove themselves to leave.
+    """
+    return ProjectService.remove_member(db, current_user, project_id, user_id)
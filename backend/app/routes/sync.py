@@ -0,0 +1,46 @@
+import time
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.tracing import TracedRoute
+from app.db.session import get_db, SessionLocal
+from app.db.models import User
+from app.schemas.sync import SyncResponse
+from app.services.sync_service import SyncService
+from app.dependencies.auth import get_current_user
+
+router = APIRouter(prefix="/sync", tags=["Sync"], route_class=TracedRoute)
+
+# Monotonic time of the last tombstone compaction in this worker
+_last_compaction = 0.0
+
+
+def _compact_tombstones():
+    """Background job: compact expired tombstones with a dedicated session."""
+    db = SessionLocal()
+    try:
+        SyncService.compact_tombstones(db)
+    finally:
+        db.close()
+
+
+@router.get("", response_model=SyncResponse)
+def sync(
+    background_tasks: BackgroundTasks,
+    since: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get projects and tasks created or updated since the `since` token,
+    plus the IDs of anything deleted. Pass the returned `next_token`
+    on the next call. A `full` response replaces the client's state.
+    """
+    global _last_compaction
+    now = time.monotonic()
+    if now - _last_compaction >= settings.sync_compaction_interval_minutes * 60:
+        _last_compaction = now
+        background_tasks.add_task(_compact_tombstones)
+    
+    return SyncService.get_changes(db, current_user, since)
@@ -1,64 +1,307 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from tempfile import SpooledTemporaryFile
+from typing import List, Optional, Union
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.models import User
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.core.config import settings
+from app.core.coalescer import WriteCoalescer
+from app.core.idempotency import run_idempotent
+from app.core.tracing import TracedRoute
+from app.db.session import get_db, SessionLocal
+from app.db.models import TaskStatus, User
+from app.schemas.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskMove, CalendarDay, TaskImportResponse,
+    TaskGraphNode, TaskDependencyCreate, TaskDependencyResponse
+)
 from app.services.task_service import TaskService
+from app.services.import_service import ImportService
+from app.services.task_graph_service import TaskGraphService
+from app.services.archive_service import ArchiveService
 from app.dependencies.auth import get_current_user
 
-router = APIRouter(tags=["Tasks"])
+router = APIRouter(tags=["Tasks"], route_class=TracedRoute)
+
+# Content types accepted by the import endpoint when `format` is not given
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def _rebalance_column(user_id, project_id, task_status: TaskStatus):
+    """Background job: respread a column's order keys with a dedicated session."""
+    db = SessionLocal()
+    try:
+        TaskService.rebalance_column(db, user_id, project_id, task_status)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _flush_task_update(key, fields: dict) -> TaskResponse:
+    """Coalescer flush: apply the merged fields of a burst as one update with a dedicated session."""
+    user_id, task_id = key
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        return TaskService.update_task(db, user, str(task_id), TaskUpdate(**fields))
+    finally:
+        db.close()
+
+
+# Merges bursts of PUT /tasks/{id} when TASK_UPDATE_COALESCING is enabled
+task_update_coalescer = WriteCoalescer(settings.task_update_coalesce_window_ms / 1000, _flush_task_update)
 
 
 @router.get("/tasks", response_model=List[TaskResponse])
 def get_all_tasks(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,status,priority"),
+    include_archived: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all tasks for the authenticated user.
+    Pass `fields` to return only the listed fields, and `include_archived`
+    to include archived completed tasks.
+    """
+    tasks = TaskService.get_user_tasks(db, current_user, fields, include_archived)
+    return JSONResponse(tasks) if fields else tasks
+
+
+@router.get("/tasks/calendar", response_model=Union[List[TaskResponse], List[CalendarDay]])
+def get_calendar(
+    start: str = Query(..., alias="from", description="Start of the range (inclusive), ISO 8601"),
+    end: str = Query(..., alias="to", description="End of the range (exclusive), ISO 8601"),
+    group_by: Optional[str] = Query(None, pattern="^day$", description="Set to `day` for per-day counts"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get tasks due within a date range, ordered by due date.
+    With `group_by=day`, returns one row per day (UTC) with task counts.
     """
-    return TaskService.get_user_tasks(db, current_user)
+    return TaskService.get_calendar(db, current_user, start, end, group_by)
+
+
+@router.get("/tasks/overdue", response_model=List[TaskResponse])
+def get_overdue_tasks(
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get open tasks past their due date, most overdue first.
+    """
+    return TaskService.get_overdue_tasks(db, current_user, limit)
 
 
 @router.get("/projects/{project_id}/tasks", response_model=List[TaskResponse])
 def get_project_tasks(
     project_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,status,priority"),
+    include_archived: bool = False,
+    sort: str = Query("created", pattern="^(created|position)$", description="`position` for board order"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all tasks for a specific project.
+    Pass `fields` to return only the listed fields, and `include_archived`
+    to include archived completed tasks. With `sort=position`, tasks are
+    grouped by status and in their manual (board) order.
     """
-    return TaskService.get_project_tasks(db, current_user, project_id)
+    tasks = TaskService.get_project_tasks(db, current_user, project_id, fields, include_archived, sort)
+    return JSONResponse(tasks) if fields else tasks
 
 
 @router.post("/projects/{project_id}/tasks", response_model=TaskResponse)
 def create_task(
     project_id: str,
     task_data: TaskCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create a new task in a project.
+    Retries carrying the same `Idempotency-Key` get the original response.
     """
-    return TaskService.create_task(db, current_user, project_id, task_data)
+    return run_idempotent(
+        response,
+        idempotency_key,
+        current_user.id,
+        f"create_task:{project_id}",
+        task_data,
+        lambda: TaskService.create_task(db, current_user, project_id, task_data)
+    )
+
+
+@router.post("/projects/{project_id}/tasks/import", response_model=TaskImportResponse)
+async def import_tasks(
+    project_id: str,
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Bulk-import tasks into a project from a CSV (with a header row) or
+    NDJSON request body. Invalid rows are skipped and reported by line.
+    The format comes from `format` or the Content-Type header.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    import_format = import_format or IMPORT_CONTENT_TYPES.get(content_type)
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+    
+    # Authentication already ran a query; end that transaction and give the
+    # connection back to the pool (the single writer connection in SQLite
+    # mode) before waiting on the client. The import checks out a new one.
+    await run_in_threadpool(db.close)
+    
+    # Spool the body (in memory up to a limit, then on disk) so the import
+    # transaction is not held open while a slow client uploads
+    spool = SpooledTemporaryFile(max_size=settings.import_spool_memory_bytes)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.import_max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Import body exceeds {settings.import_max_bytes} bytes"
+                )
+            spool.write(chunk)
+        spool.seek(0)
+        
+        return await run_in_threadpool(
+            ImportService.import_tasks, db, current_user, project_id, spool, import_format
+        )
+    finally:
+        spool.close()
+
+
+@router.get("/projects/{project_id}/tasks/topological", response_model=List[TaskGraphNode])
+def get_topological_order(
+    project_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a project's tasks ordered so every task follows all its blockers.
+    `depth` is the task's level: the longest chain of blockers before it.
+    """
+    return TaskGraphService.get_topological_order(db, current_user, project_id)
 
 
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
 def update_task(
     task_id: str,
     task_data: TaskUpdate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update a task owned by the authenticated user.
+    With TASK_UPDATE_COALESCING=sync, updates to the same task within the
+    coalescing window are merged (last writer wins per field) and committed
+    once, and each caller gets the merged result. With `ack`, the response
+    is 202 with the merged task before the commit, which follows when the
+    window closes.
     """
+    if settings.task_update_coalescing == "sync":
+        return TaskService.update_task_coalesced(db, current_user, task_id, task_data, task_update_coalescer)
+    if settings.task_update_coalescing == "ack":
+        response.status_code = status.HTTP_202_ACCEPTED
+        return TaskService.update_task_coalesced(
+            db, current_user, task_id, task_data, task_update_coalescer, acknowledge=True
+        )
     return TaskService.update_task(db, current_user, task_id, task_data)
 
 
+@router.post("/tasks/{task_id}/move", response_model=TaskResponse)
+def move_task(
+    task_id: str,
+    move: TaskMove,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Move a task after `after_id` and/or before `before_id` in its column,
+    or into another status column. Only the moved task is updated.
+    """
+    task = TaskService.move_task(db, current_user, task_id, move)
+    
+    # Keys grow when tasks keep landing in the same gap; respread the column
+    if len(task.order_key) > settings.order_key_rebalance_length:
+        background_tasks.add_task(_rebalance_column, UUID(task.user_id), UUID(task.project_id), task.status)
+    
+    return task
+
+
+@router.get("/tasks/{task_id}/subtree", response_model=List[TaskGraphNode])
+def get_subtree(
+    task_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a task and all its nested subtasks; `depth` is the nesting level.
+    """
+    return TaskGraphService.get_subtree(db, current_user, task_id)
+
+
+@router.get("/tasks/{task_id}/blockers", response_model=List[TaskGraphNode])
+def get_blockers(
+    task_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get every task a task is transitively blocked by, nearest first;
+    `depth` is 1 for direct blockers.
+    """
+    return TaskGraphService.get_blockers(db, current_user, task_id)
+
+
+@router.post("/tasks/{task_id}/dependencies", response_model=TaskDependencyResponse)
+def add_dependency(
+    task_id: str,
+    dependency: TaskDependencyCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Mark a task as blocked by `depends_on_id`. Returns 409 if the
+    dependency exists or would create a cycle.
+    """
+    return TaskGraphService.add_dependency(db, current_user, task_id, dependency.depends_on_id)
+
+
+@router.delete("/tasks/{task_id}/dependencies/{depends_on_id}")
+def remove_dependency(
+    task_id: str,
+    depends_on_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Remove a dependency between two tasks.
+    """
+    return TaskGraphService.remove_dependency(db, current_user, task_id, depends_on_id)
+
+
 @router.delete("/tasks/{task_id}")
 def delete_task(
     task_id: str,
@@ -66,6 +309,18 @@ def delete_task(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Delete a task owned by the authenticated user.
+    Delete a task owned by the authenticated user, with all its subtasks.
     """
     return TaskService.delete_task(db, current_user, task_id)
+
+
+@router.post("/tasks/{task_id}/restore", response_model=TaskResponse)
+def restore_task(
+    task_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Restore an archived task owned by the authenticated user.
+    """
+    return ArchiveService.restore_task(db, current_user, task_id)
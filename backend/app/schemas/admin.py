@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class QueryStatResponse(BaseModel):
+    """Aggregated timings of one statement issued from one route."""
+    statement: str
+    route: str
+    caller: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    errors: int
+    last_plan: Optional[str] = None
+
+
+class QueryStatsResponse(BaseModel):
+    """Top statements by total time since the worker started."""
+    since: str
+    statements: List[QueryStatResponse]
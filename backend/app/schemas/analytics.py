@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ThroughputDay(BaseModel):
+    """Task counts of one day."""
+    date: str
+    created: int
+    completed: int
+    deleted: int
+
+
+class ThroughputResponse(BaseModel):
+    """Schema for daily task throughput; `rolled_up_to` is when the rollup last ran."""
+    days: List[ThroughputDay]
+    created: int
+    completed: int
+    deleted: int
+    rolled_up_to: Optional[str]
+
+
+class CycleTimeDay(BaseModel):
+    """In-progress spells that ended on one day and their average length."""
+    date: str
+    count: int
+    average_seconds: Optional[float]
+
+
+class CycleTimeResponse(BaseModel):
+    """Schema for time spent in in_progress, per day and over the range."""
+    days: List[CycleTimeDay]
+    count: int
+    average_seconds: Optional[float]
+    rolled_up_to: Optional[str]
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class BatchOperation(BaseModel):
+    """
+    One API call within a batch. Strings in `path` and `body` may refer to
+    an earlier operation's result as `${op_id}` (its `id`) or
+    `${op_id.field}`.
+    """
+    id: Optional[str] = Field(None, min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+    method: str
+    path: str
+    body: Optional[dict] = None
+
+
+class BatchRequest(BaseModel):
+    """
+    Schema for a batch of operations, run in order in one transaction.
+    With `atomic`, the first failure rolls back the whole batch; otherwise
+    each operation succeeds or fails on its own.
+    """
+    operations: List[BatchOperation] = Field(..., min_length=1)
+    atomic: bool = False
+
+
+class BatchResult(BaseModel):
+    """Outcome of one operation: the status and body the API call would have returned."""
+    id: Optional[str]
+    status: int
+    body: Any
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch response, with one result per operation in request order."""
+    results: List[BatchResult]
+    committed: bool
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+
+from .auth import UserResponse
+from .project import ProjectResponse
+from .task import TaskResponse
+
+
+class BootstrapResponse(BaseModel):
+    """Schema for everything the app needs on startup."""
+    user: UserResponse
+    projects: List[ProjectResponse]
+    tasks: List[TaskResponse]
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
+from app.db.models import ProjectRole
+
 
 class ProjectCreate(BaseModel):
     """Schema for creating a project."""
@@ -26,6 +28,27 @@ class ProjectResponse(BaseModel):
     color: str
     task_count: int
     created_at: str
+    updated_at: str
     
     class Config:
         from_attributes = True
+
+
+class ProjectMemberCreate(BaseModel):
+    """Schema for sharing a project with another user."""
+    email: EmailStr
+    role: ProjectRole = ProjectRole.VIEWER
+
+
+class ProjectMemberUpdate(BaseModel):
+    """Schema for changing a member's role."""
+    role: ProjectRole
+
+
+class ProjectMemberResponse(BaseModel):
+    """Schema for a project member."""
+    user_id: str
+    name: str
+    email: str
+    role: ProjectRole
+    created_at: str
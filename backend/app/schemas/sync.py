@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List
+
+from .project import ProjectResponse
+from .task import TaskResponse
+
+
+class SyncDeleted(BaseModel):
+    """IDs of entities deleted since the sync token."""
+    projects: List[str] = []
+    tasks: List[str] = []
+
+
+class SyncResponse(BaseModel):
+    """Schema for a delta sync response."""
+    projects: List[ProjectResponse]
+    tasks: List[TaskResponse]
+    deleted: SyncDeleted
+    next_token: str
+    full: bool
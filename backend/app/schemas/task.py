@@ -1,23 +1,27 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
+from app.db.models import TaskStatus, TaskPriority
+
 
 class TaskCreate(BaseModel):
     """Schema for creating a task."""
     title: str = Field(..., min_length=1, max_length=255)
     description: Optional[str] = None
-    status: Optional[str] = "todo"
-    priority: Optional[str] = "medium"
+    status: Optional[TaskStatus] = TaskStatus.TODO
+    priority: Optional[TaskPriority] = TaskPriority.MEDIUM
     due_date: Optional[str] = None
+    # Makes the new task a subtask; the parent must be in the same project
+    parent_id: Optional[str] = None
 
 
 class TaskUpdate(BaseModel):
     """Schema for updating a task."""
     title: Optional[str] = Field(None, min_length=1, max_length=255)
     description: Optional[str] = None
-    status: Optional[str] = None
-    priority: Optional[str] = None
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
     due_date: Optional[str] = None
 
 
@@ -26,13 +30,77 @@ class TaskResponse(BaseModel):
     id: str
     user_id: str
     project_id: str
+    parent_id: Optional[str] = None
     title: str
     description: Optional[str]
-    status: str
-    priority: str
+    status: TaskStatus
+    priority: TaskPriority
     due_date: Optional[str]
+    order_key: str
     created_at: str
     updated_at: str
     
     class Config:
         from_attributes = True
+
+
+class TaskMove(BaseModel):
+    """
+    Schema for moving a task within or between status columns.
+    Give the task it should follow (`after_id`), precede (`before_id`) or
+    both; with neither, it goes to the end of the column.
+    """
+    status: Optional[TaskStatus] = None
+    after_id: Optional[str] = None
+    before_id: Optional[str] = None
+
+
+class TaskGraphNode(TaskResponse):
+    """
+    Schema for a task in a subtree, blocker or topological listing. `depth`
+    is the level below the root, the blocking distance, or the topological
+    level respectively.
+    """
+    depth: int
+
+
+class TaskDependencyCreate(BaseModel):
+    """Schema for marking a task as blocked by another task."""
+    depends_on_id: str
+
+
+class TaskDependencyResponse(BaseModel):
+    """Schema for task dependency response."""
+    task_id: str
+    depends_on_id: str
+    created_at: str
+
+
+class CalendarDay(BaseModel):
+    """Schema for one day of the grouped calendar view."""
+    date: str
+    total: int
+    completed: int
+
+
+class TaskImportFieldError(BaseModel):
+    """One validation failure within an imported record."""
+    field: str
+    message: str
+
+
+class TaskImportError(BaseModel):
+    """Validation failures of one imported record, by line in the upload."""
+    line: int
+    errors: List[TaskImportFieldError]
+
+
+class TaskImportResponse(BaseModel):
+    """Schema for the result of a bulk task import."""
+    total: int
+    imported: int
+    failed: int
+    errors: List[TaskImportError]
+    errors_truncated: bool
+    elapsed_seconds: float
+    rows_per_second: float
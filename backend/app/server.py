@@ -0,0 +1,104 @@
+"""
+Production entry point: `python -m app`.
+
+Runs uvicorn with uvloop and httptools when they are installed, one worker
+per available CPU unless WORKERS is set, and recycles each worker after
+MAX_REQUESTS (plus up to MAX_REQUESTS_JITTER, so workers do not all restart
+at once). The effective configuration is logged on startup.
+"""
+import importlib.util
+import logging
+import os
+import random
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class RecyclingServer(uvicorn.Server):
+    """uvicorn server whose request limit gets a per-worker random jitter."""
+    
+    def run(self, sockets=None):
+        # Runs in the worker process, so each worker draws its own limit
+        if self.config.limit_max_requests and settings.max_requests_jitter > 0:
+            self.config.limit_max_requests += random.randint(0, settings.max_requests_jitter)
+        super().run(sockets=sockets)
+
+
+def build_config() -> uvicorn.Config:
+    """Resolve the uvicorn configuration from settings."""
+    return uvicorn.Config(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers or available_cpus(),
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        timeout_keep_alive=settings.keep_alive_seconds,
+        timeout_graceful_shutdown=settings.graceful_shutdown_seconds,
+        limit_max_requests=settings.max_requests or None,
+        backlog=settings.backlog,
+        proxy_headers=True,
+        access_log=settings.access_log
+    )
+
+
+def log_config(config: uvicorn.Config):
+    """Log the effective server configuration as one key=value line."""
+    pool_size = settings.db_pool_size + settings.db_max_overflow
+    max_requests = (
+        f"{config.limit_max_requests}+{settings.max_requests_jitter}"
+        if config.limit_max_requests else "off"
+    )
+    logger.info(
+        "Server config: workers=%d loop=%s http=%s threadpool=%d keep_alive=%ds "
+        "max_requests=%s graceful_shutdown=%ss backlog=%d db_connections_max=%d",
+        config.workers,
+        config.loop,
+        config.http,
+        settings.threadpool_size,
+        config.timeout_keep_alive,
+        max_requests,
+        config.timeout_graceful_shutdown,
+        config.backlog,
+        config.workers * pool_size
+    )
+
+
+def main():
+    config = build_config()
+    log_config(config)
+    server = RecyclingServer(config=config)
+    
+    # The supervisor restarts workers that exit, which is what makes
+    # max_requests recycle rather than shut down, even with one worker
+    if config.workers > 1 or config.limit_max_requests:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
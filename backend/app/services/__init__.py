@@ -1,3 +1,12 @@
 # Services module
 from .auth_service import AuthService
 from .task_service import TaskService
+from .project_service import ProjectService
+from .sync_service import SyncService
+from .archive_service import ArchiveService
+from .bootstrap_service import BootstrapService
+from .import_service import ImportService
+from .task_graph_service import TaskGraphService
+from .analytics_service import AnalyticsService
+from .permission_service import PermissionService
+from .batch_service import BatchService
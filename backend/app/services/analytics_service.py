@@ -0,0 +1,250 @@
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, case, extract, func, insert, select, text
+from sqlalchemy.orm import Session, aliased
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.db.models import (
+    TaskEvent, TaskEventKind, TaskDailyStats, TaskStatus, TASK_STATUS_CODES, RollupWatermark, User
+)
+from app.schemas.analytics import ThroughputDay, ThroughputResponse, CycleTimeDay, CycleTimeResponse
+from app.services.permission_service import PermissionService
+
+# RollupWatermark row of the task_events -> task_daily_stats job
+ROLLUP_NAME = "task_daily_stats"
+
+IN_PROGRESS = TASK_STATUS_CODES[TaskStatus.IN_PROGRESS]
+COMPLETED = TASK_STATUS_CODES[TaskStatus.COMPLETED]
+
+
+class AnalyticsService:
+    """
+    Service class for task analytics. Writes append to task_events; the
+    rollup job folds them into task_daily_stats, and the read endpoints
+    only ever touch the rollups, so they cost O(days) however many
+    events exist.
+    """
+    
+    @staticmethod
+    def _seconds_between(db: Session, start, end):
+        """SQL expression for the seconds from `start` to `end`."""
+        if db.get_bind().dialect.name == "postgresql":
+            return extract("epoch", end - start)
+        return (func.julianday(end) - func.julianday(start)) * 86400
+    
+    @staticmethod
+    def rollup(db: Session, since: Optional[datetime] = None) -> Tuple[Optional[date], int]:
+        """
+        Recompute task_daily_stats from the events of every day starting
+        `analytics_rollup_lookback_days` before the watermark (or from
+        `since`), in one transaction. Recomputing whole days keeps the job
+        idempotent and picks up events committed after the previous run.
+        Returns the first recomputed day (None for everything) and the
+        number of rows written.
+        """
+        started_at = datetime.utcnow()
+        if db.get_bind().dialect.name == "postgresql":
+            # One rollup at a time; plain reads of the stats are not blocked
+            db.execute(text(f"LOCK TABLE {TaskDailyStats.__tablename__} IN EXCLUSIVE MODE"))
+        
+        if since is None:
+            watermark = db.get(RollupWatermark, ROLLUP_NAME)
+            if watermark is not None:
+                since = watermark.rolled_up_to - timedelta(days=settings.analytics_rollup_lookback_days)
+        start_day = since.date() if since is not None else None
+        
+        # Time a task entered in_progress before each event, for the
+        # events that take it out of in_progress
+        entered = aliased(TaskEvent)
+        entered_at = select(func.max(entered.occurred_at)).where(
+            entered.task_id == TaskEvent.task_id,
+            entered.kind.in_([TaskEventKind.CREATED, TaskEventKind.STATUS_CHANGED]),
+            entered.to_value == IN_PROGRESS,
+            entered.occurred_at <= TaskEvent.occurred_at,
+            entered.id < TaskEvent.id
+        ).scalar_subquery()
+        leaves_in_progress = and_(
+            TaskEvent.kind == TaskEventKind.STATUS_CHANGED,
+            TaskEvent.from_value == IN_PROGRESS
+        )
+        events = select(
+            TaskEvent.user_id,
+            TaskEvent.project_id,
+            func.date(TaskEvent.occurred_at).label("day"),
+            case((TaskEvent.kind == TaskEventKind.CREATED, 1), else_=0).label("created"),
+            case(
+                (and_(TaskEvent.kind != TaskEventKind.PRIORITY_CHANGED, TaskEvent.to_value == COMPLETED), 1),
+                else_=0
+            ).label("completed"),
+            case((TaskEvent.kind == TaskEventKind.DELETED, 1), else_=0).label("deleted"),
+            case(
+                (leaves_in_progress, AnalyticsService._seconds_between(db, entered_at, TaskEvent.occurred_at)),
+                else_=None
+            ).label("in_progress_seconds")
+        )
+        if start_day is not None:
+            events = events.where(TaskEvent.occurred_at >= start_day)
+        events = events.subquery()
+        
+        daily = select(
+            events.c.user_id,
+            events.c.project_id,
+            events.c.day,
+            func.sum(events.c.created),
+            func.sum(events.c.completed),
+            func.sum(events.c.deleted),
+            # Spells whose start is unknown count in neither total
+            func.count(events.c.in_progress_seconds),
+            func.coalesce(func.round(func.sum(events.c.in_progress_seconds)), 0)
+        ).group_by(events.c.user_id, events.c.project_id, events.c.day)
+        
+        stale = db.query(TaskDailyStats)
+        if start_day is not None:
+            stale = stale.filter(TaskDailyStats.day >= start_day)
+        stale.delete(synchronize_session=False)
+        
+        written = db.execute(
+            insert(TaskDailyStats).from_select(
+                ["user_id", "project_id", "day", "created", "completed", "deleted",
+                 "in_progress_count", "in_progress_seconds"],
+                daily
+            )
+        ).rowcount
+        
+        watermark = db.get(RollupWatermark, ROLLUP_NAME)
+        if watermark is None:
+            db.add(RollupWatermark(name=ROLLUP_NAME, rolled_up_to=started_at))
+        else:
+            watermark.rolled_up_to = started_at
+        db.commit()
+        
+        return start_day, written
+    
+    @staticmethod
+    def _range(
+        db: Session,
+        user: User,
+        start: Optional[str],
+        end: Optional[str],
+        project_id: Optional[str]
+    ) -> Tuple[date, date, list]:
+        """Resolve [start, end) days (default: the last analytics_default_days) and the stats filter."""
+        try:
+            end_day = date.fromisoformat(end) if end else datetime.utcnow().date() + timedelta(days=1)
+            start_day = date.fromisoformat(start) if start else end_day - timedelta(days=settings.analytics_default_days)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Dates must be in YYYY-MM-DD format"
+            )
+        
+        if end_day <= start_day:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'to' must be after 'from'"
+            )
+        if (end_day - start_day).days > settings.analytics_max_days:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Date range can span at most {settings.analytics_max_days} days"
+            )
+        
+        if project_id:
+            project_uuid, owner_id = PermissionService.require_project(db, user, project_id)
+            criteria = [TaskDailyStats.user_id == owner_id, TaskDailyStats.project_id == project_uuid]
+        else:
+            # Stats of every project the user is a member of
+            access = PermissionService.access(db, user)
+            criteria = [
+                TaskDailyStats.user_id.in_(access.owner_ids),
+                TaskDailyStats.project_id.in_(access.project_ids)
+            ]
+        
+        criteria += [
+            TaskDailyStats.day >= start_day,
+            TaskDailyStats.day < end_day
+        ]
+        
+        return start_day, end_day, criteria
+    
+    @staticmethod
+    def _days(start_day: date, end_day: date) -> List[date]:
+        return [start_day + timedelta(days=offset) for offset in range((end_day - start_day).days)]
+    
+    @staticmethod
+    def _rolled_up_to(db: Session) -> Optional[str]:
+        watermark = db.get(RollupWatermark, ROLLUP_NAME)
+        return watermark.rolled_up_to.isoformat() if watermark else None
+    
+    @staticmethod
+    def get_throughput(
+        db: Session,
+        user: User,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> ThroughputResponse:
+        """Tasks created, completed and deleted per day in [start, end); days without activity are zeros."""
+        start_day, end_day, criteria = AnalyticsService._range(db, user, start, end, project_id)
+        
+        rows = db.query(
+            TaskDailyStats.day,
+            func.sum(TaskDailyStats.created),
+            func.sum(TaskDailyStats.completed),
+            func.sum(TaskDailyStats.deleted)
+        ).filter(*criteria).group_by(TaskDailyStats.day).all()
+        by_day = {day: (created, completed, deleted) for day, created, completed, deleted in rows}
+        
+        days = []
+        for day in AnalyticsService._days(start_day, end_day):
+            created, completed, deleted = by_day.get(day, (0, 0, 0))
+            days.append(ThroughputDay(date=day.isoformat(), created=created, completed=completed, deleted=deleted))
+        
+        return ThroughputResponse(
+            days=days,
+            created=sum(day.created for day in days),
+            completed=sum(day.completed for day in days),
+            deleted=sum(day.deleted for day in days),
+            rolled_up_to=AnalyticsService._rolled_up_to(db)
+        )
+    
+    @staticmethod
+    def get_cycle_time(
+        db: Session,
+        user: User,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> CycleTimeResponse:
+        """
+        Average time tasks spent in in_progress, per day the spell ended
+        in [start, end) and over the whole range.
+        """
+        start_day, end_day, criteria = AnalyticsService._range(db, user, start, end, project_id)
+        
+        rows = db.query(
+            TaskDailyStats.day,
+            func.sum(TaskDailyStats.in_progress_count),
+            func.sum(TaskDailyStats.in_progress_seconds)
+        ).filter(*criteria).group_by(TaskDailyStats.day).all()
+        by_day = {day: (count, seconds) for day, count, seconds in rows}
+        
+        days = []
+        total_count = total_seconds = 0
+        for day in AnalyticsService._days(start_day, end_day):
+            count, seconds = by_day.get(day, (0, 0))
+            total_count += count
+            total_seconds += seconds
+            days.append(CycleTimeDay(
+                date=day.isoformat(),
+                count=count,
+                average_seconds=round(seconds / count, 1) if count else None
+            ))
+        
+        return CycleTimeResponse(
+            days=days,
+            count=total_count,
+            average_seconds=round(total_seconds / total_count, 1) if total_count else None,
+            rolled_up_to=AnalyticsService._rolled_up_to(db)
+        )
@@ -0,0 +1,149 @@
+from typing import Callable, Optional
+from uuid import UUID
+from datetime import datetime, timedelta
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session, aliased
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.db.models import Task, TaskArchive, TaskStatus, ProjectRole, Tombstone, SyncEntity, User
+from app.schemas.task import TaskResponse
+from app.services.permission_service import PermissionService
+from app.services.task_service import TaskService
+
+# Columns copied between the hot and archive tables. Taken from Task so a
+# column added there but not to TaskArchive fails loudly instead of being dropped.
+TASK_COLUMNS = [column.name for column in Task.__table__.columns]
+
+
+class ArchiveService:
+    """Service class for moving completed tasks between the hot and archive tables."""
+    
+    @staticmethod
+    def archive_completed_tasks(
+        db: Session,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        on_batch: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """
+        Move completed tasks not updated for `older_than_days` into the archive,
+        one bounded batch per transaction. Returns the number of tasks archived.
+        Tasks that still have subtasks stay until those are archived, and
+        archiving a task drops its dependency edges. Delta sync reports an
+        archived task as deleted, from the tombstone left for it.
+        """
+        older_than_days = settings.archive_after_days if older_than_days is None else older_than_days
+        batch_size = settings.archive_batch_size if batch_size is None else batch_size
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        subtask = aliased(Task)
+        total = 0
+        
+        while True:
+            batch = db.query(Task.id).filter(
+                Task.status == TaskStatus.COMPLETED,
+                Task.updated_at < cutoff,
+                ~select(subtask.id).where(
+                    subtask.parent_id == Task.id,
+                    subtask.user_id == Task.user_id
+                ).exists()
+            ).limit(batch_size).with_for_update(skip_locked=True).all()
+            
+            if not batch:
+                db.rollback()
+                break
+            
+            task_ids = [task_id for (task_id,) in batch]
+            archived_at = datetime.utcnow()
+            db.execute(
+                insert(TaskArchive).from_select(
+                    TASK_COLUMNS + ["archived_at"],
+                    select(
+                        *[getattr(Task, name) for name in TASK_COLUMNS],
+                        literal(archived_at)
+                    ).where(Task.id.in_(task_ids))
+                )
+            )
+            db.execute(
+                insert(Tombstone).from_select(
+                    ["entity_id", "entity_type", "user_id", "project_id", "deleted_at"],
+                    select(
+                        Task.id,
+                        literal(SyncEntity.TASK.value),
+                        Task.user_id,
+                        Task.project_id,
+                        literal(archived_at)
+                    ).where(Task.id.in_(task_ids))
+                )
+            )
+            db.query(Task).filter(Task.id.in_(task_ids)).delete(synchronize_session=False)
+            db.commit()
+            
+            total += len(task_ids)
+            if on_batch:
+                on_batch(total)
+        
+        return total
+    
+    @staticmethod
+    def restore_task(db: Session, user: User, task_id: str) -> TaskResponse:
+        """Move an archived task back into the hot table."""
+        try:
+            task_uuid = UUID(task_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid task ID format"
+            )
+        
+        access = PermissionService.access(db, user)
+        archived = db.query(TaskArchive.user_id, TaskArchive.project_id).filter(
+            TaskArchive.id == task_uuid,
+            TaskArchive.user_id.in_(access.owner_ids)
+        ).first() if access.roles else None
+        
+        if not archived or archived.project_id not in access.roles:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Archived task not found"
+            )
+        PermissionService.check_role(access, archived.project_id, ProjectRole.EDITOR)
+        
+        # Restored tasks count as updated now, so delta sync picks them up;
+        # a subtask whose parent is gone comes back as a top-level task
+        parent_id = select(Task.id).where(
+            Task.id == TaskArchive.parent_id,
+            Task.user_id == TaskArchive.user_id
+        ).scalar_subquery()
+        restored = {
+            "updated_at": literal(datetime.utcnow()),
+            "parent_id": parent_id,
+        }
+        restored_columns = [
+            restored[name].label(name) if name in restored else getattr(TaskArchive, name)
+            for name in TASK_COLUMNS
+        ]
+        db.execute(
+            insert(Task).from_select(
+                TASK_COLUMNS,
+                select(*restored_columns).where(
+                    TaskArchive.id == task_uuid,
+                    TaskArchive.user_id == archived.user_id
+                )
+            )
+        )
+        db.query(TaskArchive).filter(
+            TaskArchive.id == task_uuid,
+            TaskArchive.user_id == archived.user_id
+        ).delete(synchronize_session=False)
+        # The task is live again; its tombstone from archiving would tell
+        # clients syncing across both events to drop it
+        db.query(Tombstone).filter(Tombstone.entity_id == task_uuid).delete(synchronize_session=False)
+        db.commit()
+        
+        task = db.query(Task).filter(
+            Task.id == task_uuid,
+            Task.user_id == archived.user_id
+        ).first()
+        
+        return TaskService._to_response(task)
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.db.models import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import hash_password, verify_and_update_password, create_access_token
 from app.schemas.auth import UserCreate, UserLogin, AuthResponse, UserResponse
 
 
@@ -48,12 +48,24 @@ class AuthService:
         # Find user by email
         user = db.query(User).filter(User.email == credentials.email).first()
         
-        if not user or not verify_password(credentials.password, user.password_hash):
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
+        valid, new_hash = verify_and_update_password(credentials.password, user.password_hash)
+        if not valid:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid email or password"
+            )
+        
+        # Upgrade hashes made with an outdated scheme or cost while we have the password
+        if new_hash:
+            user.password_hash = new_hash
+            db.commit()
+        
         # Generate access token
         access_token = create_access_token(str(user.id))
         
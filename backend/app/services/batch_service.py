@@ -0,0 +1,267 @@
+import logging
+import re
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.coalescer import WriteCoalescer
+from app.core.config import settings
+from app.core.permissions import permission_cache
+from app.core.tracing import span
+from app.db.models import User
+from app.schemas.batch import BatchOperation, BatchRequest, BatchResponse, BatchResult
+from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.schemas.task import TaskCreate, TaskUpdate, TaskMove, TaskDependencyCreate
+from app.services.project_service import ProjectService
+from app.services.task_graph_service import TaskGraphService
+from app.services.task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+# `${op_id}` or `${op_id.field}`
+REFERENCE = re.compile(r"\$\{([A-Za-z0-9_-]+)(?:\.([A-Za-z_]+))?\}")
+
+# Handler(db, user, body, **path params) of each route a batch can run, by
+# route name: the service call behind the route. Paths and methods come
+# from the app's registered routes.
+HANDLERS: Dict[str, Callable[..., Any]] = {
+    "create_project": lambda db, user, body: ProjectService.create_project(
+        db, user, ProjectCreate.model_validate(body)
+    ),
+    "update_project": lambda db, user, body, project_id: ProjectService.update_project(
+        db, user, project_id, ProjectUpdate.model_validate(body)
+    ),
+    "delete_project": lambda db, user, body, project_id: ProjectService.delete_project(
+        db, user, project_id
+    ),
+    "create_task": lambda db, user, body, project_id: TaskService.create_task(
+        db, user, project_id, TaskCreate.model_validate(body)
+    ),
+    "update_task": lambda db, user, body, task_id: TaskService.update_task(
+        db, user, task_id, TaskUpdate.model_validate(body)
+    ),
+    "move_task": lambda db, user, body, task_id: TaskService.move_task(
+        db, user, task_id, TaskMove.model_validate(body)
+    ),
+    "delete_task": lambda db, user, body, task_id: TaskService.delete_task(
+        db, user, task_id
+    ),
+    "add_dependency": lambda db, user, body, task_id: TaskGraphService.add_dependency(
+        db, user, task_id, TaskDependencyCreate.model_validate(body).depends_on_id
+    ),
+    "remove_dependency": lambda db, user, body, task_id, depends_on_id: TaskGraphService.remove_dependency(
+        db, user, task_id, depends_on_id
+    ),
+}
+
+
+class BatchService:
+    """
+    Service class for running many project and task operations in one
+    request: one authentication, one transaction and one commit.
+    """
+    
+    @staticmethod
+    def _resolve(value: str, results: Dict[str, Optional[dict]]) -> str:
+        """Substitute `${op_id}` references with fields of earlier results."""
+        def substitute(match: "re.Match[str]") -> str:
+            op_id, field = match.group(1), match.group(2) or "id"
+            if op_id not in results:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown reference '{op_id}': it must name an earlier operation"
+                )
+            result = results[op_id]
+            if result is None:
+                raise HTTPException(
+                    status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                    detail=f"Referenced operation '{op_id}' failed"
+                )
+            if not isinstance(result, dict) or field not in result:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Result of '{op_id}' has no field '{field}'"
+                )
+            return str(result[field])
+        return REFERENCE.sub(substitute, value)
+    
+    @staticmethod
+    def _resolve_body(value: Any, results: Dict[str, Optional[dict]]) -> Any:
+        if isinstance(value, str):
+            return BatchService._resolve(value, results)
+        if isinstance(value, dict):
+            return {key: BatchService._resolve_body(item, results) for key, item in value.items()}
+        if isinstance(value, list):
+            return [BatchService._resolve_body(item, results) for item in value]
+        return value
+    
+    @staticmethod
+    def _match(routes: Sequence[APIRoute], method: str, path: str) -> Optional[Tuple[APIRoute, Dict[str, str]]]:
+        """The batchable route serving `method path`, with its path parameters."""
+        path = path.rstrip("/") or "/"
+        for route in routes:
+            match = route.path_regex.match(path)
+            if match and method in route.methods:
+                return route, match.groupdict()
+        return None
+    
+    @staticmethod
+    def _run_operation(
+        db: Session,
+        user: User,
+        routes: Sequence[APIRoute],
+        operation: BatchOperation,
+        results: Dict[str, Optional[dict]]
+    ) -> Any:
+        path = BatchService._resolve(operation.path, results)
+        method = operation.method.upper()
+        matched = BatchService._match(routes, method, path)
+        if matched is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{method} {path} cannot be batched"
+            )
+        route, path_params = matched
+        body = BatchService._resolve_body(operation.body or {}, results)
+        with span(f"batch {method} {route.path}"):
+            return jsonable_encoder(HANDLERS[route.name](db, user, body, **path_params))
+    
+    @staticmethod
+    def _settle_coalesced(
+        db: Session,
+        user: User,
+        routes: Sequence[APIRoute],
+        batch: BatchRequest,
+        coalescer: WriteCoalescer
+    ):
+        """
+        Flush the user's coalesced task updates still pending for the tasks
+        the batch names, so that they land before the batch's writes rather
+        than overwrite them. Tasks named by a reference are created by the
+        batch and have none.
+        """
+        keys: List[Hashable] = []
+        for operation in batch.operations:
+            if REFERENCE.search(operation.path):
+                continue
+            matched = BatchService._match(routes, operation.method.upper(), operation.path)
+            if matched is None or "task_id" not in matched[1]:
+                continue
+            try:
+                keys.append((user.id, UUID(matched[1]["task_id"])))
+            except ValueError:
+                continue
+        
+        if keys:
+            # The flushes use their own sessions; give this one's connection
+            # back first, since SQLite mode has a single writer connection
+            db.close()
+            for key in keys:
+                coalescer.flush(key)
+    
+    @staticmethod
+    def run_batch(
+        db: Session,
+        user: User,
+        batch: BatchRequest,
+        app_routes: Sequence[Any],
+        coalescer: Optional[WriteCoalescer] = None
+    ) -> BatchResponse:
+        """
+        Run a batch's operations in order, each through the service call of
+        the app route it names. Operations share the request's transaction,
+        each in its own savepoint: the services' commits only release it,
+        and a failed operation rolls back to it, leaving the others in place.
+        The transaction is committed once at the end, or rolled back if the
+        batch is atomic and an operation failed. Task updates are never
+        coalesced within a batch, as that would take them out of its
+        transaction; with a `coalescer`, the updates it holds for the
+        batch's tasks are flushed first.
+        """
+        if len(batch.operations) > settings.batch_max_operations:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A batch can hold at most {settings.batch_max_operations} operations"
+            )
+        op_ids = [operation.id for operation in batch.operations if operation.id]
+        if len(op_ids) != len(set(op_ids)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Operation ids must be unique within a batch"
+            )
+        
+        routes = [route for route in app_routes if isinstance(route, APIRoute) and route.name in HANDLERS]
+        if coalescer is not None:
+            BatchService._settle_coalesced(db, user, routes, batch, coalescer)
+        
+        operations_db = Session(bind=db.connection(), join_transaction_mode="create_savepoint")
+        results: Dict[str, Optional[dict]] = {}
+        batch_results: List[BatchResult] = []
+        failed = False
+        try:
+            batch_user = operations_db.get(User, user.id)
+            for operation in batch.operations:
+                if failed and batch.atomic:
+                    batch_results.append(BatchResult(
+                        id=operation.id,
+                        status=status.HTTP_424_FAILED_DEPENDENCY,
+                        body={"detail": "Not run: an earlier operation failed"}
+                    ))
+                    continue
+                
+                try:
+                    body = BatchService._run_operation(operations_db, batch_user, routes, operation, results)
+                    code = status.HTTP_200_OK
+                except HTTPException as exc:
+                    operations_db.rollback()
+                    code, body = exc.status_code, {"detail": exc.detail}
+                except ValidationError as exc:
+                    operations_db.rollback()
+                    # As validation_exception_handler reports it; the body was
+                    # validated on its own, so there is no 'body' to skip in loc
+                    code = status.HTTP_400_BAD_REQUEST
+                    body = {
+                        "detail": "Validation error",
+                        "errors": [
+                            {"field": ".".join(str(loc) for loc in error["loc"]), "message": error["msg"]}
+                            for error in exc.errors()
+                        ]
+                    }
+                except IntegrityError as exc:
+                    operations_db.rollback()
+                    code = status.HTTP_400_BAD_REQUEST
+                    body = {
+                        "detail": "Database constraint violation",
+                        "message": str(exc.orig) if exc.orig else "Integrity error"
+                    }
+                except Exception:
+                    logger.exception("Batch operation %s %s failed", operation.method, operation.path)
+                    operations_db.rollback()
+                    code = status.HTTP_500_INTERNAL_SERVER_ERROR
+                    body = {
+                        "detail": "Internal server error",
+                        "message": "An unexpected error occurred"
+                    }
+                
+                if code >= status.HTTP_400_BAD_REQUEST:
+                    failed = True
+                if operation.id:
+                    results[operation.id] = body if code < status.HTTP_400_BAD_REQUEST else None
+                batch_results.append(BatchResult(id=operation.id, status=code, body=body))
+        finally:
+            operations_db.close()
+        
+        committed = not (failed and batch.atomic)
+        if committed:
+            db.commit()
+        else:
+            db.rollback()
+            # Access cached during the batch may include projects it created
+            permission_cache.discard(user.id)
+        
+        return BatchResponse(results=batch_results, committed=committed)
@@ -0,0 +1,64 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Project, Task, User
+from app.schemas.bootstrap import BootstrapResponse
+from app.services.auth_service import AuthService
+from app.services.permission_service import PermissionService
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService
+
+
+class BootstrapService:
+    """Service class for the app startup payload."""
+    
+    @staticmethod
+    def get_bootstrap(db: Session, user: User) -> BootstrapResponse:
+        """
+        Get the user, their projects with task counts and the most recent
+        tasks in two queries, read from one consistent read-only snapshot.
+        """
+        user_response = AuthService.get_current_user(user)
+        access = PermissionService.access(db, user)
+        owner_ids, project_ids = access.owner_ids, access.project_ids
+        
+        # End the transaction the auth lookup opened, so the reads below
+        # run in a fresh read-only snapshot
+        db.rollback()
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"))
+        
+        task_counts = select(
+            Task.project_id,
+            func.count(Task.id).label("task_count")
+        ).where(
+            Task.user_id.in_(owner_ids),
+            Task.project_id.in_(project_ids)
+        ).group_by(Task.project_id).subquery()
+        
+        projects = db.query(
+            Project,
+            func.coalesce(task_counts.c.task_count, 0)
+        ).outerjoin(
+            task_counts, task_counts.c.project_id == Project.id
+        ).filter(
+            Project.id.in_(project_ids)
+        ).order_by(Project.created_at.desc()).all()
+        
+        tasks = db.query(Task).filter(
+            Task.user_id.in_(owner_ids),
+            Task.project_id.in_(project_ids)
+        ).order_by(Task.created_at.desc()).limit(settings.bootstrap_task_limit).all()
+        
+        response = BootstrapResponse(
+            user=user_response,
+            projects=[
+                ProjectService._to_response(project, task_count)
+                for project, task_count in projects
+            ],
+            tasks=[TaskService._to_response(task) for task in tasks]
+        )
+        db.rollback()
+        
+        return response
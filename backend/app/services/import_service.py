@@ -0,0 +1,334 @@
+import codecs
+import csv
+import io
+import json
+import time
+import uuid
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy import DateTime, SmallInteger, Text, func, insert, literal, select, text
+from sqlalchemy.sql import column, table
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.db.models import (
+    Task, TaskEvent, TaskEventKind, TaskStatus, TaskPriority, TASK_STATUS_CODES, TASK_PRIORITY_CODES,
+    Project, ProjectRole, User
+)
+from app.schemas.task import TaskCreate, TaskImportError, TaskImportFieldError, TaskImportResponse
+from app.services.permission_service import PermissionService
+from app.services.task_service import TaskService
+from app.utils.ordering import keys_after
+
+# A single CSV record or NDJSON line larger than this aborts the import
+MAX_LINE_BYTES = 1024 * 1024
+
+# Stands in for an NDJSON line that is not valid JSON
+INVALID_JSON = object()
+
+# Session-local staging table on PostgreSQL, dropped when the import commits
+STAGING_TABLE = "task_import_staging"
+staging = table(
+    STAGING_TABLE,
+    column("title", Text),
+    column("description", Text),
+    column("status", SmallInteger),
+    column("priority", SmallInteger),
+    column("due_date", DateTime),
+    column("order_key", Text),
+)
+
+# (title, description, status, priority, due_date) of a record that passed validation
+ValidatedRow = Tuple[str, Optional[str], TaskStatus, TaskPriority, Optional[datetime]]
+# ... plus its order key
+ImportRow = Tuple[str, Optional[str], TaskStatus, TaskPriority, Optional[datetime], str]
+
+
+class ImportService:
+    """Service class for bulk-loading tasks from CSV or NDJSON uploads."""
+    
+    @staticmethod
+    def import_tasks(
+        db: Session,
+        user: User,
+        project_id: str,
+        source: BinaryIO,
+        import_format: str
+    ) -> TaskImportResponse:
+        """
+        Validate every record against the TaskCreate rules and insert the
+        valid ones into the project in chunks of `import_chunk_size`.
+        Invalid records are skipped and reported; the valid ones are
+        committed in a single transaction. Tasks are stored under the
+        project owner, whichever editor imports them.
+        """
+        project_uuid, _ = PermissionService.require_project(db, user, project_id, ProjectRole.EDITOR)
+        project = db.get(Project, project_uuid)
+        
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+        
+        started = time.perf_counter()
+        use_copy = db.get_bind().dialect.name == "postgresql"
+        if use_copy:
+            db.execute(text(
+                f"CREATE TEMP TABLE {STAGING_TABLE} ("
+                "title TEXT NOT NULL, description TEXT, status SMALLINT NOT NULL, "
+                "priority SMALLINT NOT NULL, due_date TIMESTAMP, order_key TEXT NOT NULL"
+                ") ON COMMIT DROP"
+            ))
+        
+        now = datetime.utcnow()
+        records = ImportService._csv_records(source) if import_format == "csv" else ImportService._ndjson_records(source)
+        total = imported = failed = 0
+        errors: List[TaskImportError] = []
+        chunk: List[ImportRow] = []
+        # Imported tasks are appended to their status column in file order
+        order_keys: Dict[TaskStatus, Iterator[str]] = {}
+        
+        for line, record in records:
+            total += 1
+            row, row_errors = ImportService._validate(record)
+            if row_errors:
+                failed += 1
+                if len(errors) < settings.import_max_errors:
+                    errors.append(TaskImportError(line=line, errors=row_errors))
+                continue
+            
+            task_status = row[2]
+            if task_status not in order_keys:
+                order_keys[task_status] = keys_after(
+                    TaskService._last_order_key(db, project.user_id, project.id, task_status)
+                )
+            chunk.append(row + (next(order_keys[task_status]),))
+            if len(chunk) >= settings.import_chunk_size:
+                ImportService._load_chunk(db, project, chunk, use_copy, now)
+                imported += len(chunk)
+                chunk = []
+        
+        if chunk:
+            ImportService._load_chunk(db, project, chunk, use_copy, now)
+            imported += len(chunk)
+        
+        if use_copy and imported:
+            # One set-based insert moves every staged row into tasks, and
+            # the same statement logs a created event for each of them
+            inserted = (
+                insert(Task).from_select(
+                    ["id", "user_id", "project_id", "title", "description",
+                     "status", "priority", "due_date", "order_key", "created_at", "updated_at"],
+                    select(
+                        func.gen_random_uuid(),
+                        literal(project.user_id, Task.user_id.type),
+                        literal(project.id, Task.project_id.type),
+                        staging.c.title,
+                        staging.c.description,
+                        staging.c.status,
+                        staging.c.priority,
+                        staging.c.due_date,
+                        staging.c.order_key,
+                        literal(now),
+                        literal(now)
+                    )
+                )
+                .returning(Task.id, Task.status)
+                .cte("inserted")
+            )
+            db.execute(
+                insert(TaskEvent).from_select(
+                    ["user_id", "project_id", "task_id", "kind", "to_value", "occurred_at"],
+                    select(
+                        literal(project.user_id, TaskEvent.user_id.type),
+                        literal(project.id, TaskEvent.project_id.type),
+                        inserted.c.id,
+                        literal(TaskEventKind.CREATED, TaskEvent.kind.type),
+                        inserted.c.status,
+                        literal(now)
+                    )
+                )
+            )
+        db.commit()
+        
+        elapsed = time.perf_counter() - started
+        return TaskImportResponse(
+            total=total,
+            imported=imported,
+            failed=failed,
+            errors=errors,
+            errors_truncated=failed > len(errors),
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(imported / elapsed, 1) if elapsed > 0 else 0.0
+        )
+    
+    @staticmethod
+    def _validate(record) -> Tuple[Optional[ValidatedRow], List[TaskImportFieldError]]:
+        """Apply the TaskCreate rules to one record."""
+        if record is INVALID_JSON:
+            return None, [TaskImportFieldError(field="", message="Invalid JSON")]
+        if not isinstance(record, dict):
+            return None, [TaskImportFieldError(field="", message="Each record must be a JSON object")]
+        
+        try:
+            task_data = TaskCreate.model_validate(record)
+        except ValidationError as exc:
+            return None, [
+                TaskImportFieldError(field=".".join(str(loc) for loc in error["loc"]), message=error["msg"])
+                for error in exc.errors()
+            ]
+        
+        if task_data.parent_id:
+            return None, [TaskImportFieldError(field="parent_id", message="Subtasks cannot be imported")]
+        
+        due_date = None
+        if task_data.due_date:
+            try:
+                due_date = datetime.fromisoformat(task_data.due_date.replace('Z', '+00:00')).replace(tzinfo=None)
+            except ValueError:
+                return None, [TaskImportFieldError(field="due_date", message="Invalid due date format")]
+        
+        return (
+            task_data.title,
+            task_data.description,
+            task_data.status or TaskStatus.TODO,
+            task_data.priority or TaskPriority.MEDIUM,
+            due_date
+        ), []
+    
+    @staticmethod
+    def _load_chunk(
+        db: Session,
+        project: Project,
+        chunk: List[ImportRow],
+        use_copy: bool,
+        now: datetime
+    ):
+        """
+        COPY a chunk into the staging table on PostgreSQL, otherwise
+        executemany into tasks and task_events.
+        """
+        if use_copy:
+            buffer = io.StringIO()
+            for title, description, task_status, priority, due_date, order_key in chunk:
+                values = (
+                    title, description, TASK_STATUS_CODES[task_status], TASK_PRIORITY_CODES[priority],
+                    due_date, order_key
+                )
+                buffer.write("\t".join(ImportService._copy_value(value) for value in values))
+                buffer.write("\n")
+            buffer.seek(0)
+            cursor = db.connection().connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {STAGING_TABLE} (title, description, status, priority, due_date, order_key) FROM STDIN",
+                    buffer
+                )
+            finally:
+                cursor.close()
+            return
+        
+        task_ids = [uuid.uuid4() for _ in chunk]
+        db.execute(insert(Task), [
+            {
+                "id": task_id,
+                "user_id": project.user_id,
+                "project_id": project.id,
+                "title": title,
+                "description": description,
+                "status": task_status,
+                "priority": priority,
+                "due_date": due_date,
+                "order_key": order_key,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for task_id, (title, description, task_status, priority, due_date, order_key) in zip(task_ids, chunk)
+        ])
+        db.execute(insert(TaskEvent), [
+            {
+                "user_id": project.user_id,
+                "project_id": project.id,
+                "task_id": task_id,
+                "kind": TaskEventKind.CREATED,
+                "to_value": TASK_STATUS_CODES[row[2]],
+                "occurred_at": now,
+            }
+            for task_id, row in zip(task_ids, chunk)
+        ])
+    
+    @staticmethod
+    def _copy_value(value) -> str:
+        """Render one value in COPY text format."""
+        if value is None:
+            return "\\N"
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+    
+    @staticmethod
+    def _lines(source: BinaryIO) -> Iterator[bytes]:
+        """Read the upload line by line, refusing lines over MAX_LINE_BYTES."""
+        number = 0
+        while True:
+            line = source.readline(MAX_LINE_BYTES + 1)
+            if not line:
+                return
+            number += 1
+            if len(line) > MAX_LINE_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Line {number} is longer than {MAX_LINE_BYTES} bytes"
+                )
+            yield line
+    
+    @staticmethod
+    def _decoded(source: BinaryIO) -> Iterator[str]:
+        try:
+            yield from codecs.iterdecode(ImportService._lines(source), "utf-8-sig")
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Import body must be UTF-8 encoded"
+            )
+    
+    @staticmethod
+    def _csv_records(source: BinaryIO) -> Iterator[Tuple[int, dict]]:
+        """Yield (line number, record) for each CSV row; empty cells count as missing."""
+        reader = csv.DictReader(ImportService._decoded(source))
+        try:
+            if reader.fieldnames is None or "title" not in reader.fieldnames:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="CSV header must include a title column"
+                )
+            for record in reader:
+                yield reader.line_num, {
+                    key: value for key, value in record.items()
+                    if key is not None and value not in (None, "")
+                }
+        except csv.Error as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Malformed CSV at line {reader.line_num}: {exc}"
+            )
+    
+    @staticmethod
+    def _ndjson_records(source: BinaryIO) -> Iterator[Tuple[int, object]]:
+        """Yield (line number, record) for each non-blank NDJSON line."""
+        for number, line in enumerate(ImportService._decoded(source), start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                yield number, INVALID_JSON
@@ -0,0 +1,90 @@
+from typing import Iterable, Tuple
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.core.permissions import ProjectAccess, permission_cache
+from app.db.models import Project, ProjectMember, ProjectRole, User
+
+
+class PermissionService:
+    """Service class for project membership checks."""
+    
+    @staticmethod
+    def access(db: Session, user: User) -> ProjectAccess:
+        """
+        The user's project memberships, from the per-worker cache while the
+        user's permissions_version is unchanged. A miss costs one index-only
+        scan of project_members joined to the projects' owners.
+        """
+        access = permission_cache.get(user.id, user.permissions_version)
+        if access is not None:
+            return access
+        
+        rows = db.query(ProjectMember.project_id, ProjectMember.role, Project.user_id).join(
+            Project, Project.id == ProjectMember.project_id
+        ).filter(
+            ProjectMember.user_id == user.id
+        ).all()
+        
+        access = ProjectAccess(
+            roles={project_id: role for project_id, role, _ in rows},
+            owners={project_id: owner_id for project_id, _, owner_id in rows}
+        )
+        permission_cache.put(user.id, user.permissions_version, access)
+        return access
+    
+    @staticmethod
+    def check_role(access: ProjectAccess, project_id: UUID, role: ProjectRole):
+        """Raise 403 unless the user holds at least `role` on a project they are a member of."""
+        if not access.allows(project_id, role):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Requires the {role.value} role on this project"
+            )
+    
+    @staticmethod
+    def require_project(
+        db: Session,
+        user: User,
+        project_id: str,
+        role: ProjectRole = ProjectRole.VIEWER
+    ) -> Tuple[UUID, UUID]:
+        """
+        Check the user holds at least `role` on a project. Projects the user
+        is not a member of are reported as not found. Returns the project's
+        id and its owner's id, which is the user_id its tasks are stored under.
+        """
+        try:
+            project_uuid = UUID(project_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid project ID format"
+            )
+        
+        access = PermissionService.access(db, user)
+        if project_uuid not in access.roles:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+        PermissionService.check_role(access, project_uuid, role)
+        
+        return project_uuid, access.owners[project_uuid]
+    
+    @staticmethod
+    def bump(db: Session, user_ids: Iterable[UUID]):
+        """
+        Invalidate the cached access of users whose memberships change.
+        Does not commit: call it in the transaction making the change.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        db.execute(
+            update(User).where(User.id.in_(user_ids)).values(
+                permissions_version=User.permissions_version + 1
+            ).execution_options(synchronize_session=False)
+        )
@@ -1,66 +1,104 @@
-from typing import List
+from typing import Dict, Iterable, List, Optional, Union
 from uuid import UUID
+from datetime import datetime
+from sqlalchemy import func, insert, literal, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from app.db.models import Project, User
-from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.db.models import Project, ProjectMember, ProjectRole, Task, TaskArchive, Tombstone, SyncEntity, User
+from app.schemas.project import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectMemberCreate, ProjectMemberUpdate, ProjectMemberResponse
+)
+from app.services.permission_service import PermissionService
+from app.utils.fieldsets import parse_fields, serialize_value
 
 
 class ProjectService:
     """Service class for project operations."""
     
     @staticmethod
-    def get_user_projects(db: Session, user: User) -> List[ProjectResponse]:
-        """Get all projects for a user."""
+    def _to_response(project: Project, task_count: int) -> ProjectResponse:
+        """Build the API representation of a project."""
+        return ProjectResponse(
+            id=str(project.id),
+            user_id=str(project.user_id),
+            name=project.name,
+            description=project.description,
+            color=project.color,
+            task_count=task_count,
+            created_at=project.created_at.isoformat(),
+            updated_at=project.updated_at.isoformat()
+        )
+    
+    @staticmethod
+    def _task_counts(db: Session, owner_ids: Iterable[UUID], project_ids: Iterable[UUID]) -> Dict[UUID, int]:
+        """Count tasks for many projects, stored under their owners' ids, with a single grouped query."""
+        project_ids = list(project_ids)
+        if not project_ids:
+            return {}
+        
+        rows = db.query(Task.project_id, func.count(Task.id)).filter(
+            Task.user_id.in_(set(owner_ids)),
+            Task.project_id.in_(project_ids)
+        ).group_by(Task.project_id).all()
+        
+        return {project_id: count for project_id, count in rows}
+    
+    @staticmethod
+    def get_user_projects(db: Session, user: User, fields: Optional[str] = None) -> Union[List[ProjectResponse], List[dict]]:
+        """Get all projects the user is a member of, optionally narrowed to a sparse fieldset."""
+        columns = parse_fields(fields, ProjectResponse.model_fields)
+        access = PermissionService.access(db, user)
+        if not access.roles:
+            return []
+        
+        if columns is not None:
+            selected = [name for name in columns if name != "task_count"]
+            rows = db.query(*[getattr(Project, name) for name in selected]).filter(
+                Project.id.in_(access.project_ids)
+            ).order_by(Project.created_at.desc()).all()
+            
+            results = [
+                {name: serialize_value(value) for name, value in zip(selected, row)}
+                for row in rows
+            ]
+            if "task_count" in columns:
+                task_counts = ProjectService._task_counts(db, access.owner_ids, access.project_ids)
+                for row, result in zip(rows, results):
+                    result["task_count"] = task_counts.get(row.id, 0)
+            return results
+        
         projects = db.query(Project).filter(
-            Project.user_id == user.id
+            Project.id.in_(access.project_ids)
         ).order_by(Project.created_at.desc()).all()
+        task_counts = ProjectService._task_counts(db, access.owner_ids, [project.id for project in projects])
         
         return [
-            ProjectResponse(
-                id=str(project.id),
-                user_id=str(project.user_id),
-                name=project.name,
-                description=project.description,
-                color=project.color,
-                task_count=len(project.tasks) if project.tasks else 0,
-                created_at=project.created_at.isoformat()
-            )
+            ProjectService._to_response(project, task_counts.get(project.id, 0))
             for project in projects
         ]
     
     @staticmethod
-    def get_project_by_id(db: Session, user: User, project_id: str) -> ProjectResponse:
-        """Get a project by ID."""
-        try:
-            project_uuid = UUID(project_id)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid project ID format"
-            )
-        
-        project = db.query(Project).filter(
-            Project.id == project_uuid,
-            Project.user_id == user.id
-        ).first()
+    def _get_project(db: Session, user: User, project_id: str, role: ProjectRole = ProjectRole.VIEWER) -> Project:
+        """Load a project the user holds at least `role` on."""
+        project_uuid, _ = PermissionService.require_project(db, user, project_id, role)
+        project = db.get(Project, project_uuid)
         
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
+        return project
+    
+    @staticmethod
+    def get_project_by_id(db: Session, user: User, project_id: str) -> ProjectResponse:
+        """Get a project by ID."""
+        project = ProjectService._get_project(db, user, project_id)
         
-        return ProjectResponse(
-            id=str(project.id),
-            user_id=str(project.user_id),
-            name=project.name,
-            description=project.description,
-            color=project.color,
-            task_count=len(project.tasks) if project.tasks else 0,
-            created_at=project.created_at.isoformat()
-        )
+        task_counts = ProjectService._task_counts(db, [project.user_id], [project.id])
+        
+        return ProjectService._to_response(project, task_counts.get(project.id, 0))
     
     @staticmethod
     def create_project(db: Session, user: User, project_data: ProjectCreate) -> ProjectResponse:
@@ -73,40 +111,19 @@ class ProjectService:
         )
         
         db.add(project)
+        db.flush()
+        # The owner is a member like any other, so membership alone decides access
+        db.add(ProjectMember(project_id=project.id, user_id=user.id, role=ProjectRole.OWNER))
+        PermissionService.bump(db, [user.id])
         db.commit()
         db.refresh(project)
         
-        return ProjectResponse(
-            id=str(project.id),
-            user_id=str(project.user_id),
-            name=project.name,
-            description=project.description,
-            color=project.color,
-            task_count=0,
-            created_at=project.created_at.isoformat()
-        )
+        return ProjectService._to_response(project, 0)
     
     @staticmethod
     def update_project(db: Session, user: User, project_id: str, project_data: ProjectUpdate) -> ProjectResponse:
-        """Update a project."""
-        try:
-            project_uuid = UUID(project_id)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid project ID format"
-            )
-        
-        project = db.query(Project).filter(
-            Project.id == project_uuid,
-            Project.user_id == user.id
-        ).first()
-        
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
+        """Update a project's details; editors may do this as well as the owner."""
+        project = ProjectService._get_project(db, user, project_id, ProjectRole.EDITOR)
         
         # Update fields if provided
         if project_data.name is not None:
@@ -119,39 +136,185 @@ class ProjectService:
         db.commit()
         db.refresh(project)
         
-        return ProjectResponse(
-            id=str(project.id),
-            user_id=str(project.user_id),
-            name=project.name,
-            description=project.description,
-            color=project.color,
-            task_count=len(project.tasks) if project.tasks else 0,
-            created_at=project.created_at.isoformat()
-        )
+        task_counts = ProjectService._task_counts(db, [project.user_id], [project.id])
+        
+        return ProjectService._to_response(project, task_counts.get(project.id, 0))
     
     @staticmethod
     def delete_project(db: Session, user: User, project_id: str) -> dict:
-        """Delete a project."""
+        """Delete a project. Only its owner can."""
+        project = ProjectService._get_project(db, user, project_id, ProjectRole.OWNER)
+        
+        # Leave tombstones for the project and every task it cascades to;
+        # archived tasks already have one unless it has been compacted
+        deleted_at = datetime.utcnow()
+        for table in (Task, TaskArchive):
+            tasks = select(
+                table.id,
+                literal(SyncEntity.TASK.value),
+                table.user_id,
+                table.project_id,
+                literal(deleted_at)
+            ).where(
+                table.project_id == project.id,
+                table.user_id == user.id
+            )
+            if table is TaskArchive:
+                tasks = tasks.where(~select(Tombstone.entity_id).where(Tombstone.entity_id == table.id).exists())
+            db.execute(
+                insert(Tombstone).from_select(
+                    ["entity_id", "entity_type", "user_id", "project_id", "deleted_at"],
+                    tasks
+                )
+            )
+        db.add(Tombstone(
+            entity_id=project.id,
+            entity_type=SyncEntity.PROJECT.value,
+            user_id=user.id,
+            project_id=project.id,
+            deleted_at=deleted_at
+        ))
+        
+        # Every member loses the project; memberships go with it (ON DELETE CASCADE)
+        PermissionService.bump(db, [
+            member_id for (member_id,) in db.query(ProjectMember.user_id).filter(
+                ProjectMember.project_id == project.id
+            )
+        ])
+        
+        # Delete tasks in bulk, scoped by user_id so a partitioned table is pruned
+        for table in (Task, TaskArchive):
+            db.query(table).filter(
+                table.project_id == project.id,
+                table.user_id == user.id
+            ).delete(synchronize_session=False)
+        db.delete(project)
+        db.commit()
+        
+        return {"message": "Project deleted successfully"}
+    
+    @staticmethod
+    def get_members(db: Session, user: User, project_id: str) -> List[ProjectMemberResponse]:
+        """List a project's members, the owner first."""
+        project_uuid, _ = PermissionService.require_project(db, user, project_id)
+        
+        rows = db.query(ProjectMember, User.name, User.email).join(
+            User, User.id == ProjectMember.user_id
+        ).filter(
+            ProjectMember.project_id == project_uuid
+        ).order_by(ProjectMember.created_at).all()
+        
+        return [
+            ProjectService._to_member_response(member, name, email)
+            for member, name, email in rows
+        ]
+    
+    @staticmethod
+    def _to_member_response(member: ProjectMember, name: str, email: str) -> ProjectMemberResponse:
+        return ProjectMemberResponse(
+            user_id=str(member.user_id),
+            name=name,
+            email=email,
+            role=member.role,
+            created_at=member.created_at.isoformat()
+        )
+    
+    @staticmethod
+    def _check_assignable(role: ProjectRole):
+        if role == ProjectRole.OWNER:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Members can only be given the editor or viewer role"
+            )
+    
+    @staticmethod
+    def _get_member(db: Session, project_uuid: UUID, user_id: str) -> ProjectMember:
         try:
-            project_uuid = UUID(project_id)
+            member_uuid = UUID(user_id)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid project ID format"
+                detail="Invalid user ID format"
             )
         
-        project = db.query(Project).filter(
-            Project.id == project_uuid,
-            Project.user_id == user.id
-        ).first()
+        member = db.get(ProjectMember, (project_uuid, member_uuid))
         
-        if not project:
+        if not member:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
+                detail="Member not found"
             )
+        return member
+    
+    @staticmethod
+    def add_member(db: Session, user: User, project_id: str, member_data: ProjectMemberCreate) -> ProjectMemberResponse:
+        """Share a project with another user. Only the owner can."""
+        project_uuid, _ = PermissionService.require_project(db, user, project_id, ProjectRole.OWNER)
+        ProjectService._check_assignable(member_data.role)
         
-        db.delete(project)
+        invitee = db.query(User).filter(User.email == member_data.email).first()
+        if not invitee:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        if db.get(ProjectMember, (project_uuid, invitee.id)):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="User is already a member of this project"
+            )
+        
+        member = ProjectMember(project_id=project_uuid, user_id=invitee.id, role=member_data.role)
+        db.add(member)
+        PermissionService.bump(db, [invitee.id])
         db.commit()
+        db.refresh(member)
         
-        return {"message": "Project deleted successfully"}
+        return ProjectService._to_member_response(member, invitee.name, invitee.email)
+    
+    @staticmethod
+    def update_member(
+        db: Session,
+        user: User,
+        project_id: str,
+        user_id: str,
+        member_data: ProjectMemberUpdate
+    ) -> ProjectMemberResponse:
+        """Change a member's role. Only the owner can, and the owner's own role is fixed."""
+        project_uuid, _ = PermissionService.require_project(db, user, project_id, ProjectRole.OWNER)
+        ProjectService._check_assignable(member_data.role)
+        member = ProjectService._get_member(db, project_uuid, user_id)
+        
+        if member.role == ProjectRole.OWNER:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The project owner's role cannot be changed"
+            )
+        
+        member.role = member_data.role
+        PermissionService.bump(db, [member.user_id])
+        db.commit()
+        db.refresh(member)
+        
+        name, email = db.query(User.name, User.email).filter(User.id == member.user_id).one()
+        return ProjectService._to_member_response(member, name, email)
+    
+    @staticmethod
+    def remove_member(db: Session, user: User, project_id: str, user_id: str) -> dict:
+        """Remove a member from a project: the owner can remove anyone else, members can leave."""
+        project_uuid, _ = PermissionService.require_project(db, user, project_id)
+        member = ProjectService._get_member(db, project_uuid, user_id)
+        
+        if member.user_id != user.id:
+            PermissionService.check_role(PermissionService.access(db, user), project_uuid, ProjectRole.OWNER)
+        if member.role == ProjectRole.OWNER:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The project owner cannot be removed"
+            )
+        
+        db.delete(member)
+        PermissionService.bump(db, [member.user_id])
+        db.commit()
+        
+        return {"message": "Member removed successfully"}
@@ -0,0 +1,111 @@
+from typing import Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.db.models import Project, Task, Tombstone, SyncEntity, User
+from app.schemas.sync import SyncDeleted, SyncResponse
+from app.services.permission_service import PermissionService
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class SyncService:
+    """Service class for delta sync operations."""
+    
+    @staticmethod
+    def encode_token(moment: datetime, permissions_version: int) -> str:
+        """Encode a UTC timestamp and the user's permissions version as an opaque sync token."""
+        return f"{(moment - EPOCH) // timedelta(microseconds=1)}.{permissions_version}"
+    
+    @staticmethod
+    def decode_token(token: str) -> Tuple[datetime, Optional[int]]:
+        """
+        Decode a sync token back into a UTC timestamp and permissions
+        version (None for tokens issued before versions were included).
+        """
+        micros, _, version = token.partition(".")
+        try:
+            return EPOCH + timedelta(microseconds=int(micros)), int(version) if version else None
+        except (ValueError, OverflowError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync token"
+            )
+    
+    @staticmethod
+    def get_changes(db: Session, user: User, since: Optional[str] = None) -> SyncResponse:
+        """
+        Get projects and tasks changed since a sync token, across every
+        project the user is a member of.
+        Without a token, with one older than the tombstone retention
+        window, or with one issued before the user's memberships last
+        changed, a full snapshot is returned instead: projects gained or
+        lost have no updates or tombstones of their own to deliver.
+        """
+        now = datetime.utcnow()
+        # Rows written by transactions still in flight may carry a timestamp
+        # slightly before `now`; overlap the next window so they are not missed.
+        next_token = SyncService.encode_token(
+            now - timedelta(seconds=settings.sync_overlap_seconds),
+            user.permissions_version
+        )
+        
+        since_at, since_version = SyncService.decode_token(since) if since else (None, None)
+        retention_start = now - timedelta(days=settings.sync_tombstone_retention_days)
+        full = since_at is None or since_at < retention_start or since_version != user.permissions_version
+        
+        access = PermissionService.access(db, user)
+        project_query = db.query(Project).filter(Project.id.in_(access.project_ids))
+        task_query = db.query(Task).filter(
+            Task.user_id.in_(access.owner_ids),
+            Task.project_id.in_(access.project_ids)
+        )
+        if not full:
+            project_query = project_query.filter(Project.updated_at >= since_at)
+            task_query = task_query.filter(Task.updated_at >= since_at)
+        
+        projects = project_query.order_by(Project.updated_at).all()
+        tasks = task_query.order_by(Task.updated_at).all()
+        task_counts = ProjectService._task_counts(db, access.owner_ids, [project.id for project in projects])
+        
+        deleted = SyncDeleted()
+        if not full:
+            # Deletions in the user's own projects, and by anyone in shared ones
+            tombstones = db.query(Tombstone.entity_id, Tombstone.entity_type).filter(
+                or_(Tombstone.user_id == user.id, Tombstone.project_id.in_(access.project_ids)),
+                Tombstone.deleted_at >= since_at
+            ).all()
+            
+            for entity_id, entity_type in tombstones:
+                if entity_type == SyncEntity.PROJECT.value:
+                    deleted.projects.append(str(entity_id))
+                else:
+                    deleted.tasks.append(str(entity_id))
+        
+        return SyncResponse(
+            projects=[
+                ProjectService._to_response(project, task_counts.get(project.id, 0))
+                for project in projects
+            ],
+            tasks=[TaskService._to_response(task) for task in tasks],
+            deleted=deleted,
+            next_token=next_token,
+            full=full
+        )
+    
+    @staticmethod
+    def compact_tombstones(db: Session) -> int:
+        """Delete tombstones older than the retention window. Returns the number removed."""
+        cutoff = datetime.utcnow() - timedelta(days=settings.sync_tombstone_retention_days)
+        
+        removed = db.query(Tombstone).filter(
+            Tombstone.deleted_at < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+        
+        return removed
@@ -0,0 +1,260 @@
+from typing import List, Tuple
+from uuid import UUID
+from datetime import datetime
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.db.models import Task, TaskDependency, ProjectRole, User
+from app.schemas.task import TaskGraphNode, TaskDependencyResponse
+from app.services.permission_service import PermissionService
+from app.services.task_service import TaskService
+
+
+class TaskGraphService:
+    """
+    Service class for subtask trees and task dependencies. Each graph
+    read is one recursive CTE, however deep the graph goes.
+    """
+    
+    @staticmethod
+    def _to_nodes(rows: List[Tuple[Task, int]]) -> List[TaskGraphNode]:
+        return [
+            TaskGraphNode(**TaskService._to_response(task).model_dump(), depth=depth)
+            for task, depth in rows
+        ]
+    
+    @staticmethod
+    def get_subtree(db: Session, user: User, task_id: str) -> List[TaskGraphNode]:
+        """Get a task and all its subtasks, level by level, the task itself at depth 0."""
+        task = TaskService._get_task(db, user, task_id)
+        
+        subtree = TaskService._subtree_cte(task.user_id, task.id)
+        rows = db.query(Task, subtree.c.depth).join(
+            subtree, Task.id == subtree.c.id
+        ).filter(
+            Task.user_id == task.user_id
+        ).order_by(subtree.c.depth, Task.order_key).all()
+        
+        return TaskGraphService._to_nodes(rows)
+    
+    @staticmethod
+    def _blockers_cte(user_id, task_id, name: str = "blockers"):
+        """
+        Recursive CTE of (id, depth) for every task transitively blocking
+        `task_id`; direct blockers are at depth 1. UNION (rather than
+        UNION ALL) drops repeated rows, and the depth bound stops it.
+        """
+        blockers = select(TaskDependency.depends_on_id.label("id"), literal(1).label("depth")).where(
+            TaskDependency.task_id == task_id,
+            TaskDependency.user_id == user_id
+        ).cte(name, recursive=True)
+        dependency = aliased(TaskDependency)
+        return blockers.union(
+            select(dependency.depends_on_id, blockers.c.depth + 1).where(
+                dependency.task_id == blockers.c.id,
+                dependency.user_id == user_id,
+                blockers.c.depth < settings.task_dependency_max_depth
+            )
+        )
+    
+    @staticmethod
+    def _dependents_cte(user_id, task_id):
+        """Recursive CTE of (id, depth) for every task transitively blocked by `task_id`."""
+        dependents = select(TaskDependency.task_id.label("id"), literal(1).label("depth")).where(
+            TaskDependency.depends_on_id == task_id,
+            TaskDependency.user_id == user_id
+        ).cte("dependents", recursive=True)
+        dependency = aliased(TaskDependency)
+        return dependents.union(
+            select(dependency.task_id, dependents.c.depth + 1).where(
+                dependency.depends_on_id == dependents.c.id,
+                dependency.user_id == user_id,
+                dependents.c.depth < settings.task_dependency_max_depth
+            )
+        )
+    
+    @staticmethod
+    def get_blockers(db: Session, user: User, task_id: str) -> List[TaskGraphNode]:
+        """Get every task transitively blocking a task, nearest first."""
+        task = TaskService._get_task(db, user, task_id)
+        
+        blockers = TaskGraphService._blockers_cte(task.user_id, task.id)
+        # A task reachable along several paths is listed at its shortest distance
+        nearest = select(blockers.c.id, func.min(blockers.c.depth).label("depth")).group_by(
+            blockers.c.id
+        ).subquery()
+        rows = db.query(Task, nearest.c.depth).join(
+            nearest, Task.id == nearest.c.id
+        ).filter(
+            Task.user_id == task.user_id
+        ).order_by(nearest.c.depth, Task.order_key).all()
+        
+        return TaskGraphService._to_nodes(rows)
+    
+    @staticmethod
+    def get_topological_order(db: Session, user: User, project_id: str) -> List[TaskGraphNode]:
+        """
+        Get a project's tasks in dependency order: every task comes after
+        all its blockers. `depth` is the length of the longest blocker
+        chain leading to the task, so tasks at the same depth can be
+        worked on in parallel.
+        """
+        project_uuid, owner_id = PermissionService.require_project(db, user, project_id)
+        
+        # Start from the unblocked tasks and follow edges to the tasks they
+        # block; a task's level is the deepest it is reached at
+        levels = select(Task.id, literal(0).label("depth")).where(
+            Task.user_id == owner_id,
+            Task.project_id == project_uuid,
+            ~select(TaskDependency.task_id).where(
+                TaskDependency.task_id == Task.id,
+                TaskDependency.user_id == owner_id
+            ).exists()
+        ).cte("levels", recursive=True)
+        dependency = aliased(TaskDependency)
+        levels = levels.union(
+            select(dependency.task_id, levels.c.depth + 1).where(
+                dependency.depends_on_id == levels.c.id,
+                dependency.user_id == owner_id,
+                levels.c.depth < settings.task_dependency_max_depth
+            )
+        )
+        deepest = select(levels.c.id, func.max(levels.c.depth).label("depth")).group_by(
+            levels.c.id
+        ).subquery()
+        rows = db.query(Task, deepest.c.depth).join(
+            deepest, Task.id == deepest.c.id
+        ).filter(
+            Task.user_id == owner_id
+        ).order_by(deepest.c.depth, Task.status, Task.order_key).all()
+        
+        return TaskGraphService._to_nodes(rows)
+    
+    @staticmethod
+    def add_dependency(db: Session, user: User, task_id: str, depends_on_id: str) -> TaskDependencyResponse:
+        """
+        Mark a task as blocked by another task of the same project. The
+        edge is inserted by a statement that checks, in the database, that
+        the blocker does not already depend on the task, so no cycle can
+        be created.
+        """
+        task = TaskService._get_task(db, user, task_id, ProjectRole.EDITOR)
+        blocker = TaskService._get_task(db, user, depends_on_id, label="blocking task")
+        
+        if blocker.id == task.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A task cannot depend on itself"
+            )
+        if blocker.project_id != task.project_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Dependencies must be between tasks in the same project"
+            )
+        
+        if db.get_bind().dialect.name == "postgresql":
+            # Serialize graph changes per tenant: two concurrent inserts could
+            # each pass the cycle check and together close a cycle
+            db.execute(select(func.pg_advisory_xact_lock(func.hashtext(str(task.user_id)))))
+        
+        existing = db.query(TaskDependency.depends_on_id).filter(
+            TaskDependency.task_id == task.id,
+            TaskDependency.user_id == task.user_id
+        ).all()
+        if any(existing_id == blocker.id for (existing_id,) in existing):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Dependency already exists"
+            )
+        if len(existing) >= settings.task_max_dependencies:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A task can have at most {settings.task_max_dependencies} dependencies"
+            )
+        
+        # Longest chain through the new edge: blockers of the blocker, the
+        # edge itself, and the tasks already waiting on this task
+        upstream = TaskGraphService._blockers_cte(task.user_id, blocker.id)
+        downstream = TaskGraphService._dependents_cte(task.user_id, task.id)
+        chain = (
+            (db.query(func.max(upstream.c.depth)).scalar() or 0)
+            + 1
+            + (db.query(func.max(downstream.c.depth)).scalar() or 0)
+        )
+        if chain > settings.task_dependency_max_depth:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Dependency chains can be at most {settings.task_dependency_max_depth} tasks long"
+            )
+        
+        # Everything the blocker transitively depends on, without a depth
+        # bound: UNION terminates on any graph
+        reachable = select(TaskDependency.depends_on_id.label("id")).where(
+            TaskDependency.task_id == blocker.id,
+            TaskDependency.user_id == task.user_id
+        ).cte("reachable", recursive=True)
+        dependency = aliased(TaskDependency)
+        reachable = reachable.union(
+            select(dependency.depends_on_id).where(
+                dependency.task_id == reachable.c.id,
+                dependency.user_id == task.user_id
+            )
+        )
+        
+        created_at = datetime.utcnow()
+        result = db.execute(
+            insert(TaskDependency).from_select(
+                ["task_id", "depends_on_id", "user_id", "created_at"],
+                select(
+                    literal(task.id, TaskDependency.task_id.type),
+                    literal(blocker.id, TaskDependency.depends_on_id.type),
+                    literal(task.user_id, TaskDependency.user_id.type),
+                    literal(created_at)
+                ).where(
+                    ~select(reachable.c.id).where(reachable.c.id == task.id).exists()
+                )
+            ).returning(TaskDependency.task_id)
+        )
+        # rowcount is unreliable for INSERT ... SELECT behind a WITH clause
+        if result.first() is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Dependency would create a cycle"
+            )
+        db.commit()
+        
+        return TaskDependencyResponse(
+            task_id=str(task.id),
+            depends_on_id=str(blocker.id),
+            created_at=created_at.isoformat()
+        )
+    
+    @staticmethod
+    def remove_dependency(db: Session, user: User, task_id: str, depends_on_id: str) -> dict:
+        """Remove a dependency between two tasks."""
+        task = TaskService._get_task(db, user, task_id, ProjectRole.EDITOR)
+        try:
+            depends_on_uuid = UUID(depends_on_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid task ID format"
+            )
+        
+        removed = db.query(TaskDependency).filter(
+            TaskDependency.task_id == task.id,
+            TaskDependency.depends_on_id == depends_on_uuid,
+            TaskDependency.user_id == task.user_id
+        ).delete(synchronize_session=False)
+        
+        if not removed:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dependency not found"
+            )
+        db.commit()
+        
+        return {"message": "Dependency removed successfully"}
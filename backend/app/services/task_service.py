@@ -1,106 +1,284 @@
-from typing import List
+from typing import Hashable, List, Optional, Union
 from uuid import UUID
 from datetime import datetime
+from sqlalchemy import bindparam, case, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from app.db.models import Task, Project, User
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.core.config import settings
+from app.core.coalescer import WriteCoalescer
+from app.db.models import (
+    Task, TaskArchive, TaskEvent, TaskEventKind, TaskStatus, TaskPriority, TASK_STATUS_CODES, TASK_PRIORITY_CODES,
+    ProjectRole, Tombstone, SyncEntity, User
+)
+from app.services.permission_service import PermissionService
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskMove, CalendarDay
+from app.utils.fieldsets import parse_fields, serialize_value
+from app.utils.ordering import key_between, spread_keys
 
 
 class TaskService:
     """Service class for task operations."""
     
     @staticmethod
-    def get_user_tasks(db: Session, user: User) -> List[TaskResponse]:
-        """Get all tasks for a user."""
-        tasks = db.query(Task).filter(
-            Task.user_id == user.id
-        ).order_by(Task.created_at.desc()).all()
-        
-        return [
-            TaskResponse(
-                id=str(task.id),
-                user_id=str(task.user_id),
-                project_id=str(task.project_id),
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                priority=task.priority,
-                due_date=task.due_date.isoformat() if task.due_date else None,
-                created_at=task.created_at.isoformat(),
-                updated_at=task.updated_at.isoformat()
-            )
-            for task in tasks
+    def _to_response(task: Task) -> TaskResponse:
+        """Build the API representation of a task."""
+        return TaskResponse(
+            id=str(task.id),
+            user_id=str(task.user_id),
+            project_id=str(task.project_id),
+            parent_id=str(task.parent_id) if task.parent_id else None,
+            title=task.title,
+            description=task.description,
+            status=task.status,
+            priority=task.priority,
+            due_date=task.due_date.isoformat() if task.due_date else None,
+            order_key=task.order_key,
+            created_at=task.created_at.isoformat(),
+            updated_at=task.updated_at.isoformat()
+        )
+    
+    @staticmethod
+    def _record_event(
+        db: Session,
+        task: Task,
+        kind: TaskEventKind,
+        from_value: Optional[int] = None,
+        to_value: Optional[int] = None
+    ):
+        """Append a task_events row, committed together with the write it describes."""
+        db.add(TaskEvent(
+            user_id=task.user_id,
+            project_id=task.project_id,
+            task_id=task.id,
+            kind=kind,
+            from_value=from_value,
+            to_value=to_value
+        ))
+    
+    @staticmethod
+    def _list(
+        db: Session,
+        fields: Optional[str],
+        include_archived: bool = False,
+        sort: str = "created",
+        **filters
+    ) -> Union[List[TaskResponse], List[dict]]:
+        """
+        List tasks matching the column filters, newest first, or with
+        `sort="position"` by status column and manual order.
+        With `fields`, only those columns are selected and each task is
+        returned as a dict holding just the requested fields.
+        With `include_archived`, archived tasks are unioned in.
+        A list or set filter value matches any of its elements.
+        """
+        columns = parse_fields(fields, TaskResponse.model_fields)
+        sort_columns = ["status", "order_key"] if sort == "position" else ["created_at"]
+        
+        def criteria(source):
+            return [
+                getattr(source, name).in_(value) if isinstance(value, (list, set)) else getattr(source, name) == value
+                for name, value in filters.items()
+            ]
+        
+        def ordering(source):
+            if sort == "position":
+                return [source.status, source.order_key]
+            return [source.created_at.desc()]
+        
+        if columns is None and not include_archived:
+            tasks = db.query(Task).filter(*criteria(Task)).order_by(*ordering(Task)).all()
+            return [TaskService._to_response(task) for task in tasks]
+        
+        names = columns or list(TaskResponse.model_fields)
+        selected = names + [name for name in sort_columns if name not in names]
+        query = select(*[getattr(Task, name) for name in selected]).where(*criteria(Task))
+        
+        if include_archived:
+            archived = select(*[getattr(TaskArchive, name) for name in selected]).where(*criteria(TaskArchive))
+            combined = union_all(query, archived).subquery()
+            query = select(combined).order_by(*ordering(combined.c))
+        else:
+            query = query.order_by(*ordering(Task))
+        
+        rows = [
+            {name: serialize_value(value) for name, value in zip(selected, row) if name in names}
+            for row in db.execute(query)
         ]
+        
+        if columns is None:
+            return [TaskResponse(**row) for row in rows]
+        return rows
+    
+    @staticmethod
+    def get_user_tasks(
+        db: Session,
+        user: User,
+        fields: Optional[str] = None,
+        include_archived: bool = False
+    ) -> Union[List[TaskResponse], List[dict]]:
+        """
+        Get all tasks in the projects the user is a member of, optionally
+        narrowed to a sparse fieldset. The owners of those projects bound
+        the partitions scanned; the projects select the rows, through the
+        (project_id, created_at) index.
+        """
+        access = PermissionService.access(db, user)
+        if not access.roles:
+            return []
+        return TaskService._list(
+            db,
+            fields,
+            include_archived,
+            user_id=access.owner_ids,
+            project_id=access.project_ids
+        )
     
     @staticmethod
-    def get_project_tasks(db: Session, user: User, project_id: str) -> List[TaskResponse]:
-        """Get all tasks for a specific project."""
+    def _get_task(
+        db: Session,
+        user: User,
+        task_id: str,
+        role: ProjectRole = ProjectRole.VIEWER,
+        label: str = "task"
+    ) -> Task:
+        """
+        Load a task the user holds at least `role` on, through its project's
+        membership. Tasks outside the user's projects are reported as not found.
+        """
         try:
-            project_uuid = UUID(project_id)
+            task_uuid = UUID(task_id)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid project ID format"
+                detail=f"Invalid {label} ID format"
             )
         
-        # Verify project ownership
-        project = db.query(Project).filter(
-            Project.id == project_uuid,
-            Project.user_id == user.id
-        ).first()
+        access = PermissionService.access(db, user)
+        task = db.query(Task).filter(
+            Task.id == task_uuid,
+            Task.user_id.in_(access.owner_ids)
+        ).first() if access.roles else None
         
-        if not project:
+        if not task or task.project_id not in access.roles:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
+                detail=f"{label.capitalize()} not found"
             )
+        PermissionService.check_role(access, task.project_id, role)
         
-        tasks = db.query(Task).filter(
-            Task.project_id == project_uuid,
-            Task.user_id == user.id
-        ).order_by(Task.created_at.desc()).all()
-        
-        return [
-            TaskResponse(
-                id=str(task.id),
-                user_id=str(task.user_id),
-                project_id=str(task.project_id),
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                priority=task.priority,
-                due_date=task.due_date.isoformat() if task.due_date else None,
-                created_at=task.created_at.isoformat(),
-                updated_at=task.updated_at.isoformat()
-            )
-            for task in tasks
-        ]
+        return task
     
     @staticmethod
-    def create_task(db: Session, user: User, project_id: str, task_data: TaskCreate) -> TaskResponse:
-        """Create a new task."""
+    def _parse_datetime(value: str, label: str) -> datetime:
+        """Parse an ISO 8601 query bound, comparable with the naive stored timestamps."""
         try:
-            project_uuid = UUID(project_id)
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid project ID format"
+                detail=f"Invalid {label} date format"
             )
-        
-        # Verify project ownership
-        project = db.query(Project).filter(
-            Project.id == project_uuid,
-            Project.user_id == user.id
-        ).first()
-        
-        if not project:
+    
+    @staticmethod
+    def get_calendar(
+        db: Session,
+        user: User,
+        start: str,
+        end: str,
+        group_by: Optional[str] = None
+    ) -> Union[List[TaskResponse], List[CalendarDay]]:
+        """
+        Get tasks due in [start, end), ordered by due date.
+        With `group_by="day"`, return per-day counts instead of tasks.
+        Both forms are range scans of (project_id, due_date) over the
+        projects the user is a member of.
+        """
+        start_at = TaskService._parse_datetime(start, "from")
+        end_at = TaskService._parse_datetime(end, "to")
+        if end_at <= start_at:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'to' must be after 'from'"
             )
         
+        access = PermissionService.access(db, user)
+        if not access.roles:
+            return []
+        
+        criteria = (
+            Task.user_id.in_(access.owner_ids),
+            Task.project_id.in_(access.project_ids),
+            Task.due_date >= start_at,
+            Task.due_date < end_at
+        )
+        
+        if group_by == "day":
+            day = func.date(Task.due_date)
+            rows = db.query(
+                day,
+                func.count(Task.id),
+                func.sum(case((Task.status == TaskStatus.COMPLETED, 1), else_=0))
+            ).filter(*criteria).group_by(day).order_by(day).all()
+            
+            return [
+                CalendarDay(date=str(date), total=total, completed=completed or 0)
+                for date, total, completed in rows
+            ]
+        
+        tasks = db.query(Task).filter(*criteria).order_by(Task.due_date).all()
+        
+        return [TaskService._to_response(task) for task in tasks]
+    
+    @staticmethod
+    def get_overdue_tasks(db: Session, user: User, limit: int = 100) -> List[TaskResponse]:
+        """Get open tasks whose due date has passed, most overdue first."""
+        access = PermissionService.access(db, user)
+        if not access.roles:
+            return []
+        
+        tasks = db.query(Task).filter(
+            Task.user_id.in_(access.owner_ids),
+            Task.project_id.in_(access.project_ids),
+            Task.status != TaskStatus.COMPLETED,
+            Task.due_date.isnot(None),
+            Task.due_date < datetime.utcnow()
+        ).order_by(Task.due_date).limit(limit).all()
+        
+        return [TaskService._to_response(task) for task in tasks]
+    
+    @staticmethod
+    def get_project_tasks(
+        db: Session,
+        user: User,
+        project_id: str,
+        fields: Optional[str] = None,
+        include_archived: bool = False,
+        sort: str = "created"
+    ) -> Union[List[TaskResponse], List[dict]]:
+        """
+        Get all tasks for a specific project, optionally narrowed to a sparse fieldset.
+        With `sort="position"`, tasks come grouped by status in manual order
+        (a range scan of (project_id, status, order_key)).
+        """
+        project_uuid, owner_id = PermissionService.require_project(db, user, project_id)
+        
+        return TaskService._list(
+            db,
+            fields,
+            include_archived,
+            sort,
+            project_id=project_uuid,
+            user_id=owner_id
+        )
+    
+    @staticmethod
+    def create_task(db: Session, user: User, project_id: str, task_data: TaskCreate) -> TaskResponse:
+        """Create a new task."""
+        # Tasks are stored under the project owner, whoever creates them
+        project_uuid, owner_id = PermissionService.require_project(db, user, project_id, ProjectRole.EDITOR)
+        
         # Parse due_date if provided
         due_date = None
         if task_data.due_date:
@@ -112,63 +290,133 @@ class TaskService:
                     detail="Invalid due date format"
                 )
         
+        parent_id = None
+        if task_data.parent_id:
+            parent_id = TaskService._check_parent(db, owner_id, project_uuid, task_data.parent_id)
+        
+        task_status = task_data.status or TaskStatus.TODO
         task = Task(
-            user_id=user.id,
+            user_id=owner_id,
             project_id=project_uuid,
+            parent_id=parent_id,
             title=task_data.title,
             description=task_data.description,
-            status=task_data.status or "todo",
-            priority=task_data.priority or "medium",
-            due_date=due_date
+            status=task_status,
+            priority=task_data.priority or TaskPriority.MEDIUM,
+            due_date=due_date,
+            # New tasks go to the end of their column
+            order_key=key_between(
+                TaskService._last_order_key(db, owner_id, project_uuid, task_status),
+                None
+            )
         )
         
         db.add(task)
+        db.flush()
+        TaskService._record_event(db, task, TaskEventKind.CREATED, to_value=TASK_STATUS_CODES[task_status])
         db.commit()
         db.refresh(task)
         
-        return TaskResponse(
-            id=str(task.id),
-            user_id=str(task.user_id),
-            project_id=str(task.project_id),
-            title=task.title,
-            description=task.description,
-            status=task.status,
-            priority=task.priority,
-            due_date=task.due_date.isoformat() if task.due_date else None,
-            created_at=task.created_at.isoformat(),
-            updated_at=task.updated_at.isoformat()
-        )
+        return TaskService._to_response(task)
     
     @staticmethod
-    def update_task(db: Session, user: User, task_id: str, task_data: TaskUpdate) -> TaskResponse:
-        """Update a task."""
+    def _check_parent(db: Session, user_id, project_id: UUID, parent_id: str) -> UUID:
+        """
+        Validate the parent of a new subtask: same project, nesting below
+        task_max_depth and fewer than task_max_children subtasks.
+        """
         try:
-            task_uuid = UUID(task_id)
+            parent_uuid = UUID(parent_id)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid task ID format"
+                detail="Invalid parent ID format"
             )
         
-        task = db.query(Task).filter(
-            Task.id == task_uuid,
-            Task.user_id == user.id
+        parent = db.query(Task.project_id).filter(
+            Task.id == parent_uuid,
+            Task.user_id == user_id
         ).first()
         
-        if not task:
+        if not parent or parent.project_id != project_id:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parent task must be a task in the same project"
+            )
+        
+        # The parent's chain of ancestors, walked upwards in one query
+        ancestors = select(Task.parent_id, literal(1).label("depth")).where(
+            Task.id == parent_uuid,
+            Task.user_id == user_id
+        ).cte("ancestors", recursive=True)
+        ancestor = aliased(Task)
+        ancestors = ancestors.union_all(
+            select(ancestor.parent_id, ancestors.c.depth + 1).where(
+                ancestor.id == ancestors.c.parent_id,
+                ancestor.user_id == user_id,
+                ancestors.c.depth <= settings.task_max_depth
+            )
+        )
+        if db.query(func.max(ancestors.c.depth)).scalar() > settings.task_max_depth:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Subtasks can be nested at most {settings.task_max_depth} levels deep"
+            )
+        
+        children = db.query(func.count(Task.id)).filter(
+            Task.user_id == user_id,
+            Task.parent_id == parent_uuid
+        ).scalar()
+        if children >= settings.task_max_children:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A task can have at most {settings.task_max_children} subtasks"
+            )
+        
+        return parent_uuid
+    
+    @staticmethod
+    def _subtree_cte(user_id, root_id):
+        """Recursive CTE of (id, depth) for a task and all its subtasks, the root at depth 0."""
+        subtree = select(Task.id, literal(0).label("depth")).where(
+            Task.id == root_id,
+            Task.user_id == user_id
+        ).cte("subtree", recursive=True)
+        child = aliased(Task)
+        return subtree.union_all(
+            select(child.id, subtree.c.depth + 1).where(
+                child.parent_id == subtree.c.id,
+                child.user_id == user_id,
+                subtree.c.depth < settings.task_max_depth
             )
+        )
+    
+    @staticmethod
+    def update_task(db: Session, user: User, task_id: str, task_data: TaskUpdate) -> TaskResponse:
+        """Update a task."""
+        task = TaskService._get_task(db, user, task_id, ProjectRole.EDITOR)
         
         # Update fields if provided
         if task_data.title is not None:
             task.title = task_data.title
         if task_data.description is not None:
             task.description = task_data.description
-        if task_data.status is not None:
+        if task_data.status is not None and task_data.status != task.status:
+            # Changing status moves the task to the end of the new column
+            task.order_key = key_between(
+                TaskService._last_order_key(db, task.user_id, task.project_id, task_data.status),
+                None
+            )
+            TaskService._record_event(
+                db, task, TaskEventKind.STATUS_CHANGED,
+                TASK_STATUS_CODES[task.status], TASK_STATUS_CODES[task_data.status]
+            )
             task.status = task_data.status
-        if task_data.priority is not None:
+        if task_data.priority is not None and task_data.priority != task.priority:
+            TaskService._record_event(
+                db, task, TaskEventKind.PRIORITY_CHANGED,
+                TASK_PRIORITY_CODES[task.priority], TASK_PRIORITY_CODES[task_data.priority]
+            )
             task.priority = task_data.priority
         if task_data.due_date is not None:
             try:
@@ -182,22 +430,25 @@ class TaskService:
         db.commit()
         db.refresh(task)
         
-        return TaskResponse(
-            id=str(task.id),
-            user_id=str(task.user_id),
-            project_id=str(task.project_id),
-            title=task.title,
-            description=task.description,
-            status=task.status,
-            priority=task.priority,
-            due_date=task.due_date.isoformat() if task.due_date else None,
-            created_at=task.created_at.isoformat(),
-            updated_at=task.updated_at.isoformat()
-        )
+        return TaskService._to_response(task)
     
     @staticmethod
-    def delete_task(db: Session, user: User, task_id: str) -> dict:
-        """Delete a task."""
+    def update_task_coalesced(
+        db: Session,
+        user: User,
+        task_id: str,
+        task_data: TaskUpdate,
+        coalescer: WriteCoalescer,
+        acknowledge: bool = False
+    ) -> TaskResponse:
+        """
+        Update a task through a coalescer keyed by (user, task). Malformed
+        input is rejected here, before merging, so one bad request cannot
+        fail the others in its batch. Without `acknowledge`, returns the
+        committed result of the merged update. With it, returns the task
+        with the merged fields applied as update_task stores them, before
+        they are committed.
+        """
         try:
             task_uuid = UUID(task_id)
         except ValueError:
@@ -206,18 +457,199 @@ class TaskService:
                 detail="Invalid task ID format"
             )
         
-        task = db.query(Task).filter(
-            Task.id == task_uuid,
-            Task.user_id == user.id
-        ).first()
+        if task_data.due_date is not None:
+            try:
+                datetime.fromisoformat(task_data.due_date.replace('Z', '+00:00'))
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid due date format"
+                )
         
-        if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
+        # None means "unchanged", so it must not override an earlier value
+        fields = task_data.model_dump(exclude_none=True)
+        key: Hashable = (user.id, task_uuid)
+        if not acknowledge:
+            # The flush uses its own session; give this one's connection back
+            # while waiting, since SQLite mode has a single writer connection
+            db.close()
+            return coalescer.run(key, fields)
+        
+        task = TaskService._get_task(db, user, task_id, ProjectRole.EDITOR)
+        merged = coalescer.defer(key, fields)
+        
+        # Show the merged fields as update_task will store them
+        if "due_date" in merged:
+            merged["due_date"] = datetime.fromisoformat(merged["due_date"].replace('Z', '+00:00')).isoformat()
+        if "status" in merged and merged["status"] != task.status:
+            merged["order_key"] = key_between(
+                TaskService._last_order_key(db, task.user_id, task.project_id, merged["status"]),
+                None
+            )
+        return TaskService._to_response(task).model_copy(update=merged)
+    
+    @staticmethod
+    def _last_order_key(db: Session, user_id, project_id, task_status: TaskStatus) -> Optional[str]:
+        """Highest order key in a (project, status) column."""
+        return db.query(func.max(Task.order_key)).filter(
+            Task.user_id == user_id,
+            Task.project_id == project_id,
+            Task.status == task_status
+        ).scalar()
+    
+    @staticmethod
+    def move_task(db: Session, user: User, task_id: str, move: TaskMove) -> TaskResponse:
+        """
+        Move a task between two neighbours in a status column. Only the
+        moved task's row is written: it gets a key between its neighbours'.
+        """
+        task = TaskService._get_task(db, user, task_id, ProjectRole.EDITOR)
+        
+        target_status = move.status or task.status
+        column = (
+            Task.user_id == task.user_id,
+            Task.project_id == task.project_id,
+            Task.status == target_status,
+            Task.id != task.id
+        )
+        
+        def neighbour_key(neighbour_id: str, label: str) -> str:
+            try:
+                neighbour_uuid = UUID(neighbour_id)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid {label} format"
+                )
+            key = db.query(Task.order_key).filter(*column, Task.id == neighbour_uuid).scalar()
+            if key is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"{label} must be another task in the target column"
+                )
+            return key
+        
+        for attempt in range(2):
+            if move.after_id:
+                after = neighbour_key(move.after_id, "after_id")
+                before = neighbour_key(move.before_id, "before_id") if move.before_id else db.query(
+                    func.min(Task.order_key)
+                ).filter(*column, Task.order_key > after).scalar()
+            elif move.before_id:
+                before = neighbour_key(move.before_id, "before_id")
+                after = db.query(func.max(Task.order_key)).filter(*column, Task.order_key < before).scalar()
+            else:
+                after = db.query(func.max(Task.order_key)).filter(*column).scalar()
+                before = None
+            
+            if after is None or before is None or after < before:
+                break
+            if after > before:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="after_id must come before before_id"
+                )
+            # Concurrent appends can leave neighbours with equal keys;
+            # spread the column out once and look again
+            TaskService.rebalance_column(db, task.user_id, task.project_id, target_status)
+        
+        task.order_key = key_between(after, before)
+        if target_status != task.status:
+            TaskService._record_event(
+                db, task, TaskEventKind.STATUS_CHANGED,
+                TASK_STATUS_CODES[task.status], TASK_STATUS_CODES[target_status]
             )
+        task.status = target_status
+        db.commit()
+        db.refresh(task)
+        
+        return TaskService._to_response(task)
+    
+    @staticmethod
+    def rebalance_column(db: Session, user_id, project_id, task_status: TaskStatus) -> int:
+        """
+        Reassign short, evenly spread order keys to a (project, status)
+        column, keeping its order. Does not commit. Returns the task count.
+        """
+        task_ids = [
+            task_id for (task_id,) in db.query(Task.id).filter(
+                Task.user_id == user_id,
+                Task.project_id == project_id,
+                Task.status == task_status
+            ).order_by(Task.order_key, Task.created_at).with_for_update().all()
+        ]
+        if not task_ids:
+            return 0
+        
+        # Rewritten keys count as updates, so delta sync delivers them
+        db.execute(
+            update(Task.__table__).where(
+                Task.__table__.c.id == bindparam("task_id"),
+                Task.__table__.c.user_id == user_id
+            ).values(order_key=bindparam("key"), updated_at=datetime.utcnow()),
+            [
+                {"task_id": task_id, "key": key}
+                for task_id, key in zip(task_ids, spread_keys(len(task_ids)))
+            ]
+        )
+        return len(task_ids)
+    
+    @staticmethod
+    def rebalance_long_keys(db: Session, max_length: Optional[int] = None) -> int:
+        """
+        Rebalance every column holding an order key longer than `max_length`,
+        one transaction per column. Returns the number of columns rebalanced.
+        """
+        max_length = max_length or settings.order_key_rebalance_length
+        columns = db.query(Task.user_id, Task.project_id, Task.status).group_by(
+            Task.user_id, Task.project_id, Task.status
+        ).having(func.max(func.length(Task.order_key)) > max_length).all()
+        db.rollback()
+        
+        for user_id, project_id, task_status in columns:
+            TaskService.rebalance_column(db, user_id, project_id, task_status)
+            db.commit()
+        
+        return len(columns)
+    
+    @staticmethod
+    def delete_task(db: Session, user: User, task_id: str) -> dict:
+        """Delete a task together with all its subtasks."""
+        task = TaskService._get_task(db, user, task_id, ProjectRole.EDITOR)
+        
+        subtree = TaskService._subtree_cte(task.user_id, task.id)
+        deleted = db.execute(
+            select(Task.id, Task.status).join(subtree, Task.id == subtree.c.id).where(Task.user_id == task.user_id)
+        ).all()
+        task_ids = [task_id for task_id, _ in deleted]
         
-        db.delete(task)
+        now = datetime.utcnow()
+        db.execute(insert(Tombstone), [
+            {
+                "entity_id": task_id,
+                "entity_type": SyncEntity.TASK.value,
+                "user_id": task.user_id,
+                "project_id": task.project_id,
+                "deleted_at": now,
+            }
+            for task_id in task_ids
+        ])
+        db.execute(insert(TaskEvent), [
+            {
+                "user_id": task.user_id,
+                "project_id": task.project_id,
+                "task_id": task_id,
+                "kind": TaskEventKind.DELETED,
+                "from_value": TASK_STATUS_CODES[task_status],
+                "occurred_at": now,
+            }
+            for task_id, task_status in deleted
+        ])
+        # Dependencies on any of these tasks go with them (ON DELETE CASCADE)
+        db.query(Task).filter(
+            Task.user_id == task.user_id,
+            Task.id.in_(task_ids)
+        ).delete(synchronize_session=False)
         db.commit()
         
         return {"message": "Task deleted successfully"}
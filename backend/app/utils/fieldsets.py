@@ -0,0 +1,37 @@
+import enum
+from typing import Any, Iterable, List, Optional
+from uuid import UUID
+from datetime import datetime
+from fastapi import HTTPException, status
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields=` query parameter.
+    Returns None when no narrowing was requested; otherwise the requested
+    field names in order, always starting with `id`.
+    """
+    if not fields:
+        return None
+    
+    allowed = set(allowed)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    
+    return ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
+
+
+def serialize_value(value: Any) -> Any:
+    """Convert a column value to the representation used in API responses."""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
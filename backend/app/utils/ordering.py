@@ -0,0 +1,113 @@
+"""
+Fractional order keys for manual (kanban) ordering.
+
+A key is a base-62 fraction written as a string of DIGITS, compared byte by
+byte (so the column needs a binary "C" collation). A key never ends in "0",
+which guarantees there is always room for another key between any two
+distinct keys: moving an item only rewrites that item's key.
+"""
+from typing import Iterator, List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+_INDEX = {digit: index for index, digit in enumerate(DIGITS)}
+
+# Middle digit: the first key, and the terminator of keys built from counters
+_MIDDLE = DIGITS[BASE // 2]
+
+
+def is_valid_key(key: str) -> bool:
+    """Whether `key` is a well-formed order key."""
+    return bool(key) and not key.endswith(DIGITS[0]) and all(digit in _INDEX for digit in key)
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Shortest key strictly between fractions `a` and `b` (None means 1)."""
+    if b is not None:
+        # Skip the shared prefix; a is padded with zeros
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    
+    digit_a = _INDEX[a[0]] if a else 0
+    digit_b = _INDEX[b[0]] if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # Adjacent first digits
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment(a: str) -> str:
+    """
+    Next key after `a`, stepping by one digit rather than halving, so a
+    run of appends grows the key by one digit per ~60 appends.
+    """
+    if not a:
+        return DIGITS[1]
+    digit = _INDEX[a[0]]
+    if digit < BASE - 1:
+        return DIGITS[digit + 1]
+    return a[0] + _increment(a[1:])
+
+
+def _decrement(b: str) -> str:
+    """Previous key before `b`, mirroring _increment for prepends."""
+    digit = _INDEX[b[0]]
+    if digit > 1:
+        return DIGITS[digit - 1]
+    if digit == 1:
+        return DIGITS[1] if len(b) > 1 else DIGITS[0] + DIGITS[-1]
+    # A key never ends in "0", so there is more after a leading "0"
+    return DIGITS[0] + _decrement(b[1:])
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """
+    Key sorting strictly after `a` and before `b`. Pass None for `a` to get
+    a key before `b`, for `b` to get one after `a`, or both for a first key.
+    """
+    for key in (a, b):
+        if key is not None and not is_valid_key(key):
+            raise ValueError(f"Invalid order key: {key!r}")
+    if a is None and b is None:
+        return _MIDDLE
+    if b is None:
+        return _increment(a)
+    if a is None:
+        return _decrement(b)
+    if a >= b:
+        raise ValueError(f"Order keys out of order: {a!r} >= {b!r}")
+    return _midpoint(a, b)
+
+
+def _encode(number: int, width: int) -> str:
+    digits = []
+    for _ in range(width):
+        number, remainder = divmod(number, BASE)
+        digits.append(DIGITS[remainder])
+    return "".join(reversed(digits))
+
+
+def spread_keys(count: int) -> List[str]:
+    """`count` short keys spread evenly over the whole key space, ascending."""
+    width = 1
+    while BASE ** width <= count:
+        width += 1
+    step = BASE ** width / (count + 1)
+    return [_encode(int(step * (i + 1)), width).rstrip(DIGITS[0]) for i in range(count)]
+
+
+def keys_after(a: Optional[str], width: int = 5) -> Iterator[str]:
+    """
+    Endless ascending keys after `a` that all share one prefix, for bulk
+    appends: each key is the prefix plus a fixed-width counter.
+    """
+    prefix = key_between(a, None)
+    number = 0
+    while True:
+        yield prefix + _encode(number, width) + _MIDDLE
+        number += 1
@@ -0,0 +1,117 @@
+"""
+Replaying a client's queue of operations one request at a time vs. in
+one POST /batch.
+    
+    DATABASE_URL=sqlite:////tmp/taskmanager_bench.db \\
+        python -m benchmarks.bench_batch --operations 50 --rounds 20
+
+Models an offline client reconnecting with a queue of mixed operations:
+it creates tasks, updates and moves some of them, and deletes a few,
+referring to the tasks it created. Each round replays the queue once as
+separate requests and once as a batch, through the full ASGI stack
+(TestClient, no network). Reports operations per second, the time to
+replay a queue, and commits per queue. Writes a fresh user and project
+into the database, so point it at a scratch database.
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.db.session import engine
+from app.main import app
+
+
+def seed(client: TestClient):
+    """Sign up a user and create a project; return (headers, project id)."""
+    response = client.post("/auth/signup", json={
+        "name": "Bench",
+        "email": f"bench-{uuid.uuid4().hex}@example.com",
+        "password": "bench-password"
+    })
+    headers = {"Authorization": f"Bearer {response.json()['accessToken']}"}
+    project_id = client.post("/projects", json={"name": "Bench"}, headers=headers).json()["id"]
+    return headers, project_id
+
+
+def queue(project_id: str, operations: int):
+    """A queue of `operations` operations: creates, then updates, moves and deletes of the created tasks."""
+    creates = operations // 2
+    ops = [
+        {"id": f"t{i}", "method": "POST", "path": f"/projects/{project_id}/tasks", "body": {"title": f"Task {i}"}}
+        for i in range(creates)
+    ]
+    for i in range(operations - creates):
+        task = f"${{t{i % creates}}}"
+        if i % 4 == 3:
+            ops.append({"method": "DELETE", "path": f"/tasks/{task}"})
+        elif i % 4 == 2:
+            ops.append({"method": "POST", "path": f"/tasks/{task}/move", "body": {"status": "in_progress"}})
+        else:
+            ops.append({"method": "PUT", "path": f"/tasks/{task}", "body": {"title": f"Edit {i}"}})
+    # Deleted tasks are not touched again
+    deleted = set()
+    replay = []
+    for op in ops:
+        if any(ref in op["path"] for ref in deleted):
+            continue
+        if op["method"] == "DELETE":
+            deleted.add(op["path"].split("/")[2])
+        replay.append(op)
+    return replay
+
+
+def run_one_by_one(client: TestClient, headers: dict, ops):
+    created = {}
+    for op in ops:
+        path = op["path"]
+        for ref, task_id in created.items():
+            path = path.replace(f"${{{ref}}}", task_id)
+        response = client.request(op["method"], path, json=op.get("body"), headers=headers)
+        if "id" in op:
+            created[op["id"]] = response.json()["id"]
+
+
+def run_batch(client: TestClient, headers: dict, ops):
+    response = client.post("/batch", json={"operations": ops}, headers=headers)
+    assert all(result["status"] == 200 for result in response.json()["results"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=50, help="Operations per queue")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    
+    client = TestClient(app)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    headers, project_id = seed(client)
+    ops = queue(project_id, args.operations)
+    
+    commits = [0]
+    
+    def count_commit(conn):
+        commits[0] += 1
+    event.listen(engine, "commit", count_commit)
+    
+    print(f"\n{len(ops)} operations per queue, {args.rounds} rounds\n")
+    print(f"{'mode':<10} {'ops/s':>8} {'p50 ms':>10} {'max ms':>10} {'commits':>8}")
+    for mode, replay in (("requests", run_one_by_one), ("batch", run_batch)):
+        timings = []
+        commits[0] = 0
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            replay(client, headers, ops)
+            timings.append((time.perf_counter() - started) * 1000)
+        print(
+            f"{mode:<10} {len(ops) * args.rounds / (sum(timings) / 1000):>8.0f} "
+            f"{statistics.median(timings):>10.1f} {max(timings):>10.1f} {commits[0] / args.rounds:>8.0f}",
+            flush=True
+        )
+
+
+if __name__ == "__main__":
+    main()
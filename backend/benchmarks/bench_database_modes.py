@@ -0,0 +1,129 @@
+"""
+Mixed read/write throughput of the service layer against the configured database.
+
+Run it once per database and compare:
+    
+    DATABASE_URL=sqlite:////tmp/taskmanager_bench.db \\
+        python -m benchmarks.bench_database_modes --threads 8 --seconds 20
+    DATABASE_URL=postgresql://localhost/taskmanager_bench \\
+        python -m benchmarks.bench_database_modes --threads 8 --seconds 20
+
+Each thread loops over the same workload the API serves: listing a
+project's board (a read, through the read session as a GET would) or
+creating / updating a task (a write). Reports operations per second and
+p50/p95/p99 latency per operation. Writes a fresh user and project into
+the database, so point it at a scratch database.
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+import uuid
+
+from app.db.base import Base
+from app.db.models import TaskStatus, User
+from app.db.session import ReadSessionLocal, SessionLocal, engine
+from app.schemas.project import ProjectCreate
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService
+
+STATUSES = list(TaskStatus)
+
+
+def seed(tasks: int):
+    """Create a user and project holding `tasks` tasks; return their ids."""
+    db = SessionLocal()
+    try:
+        user = User(name="Bench", email=f"bench-{uuid.uuid4().hex}@example.com", password_hash="-")
+        db.add(user)
+        db.flush()
+        db.commit()
+        user_id = user.id
+        project_id = ProjectService.create_project(db, user, ProjectCreate(name="Bench")).id
+        
+        task_ids = [
+            TaskService.create_task(db, user, project_id, TaskCreate(title=f"Task {i}")).id
+            for i in range(tasks)
+        ]
+        return user_id, project_id, task_ids
+    finally:
+        db.close()
+
+
+def percentile(samples, fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def worker(user_id, project_id, task_ids, write_ratio: float, deadline: float, timings, lock):
+    local = {"read": [], "create": [], "update": []}
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        roll = rng.random()
+        operation = "read" if roll >= write_ratio else ("create" if roll < write_ratio / 2 else "update")
+        factory = ReadSessionLocal if operation == "read" else SessionLocal
+        started = time.perf_counter()
+        db = factory()
+        try:
+            user = db.get(User, user_id)
+            if operation == "read":
+                TaskService.get_project_tasks(db, user, project_id, sort="position")
+            elif operation == "create":
+                TaskService.create_task(db, user, project_id, TaskCreate(title="Bench task"))
+            else:
+                TaskService.update_task(
+                    db, user, rng.choice(task_ids), TaskUpdate(status=rng.choice(STATUSES))
+                )
+        finally:
+            db.close()
+        local[operation].append((time.perf_counter() - started) * 1000)
+    
+    with lock:
+        for operation, samples in local.items():
+            timings[operation].extend(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--tasks", type=int, default=200, help="Tasks in the benchmark project")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of operations that write")
+    args = parser.parse_args()
+    
+    Base.metadata.create_all(bind=engine)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"Seeding {args.tasks} tasks ...", flush=True)
+    user_id, project_id, task_ids = seed(args.tasks)
+    
+    timings = {"read": [], "create": [], "update": []}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(user_id, project_id, task_ids, args.write_ratio, deadline, timings, lock)
+        )
+        for _ in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    total = sum(len(samples) for samples in timings.values())
+    print(f"\n{args.threads} threads, {args.seconds:.0f}s, {args.write_ratio:.0%} writes: {total / args.seconds:.0f} ops/s\n")
+    print(f"{'operation':<10} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for operation, samples in timings.items():
+        if not samples:
+            continue
+        samples.sort()
+        print(
+            f"{operation:<10} {len(samples) / args.seconds:>8.0f} {statistics.median(samples):>8.2f} "
+            f"{percentile(samples, 0.95):>8.2f} {percentile(samples, 0.99):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Compare the on-disk size of tasks stored with VARCHAR vs. SMALLINT status/priority.
+
+Needs a local PostgreSQL database it may write to:
+    
+    BENCH_DATABASE_URL=postgresql://localhost/taskmanager_bench \\
+        python -m benchmarks.bench_task_enum_storage --rows 2000000
+
+Both tables live in the `bench_enum_storage` schema, hold identical rows and
+carry the same status/priority indexes as production, plus the partial open
+due-date index. Reported sizes are after VACUUM ANALYZE.
+"""
+import argparse
+import os
+import time
+
+from sqlalchemy import create_engine, text
+
+SCHEMA = "bench_enum_storage"
+
+VARIANTS = {
+    "varchar": {
+        "type": "VARCHAR(50)",
+        "status": "(ARRAY['todo', 'in_progress', 'completed', 'blocked'])[1 + g % 4]",
+        "priority": "(ARRAY['low', 'medium', 'high', 'urgent'])[1 + g % 3]",
+        "open": "'completed'",
+    },
+    "smallint": {
+        "type": "SMALLINT",
+        "status": "g % 4",
+        "priority": "g % 3",
+        "open": "2",
+    },
+}
+
+INDEXES = {
+    "status": "CREATE INDEX {name}_status ON {table}(status)",
+    "priority": "CREATE INDEX {name}_priority ON {table}(priority)",
+    "open_due": (
+        "CREATE INDEX {name}_open_due ON {table}(user_id, due_date) "
+        "WHERE status <> {open} AND due_date IS NOT NULL"
+    ),
+}
+
+
+def setup(engine, rows: int):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    
+    for name, variant in VARIANTS.items():
+        table = f"{SCHEMA}.tasks_{name}"
+        print(f"Seeding {rows} rows into {table} ...", flush=True)
+        started = time.monotonic()
+        with engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE {table} (
+                    id UUID PRIMARY KEY,
+                    user_id UUID NOT NULL,
+                    title VARCHAR(255) NOT NULL,
+                    status {variant['type']} NOT NULL,
+                    priority {variant['type']} NOT NULL,
+                    due_date TIMESTAMP,
+                    created_at TIMESTAMP NOT NULL
+                )
+            """))
+            conn.execute(text(f"""
+                INSERT INTO {table}
+                SELECT gen_random_uuid(),
+                       md5((g % 10000)::text)::uuid,
+                       'Task ' || g,
+                       {variant['status']},
+                       {variant['priority']},
+                       CASE WHEN g % 2 = 0 THEN now() + (g % 90) * interval '1 day' END,
+                       now() - g * interval '1 second'
+                FROM generate_series(1, :n) g
+            """), {"n": rows})
+            for statement in INDEXES.values():
+                conn.execute(text(statement.format(name=f"tasks_{name}", table=table, open=variant["open"])))
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"VACUUM ANALYZE {table}"))
+        print(f"Seeded in {time.monotonic() - started:.1f}s", flush=True)
+
+
+def sizes(engine, name: str) -> dict:
+    table = f"{SCHEMA}.tasks_{name}"
+    with engine.connect() as conn:
+        result = {
+            "heap": conn.execute(text("SELECT pg_relation_size(CAST(:t AS regclass))"), {"t": table}).scalar(),
+            "total": conn.execute(text("SELECT pg_total_relation_size(CAST(:t AS regclass))"), {"t": table}).scalar(),
+        }
+        for index in INDEXES:
+            result[index] = conn.execute(
+                text("SELECT pg_relation_size(CAST(:i AS regclass))"),
+                {"i": f"{SCHEMA}.tasks_{name}_{index}"}
+            ).scalar()
+    return result
+
+
+def pretty(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"))
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--skip-setup", action="store_true", help="Reuse tables from a previous run")
+    args = parser.parse_args()
+    
+    if not args.database_url:
+        raise SystemExit("Set BENCH_DATABASE_URL or pass --database-url")
+    
+    engine = create_engine(args.database_url)
+    if not args.skip_setup:
+        setup(engine, args.rows)
+    
+    results = {name: sizes(engine, name) for name in VARIANTS}
+    columns = ["heap", *INDEXES, "total"]
+    print(f"{'variant':<12}" + "".join(f"{column:>14}" for column in columns))
+    for name, result in results.items():
+        print(f"{name:<12}" + "".join(f"{pretty(result[column]):>14}" for column in columns))
+    
+    before, after = results["varchar"], results["smallint"]
+    print(f"{'saved':<12}" + "".join(
+        f"{(1 - after[column] / before[column]) * 100 if before[column] else 0:>13.1f}%"
+        for column in columns
+    ))
+
+
+if __name__ == "__main__":
+    main()
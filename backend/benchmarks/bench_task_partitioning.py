@@ -0,0 +1,176 @@
+"""
+Compare task list latency on a plain vs. a hash-partitioned tasks table.
+
+Needs a local PostgreSQL 13+ database it may write to:
+    
+    BENCH_DATABASE_URL=postgresql://localhost/taskmanager_bench \\
+        python -m benchmarks.bench_task_partitioning --users 20000 --tasks-per-user 500
+
+Both tables live in the `bench_partitioning` schema, hold identical rows
+and carry the same indexes as production. Each sample is the query
+TaskService.get_user_tasks runs for one random user.
+"""
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.db.partitioning import task_partition_ddl
+
+SCHEMA = "bench_partitioning"
+
+COLUMNS = """
+    id UUID NOT NULL,
+    user_id UUID NOT NULL,
+    project_id UUID NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    status SMALLINT NOT NULL DEFAULT 0,
+    priority SMALLINT NOT NULL DEFAULT 1,
+    due_date TIMESTAMP,
+    created_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP NOT NULL
+"""
+
+INDEXES = [
+    "CREATE INDEX ON {table}(user_id)",
+    "CREATE INDEX ON {table}(project_id)",
+    "CREATE INDEX ON {table}(status)",
+    "CREATE INDEX ON {table}(priority)",
+    "CREATE INDEX ON {table}(user_id, updated_at)",
+]
+
+LIST_QUERY = """
+    SELECT id, user_id, project_id, title, description, status, priority,
+           due_date, created_at, updated_at
+    FROM {table}
+    WHERE user_id = :user_id
+    ORDER BY created_at DESC
+"""
+
+
+def setup(engine, users: int, tasks_per_user: int, partitions: int):
+    plain, hashed = f"{SCHEMA}.tasks_plain", f"{SCHEMA}.tasks_hashed"
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"CREATE TABLE {SCHEMA}.users (id UUID PRIMARY KEY)"))
+        conn.execute(text(f"CREATE TABLE {plain} ({COLUMNS}, PRIMARY KEY (id))"))
+        conn.execute(text(
+            f"CREATE TABLE {hashed} ({COLUMNS}, PRIMARY KEY (id, user_id)) PARTITION BY HASH (user_id)"
+        ))
+        for statement in task_partition_ddl(partitions, parent=hashed):
+            conn.execute(text(statement))
+    
+    print(f"Seeding {users} users x {tasks_per_user} tasks ...", flush=True)
+    started = time.monotonic()
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"INSERT INTO {SCHEMA}.users SELECT gen_random_uuid() FROM generate_series(1, :n)"
+        ), {"n": users})
+        conn.execute(text(f"""
+            INSERT INTO {plain}
+            SELECT gen_random_uuid(), u.id, u.id, 'Task ' || g, repeat('x', 200),
+                   g % 4, g % 4,
+                   NULL, now() - g * interval '1 minute', now() - g * interval '1 minute'
+            FROM {SCHEMA}.users u, generate_series(1, :n) g
+        """), {"n": tasks_per_user})
+        conn.execute(text(f"INSERT INTO {hashed} SELECT * FROM {plain}"))
+        for table in (plain, hashed):
+            for statement in INDEXES:
+                conn.execute(text(statement.format(table=table)))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"VACUUM ANALYZE {plain}"))
+        conn.execute(text(f"VACUUM ANALYZE {hashed}"))
+    print(f"Seeded in {time.monotonic() - started:.1f}s", flush=True)
+    return plain, hashed
+
+
+def sample(engine, table: str, user_ids, samples: int, concurrency: int):
+    latencies = []
+    lock = threading.Lock()
+    query = text(LIST_QUERY.format(table=table))
+    
+    def worker(count: int):
+        local = []
+        with engine.connect() as conn:
+            for _ in range(count):
+                user_id = random.choice(user_ids)
+                started = time.perf_counter()
+                conn.execute(query, {"user_id": user_id}).all()
+                local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+    
+    threads = [threading.Thread(target=worker, args=(samples // concurrency,)) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    
+    latencies.sort()
+    
+    def pick(quantile: float) -> float:
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+    
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": statistics.fmean(latencies),
+        "qps": len(latencies) / elapsed,
+    }
+
+
+def relation_size(engine, table: str) -> str:
+    with engine.connect() as conn:
+        return conn.execute(text("""
+            SELECT pg_size_pretty(COALESCE(
+                SUM(pg_total_relation_size(relid)),
+                -- pg_partition_tree has no rows for a table that is not partitioned
+                pg_total_relation_size(CAST(:table AS regclass))
+            ))
+            FROM pg_partition_tree(CAST(:table AS regclass))
+        """), {"table": table}).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-setup", action="store_true", help="Reuse tables from a previous run")
+    args = parser.parse_args()
+    
+    if not args.database_url:
+        raise SystemExit("Set BENCH_DATABASE_URL or pass --database-url")
+    
+    engine = create_engine(args.database_url, pool_size=args.concurrency)
+    plain, hashed = f"{SCHEMA}.tasks_plain", f"{SCHEMA}.tasks_hashed"
+    if not args.skip_setup:
+        plain, hashed = setup(engine, args.users, args.tasks_per_user, args.partitions)
+    
+    with engine.connect() as conn:
+        user_ids = [row[0] for row in conn.execute(text(f"SELECT id FROM {SCHEMA}.users"))]
+    
+    print(f"{'table':<28}{'size':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'qps':>10}")
+    for table in (plain, hashed):
+        sample(engine, table, user_ids, min(1000, args.samples), args.concurrency)  # warm up
+        stats = sample(engine, table, user_ids, args.samples, args.concurrency)
+        print(
+            f"{table:<28}{relation_size(engine, table):>10}"
+            f"{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['p99']:>10.2f}{stats['qps']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Request overhead of span tracing, measured in-process.
+    
+    DATABASE_URL=sqlite:////tmp/taskmanager_bench.db \\
+        python -m benchmarks.bench_tracing_overhead --seconds 10
+
+Serves GET /projects/{id}/tasks through the full ASGI stack (TestClient,
+no network) with tracing off, with the JSONL exporter configured but
+nothing sampled, and with every request sampled. Reports requests per
+second and p50/p99 latency per mode, plus the spans written. Writes a
+fresh user and project into the database, so point it at a scratch
+database.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.core.tracing import JsonlExporter, tracer
+from app.db import tracing
+from app.db.session import engine, read_engine
+from app.main import app
+
+MODES = ["off", "unsampled", "sampled"]
+
+
+def percentile(samples, fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def seed(client: TestClient, tasks: int):
+    """Sign up a user and create a project holding `tasks` tasks; return (headers, project id)."""
+    response = client.post("/auth/signup", json={
+        "name": "Bench",
+        "email": f"bench-{uuid.uuid4().hex}@example.com",
+        "password": "bench-password"
+    })
+    headers = {"Authorization": f"Bearer {response.json()['accessToken']}"}
+    project_id = client.post("/projects", json={"name": "Bench"}, headers=headers).json()["id"]
+    for i in range(tasks):
+        client.post(f"/projects/{project_id}/tasks", json={"title": f"Task {i}"}, headers=headers)
+    return headers, project_id
+
+
+def run(client: TestClient, mode: str, path: str, headers: dict, seconds: float, trace_dir: str):
+    trace_path = os.path.join(trace_dir, f"{mode}.jsonl")
+    tracer.exporter = JsonlExporter(trace_path, max_bytes=0, backup_count=0) if mode != "off" else None
+    tracer.sample_rate = 1.0 if mode == "sampled" else 0.0
+    
+    timings = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        client.get(path, headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+    tracer.shutdown()
+    
+    spans = 0
+    if os.path.exists(trace_path):
+        with open(trace_path) as trace_file:
+            spans = sum(1 for _ in trace_file)
+    
+    timings.sort()
+    print(
+        f"{mode:<10} {len(timings) / seconds:>10.0f} {statistics.median(timings):>8.2f} "
+        f"{percentile(timings, 0.99):>8.2f} {spans:>8}",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each mode")
+    parser.add_argument("--tasks", type=int, default=50, help="Tasks in the listed project")
+    args = parser.parse_args()
+    
+    if not tracer.enabled:
+        # The statement hooks are only installed at startup when an exporter is configured
+        tracing.install(engine)
+        if read_engine is not engine:
+            tracing.install(read_engine)
+    
+    client = TestClient(app)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    headers, project_id = seed(client, args.tasks)
+    path = f"/projects/{project_id}/tasks"
+    
+    print(f"\nGET {path} with {args.tasks} tasks, {args.seconds:.0f}s per mode\n")
+    print(f"{'mode':<10} {'requests/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'spans':>8}")
+    with tempfile.TemporaryDirectory() as trace_dir:
+        for mode in MODES:
+            run(client, mode, path, headers, args.seconds, trace_dir)
+
+
+if __name__ == "__main__":
+    main()
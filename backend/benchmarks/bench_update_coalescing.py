@@ -0,0 +1,155 @@
+"""
+Commits per second of bursts of task updates with and without coalescing.
+    
+    DATABASE_URL=sqlite:////tmp/taskmanager_bench.db \\
+        python -m benchmarks.bench_update_coalescing --threads 8 --seconds 10
+
+Models a drag-heavy board: each thread plays a client dragging a task
+around, sending an update to it every `--interval-ms` (alternating the
+status and the title, as a drag plus an inline edit would), and
+`--clients-per-task` threads share each task. Runs the workload once per
+mode (off, sync, ack) through the service layer and reports requests per
+second, commits per second and p50/p99 request latency. Writes a fresh
+user and project into the database, so point it at a scratch database.
+"""
+import argparse
+import statistics
+import threading
+import time
+import uuid
+
+from sqlalchemy import event
+
+from app.core.coalescer import WriteCoalescer
+from app.db.base import Base
+from app.db.models import TaskStatus, User
+from app.db.session import SessionLocal, engine
+from app.schemas.project import ProjectCreate
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService
+
+STATUSES = list(TaskStatus)
+MODES = ["off", "sync", "ack"]
+
+
+def seed(tasks: int):
+    """Create a user and project holding `tasks` tasks; return their ids."""
+    db = SessionLocal()
+    try:
+        user = User(name="Bench", email=f"bench-{uuid.uuid4().hex}@example.com", password_hash="-")
+        db.add(user)
+        db.flush()
+        db.commit()
+        user_id = user.id
+        project_id = ProjectService.create_project(db, user, ProjectCreate(name="Bench")).id
+        
+        task_ids = [
+            TaskService.create_task(db, user, project_id, TaskCreate(title=f"Task {i}")).id
+            for i in range(tasks)
+        ]
+        return user_id, task_ids
+    finally:
+        db.close()
+
+
+def flush_update(key, fields: dict):
+    user_id, task_id = key
+    db = SessionLocal()
+    try:
+        return TaskService.update_task(db, db.get(User, user_id), str(task_id), TaskUpdate(**fields))
+    finally:
+        db.close()
+
+
+def percentile(samples, fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def worker(mode: str, coalescer: WriteCoalescer, user_id, task_id: str, interval: float, deadline: float, timings, lock):
+    local = []
+    step = 0
+    while time.monotonic() < deadline:
+        step += 1
+        task_data = TaskUpdate(status=STATUSES[step % len(STATUSES)]) if step % 2 else TaskUpdate(title=f"Edit {step}")
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            user = db.get(User, user_id)
+            if mode == "off":
+                TaskService.update_task(db, user, task_id, task_data)
+            else:
+                TaskService.update_task_coalesced(
+                    db, user, task_id, task_data, coalescer, acknowledge=mode == "ack"
+                )
+        finally:
+            db.close()
+        local.append((time.perf_counter() - started) * 1000)
+        time.sleep(interval)
+    
+    with lock:
+        timings.extend(local)
+
+
+def run(mode: str, args, user_id, task_ids, commits):
+    coalescer = WriteCoalescer(args.window_ms / 1000, flush_update)
+    timings = []
+    lock = threading.Lock()
+    commits[0] = 0
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(
+                mode, coalescer, user_id, task_ids[i // args.clients_per_task],
+                args.interval_ms / 1000, deadline, timings, lock
+            )
+        )
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    coalescer.close()
+    
+    timings.sort()
+    print(
+        f"{mode:<6} {len(timings) / args.seconds:>10.0f} {commits[0] / args.seconds:>10.0f} "
+        f"{statistics.median(timings):>8.2f} {percentile(timings, 0.99):>8.2f}",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--clients-per-task", type=int, default=4, help="Threads updating the same task")
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="Pause between a client's updates")
+    parser.add_argument("--window-ms", type=float, default=50.0, help="Coalescing window")
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated modes to run")
+    args = parser.parse_args()
+    
+    Base.metadata.create_all(bind=engine)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    tasks = -(-args.threads // args.clients_per_task)
+    user_id, task_ids = seed(tasks)
+    
+    commits = [0]
+    
+    def count_commit(conn):
+        commits[0] += 1
+    event.listen(engine, "commit", count_commit)
+    
+    print(
+        f"\n{args.threads} threads on {tasks} tasks, an update every {args.interval_ms:g} ms per thread, "
+        f"{args.window_ms:g} ms window, {args.seconds:.0f}s per mode\n"
+    )
+    print(f"{'mode':<6} {'requests/s':>10} {'commits/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in args.modes.split(","):
+        run(mode, args, user_id, task_ids, commits)
+
+
+if __name__ == "__main__":
+    main()
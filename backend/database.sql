@@ -5,7 +5,14 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
 -- Drop existing tables (if recreating)
+DROP TABLE IF EXISTS rollup_watermarks CASCADE;
+DROP TABLE IF EXISTS task_daily_stats CASCADE;
+DROP TABLE IF EXISTS task_events CASCADE;
+DROP TABLE IF EXISTS tombstones CASCADE;
+DROP TABLE IF EXISTS task_dependencies CASCADE;
+DROP TABLE IF EXISTS tasks_archive CASCADE;
 DROP TABLE IF EXISTS tasks CASCADE;
+DROP TABLE IF EXISTS project_members CASCADE;
 DROP TABLE IF EXISTS projects CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 
@@ -15,6 +22,8 @@ CREATE TABLE users (
     name VARCHAR(255) NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash TEXT NOT NULL,
+    -- Bumped on every membership change; invalidates cached permissions
+    permissions_version INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -28,24 +37,47 @@ CREATE TABLE projects (
     name VARCHAR(255) NOT NULL,
     description TEXT,
     color VARCHAR(50) NOT NULL DEFAULT '#3B82F6',
-    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create index on user_id for project queries
 CREATE INDEX idx_projects_user_id ON projects(user_id);
+CREATE INDEX idx_projects_user_updated_at ON projects(user_id, updated_at);
+
+-- Project sharing: role 0 viewer, 1 editor, 2 owner. The owner
+-- (projects.user_id) has a row too, so access checks read this table only.
+CREATE TABLE project_members (
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    role SMALLINT NOT NULL CONSTRAINT chk_project_member_role CHECK (role IN (0, 1, 2)),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (project_id, user_id)
+);
+
+CREATE INDEX idx_project_members_user_project_role ON project_members(user_id, project_id, role);
 
 -- Tasks table
+-- user_id is the owner of the task's project, whoever created the task.
+-- Large deployments can hash-partition this table by user_id:
+-- see scripts/partition_tasks.py and TASKS_PARTITION_COUNT.
 CREATE TABLE tasks (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    -- Parent of a subtask; not a foreign key so the table can be partitioned
+    parent_id UUID,
     title VARCHAR(255) NOT NULL,
     description TEXT,
-    status VARCHAR(50) NOT NULL DEFAULT 'todo',
-    priority VARCHAR(50) NOT NULL DEFAULT 'medium',
+    status SMALLINT NOT NULL DEFAULT 0,
+    priority SMALLINT NOT NULL DEFAULT 1,
     due_date TIMESTAMP,
+    -- Fractional position within the (project, status) column; compared bytewise
+    order_key VARCHAR(255) COLLATE "C" NOT NULL,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- Target of the task_dependencies foreign keys
+    CONSTRAINT uq_tasks_id_user_id UNIQUE (id, user_id)
 );
 
 -- Create indexes for task queries
@@ -53,14 +85,24 @@ CREATE INDEX idx_tasks_user_id ON tasks(user_id);
 CREATE INDEX idx_tasks_project_id ON tasks(project_id);
 CREATE INDEX idx_tasks_status ON tasks(status);
 CREATE INDEX idx_tasks_priority ON tasks(priority);
+CREATE INDEX idx_tasks_project_updated_at ON tasks(project_id, updated_at);
+CREATE INDEX idx_tasks_project_created_at ON tasks(project_id, created_at);
+CREATE INDEX idx_tasks_project_due_date ON tasks(project_id, due_date);
+CREATE INDEX idx_tasks_project_status_order_key ON tasks(project_id, status, order_key);
+CREATE INDEX idx_tasks_parent_id ON tasks(parent_id);
+CREATE INDEX idx_tasks_project_open_due_date ON tasks(project_id, due_date)
+    WHERE status <> 2 AND due_date IS NOT NULL;
+
+-- Status and priority are stored as compact codes (see TASK_STATUS_CODES
+-- and TASK_PRIORITY_CODES in app/db/models.py)
 
--- Add constraints for status enum
+-- Add constraints for status enum: 0 todo, 1 in_progress, 2 completed, 3 blocked
 ALTER TABLE tasks ADD CONSTRAINT chk_task_status 
-    CHECK (status IN ('todo', 'in_progress', 'completed', 'blocked'));
+    CHECK (status IN (0, 1, 2, 3));
 
--- Add constraints for priority enum
+-- Add constraints for priority enum: 0 low, 1 medium, 2 high, 3 urgent
 ALTER TABLE tasks ADD CONSTRAINT chk_task_priority 
-    CHECK (priority IN ('low', 'medium', 'high', 'urgent'));
+    CHECK (priority IN (0, 1, 2, 3));
 
 -- Create trigger function for updating updated_at
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -77,6 +119,96 @@ CREATE TRIGGER update_tasks_updated_at
     FOR EACH ROW 
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Create trigger for projects table
+CREATE TRIGGER update_projects_updated_at 
+    BEFORE UPDATE ON projects 
+    FOR EACH ROW 
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Archive of completed tasks moved out of the hot tasks table
+CREATE TABLE tasks_archive (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    parent_id UUID,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    status SMALLINT NOT NULL,
+    priority SMALLINT NOT NULL,
+    due_date TIMESTAMP,
+    order_key VARCHAR(255) COLLATE "C" NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_tasks_archive_user_id ON tasks_archive(user_id);
+CREATE INDEX idx_tasks_archive_project_id ON tasks_archive(project_id);
+
+-- "Blocked by" edges between tasks of the same project; the
+-- application rejects edges that would close a cycle
+CREATE TABLE task_dependencies (
+    task_id UUID NOT NULL,
+    depends_on_id UUID NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (task_id, depends_on_id),
+    CONSTRAINT fk_task_dependencies_task FOREIGN KEY (task_id, user_id)
+        REFERENCES tasks(id, user_id) ON DELETE CASCADE,
+    CONSTRAINT fk_task_dependencies_depends_on FOREIGN KEY (depends_on_id, user_id)
+        REFERENCES tasks(id, user_id) ON DELETE CASCADE,
+    CONSTRAINT chk_task_dependency_not_self CHECK (task_id <> depends_on_id)
+);
+
+CREATE INDEX idx_task_dependencies_depends_on_id ON task_dependencies(depends_on_id);
+
+-- Append-only history of task writes. kind: 0 created, 1 status_changed,
+-- 2 priority_changed, 3 deleted; from/to hold status (or priority) codes
+CREATE TABLE task_events (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    task_id UUID NOT NULL,
+    kind SMALLINT NOT NULL CONSTRAINT chk_task_event_kind CHECK (kind IN (0, 1, 2, 3)),
+    from_value SMALLINT,
+    to_value SMALLINT,
+    occurred_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_task_events_occurred_at ON task_events(occurred_at);
+CREATE INDEX idx_task_events_task_id_occurred_at ON task_events(task_id, occurred_at);
+
+-- Daily rollups of task_events read by /analytics (scripts/rollup_task_events.py)
+CREATE TABLE task_daily_stats (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    created INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    in_progress_count INTEGER NOT NULL DEFAULT 0,
+    in_progress_seconds BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, project_id)
+);
+
+CREATE TABLE rollup_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    rolled_up_to TIMESTAMP NOT NULL
+);
+
+-- Tombstones for deleted projects and tasks (used by delta sync)
+CREATE TABLE tombstones (
+    entity_id UUID PRIMARY KEY,
+    entity_type VARCHAR(20) NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    -- Project of the deleted entity, for members of shared projects
+    project_id UUID,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_tombstones_user_deleted_at ON tombstones(user_id, deleted_at);
+CREATE INDEX idx_tombstones_project_deleted_at ON tombstones(project_id, deleted_at);
+
 -- Verification queries
 -- SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';
 -- SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'tasks';
@@ -0,0 +1,26 @@
+-- Delta sync: projects.updated_at, updated_at indexes and tombstones
+-- Apply to databases created from an earlier database.sql with psql
+-- (outside a transaction block, CONCURRENTLY index builds require it)
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+UPDATE projects SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE projects ALTER COLUMN updated_at SET DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE projects ALTER COLUMN updated_at SET NOT NULL;
+
+DROP TRIGGER IF EXISTS update_projects_updated_at ON projects;
+CREATE TRIGGER update_projects_updated_at 
+    BEFORE UPDATE ON projects 
+    FOR EACH ROW 
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_user_updated_at ON projects(user_id, updated_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_user_updated_at ON tasks(user_id, updated_at);
+
+CREATE TABLE IF NOT EXISTS tombstones (
+    entity_id UUID PRIMARY KEY,
+    entity_type VARCHAR(20) NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tombstones_user_deleted_at ON tombstones(user_id, deleted_at);
@@ -0,0 +1,19 @@
+-- Hot/cold archival: table for completed tasks moved out of tasks
+-- Populated by scripts/archive_tasks.py
+
+CREATE TABLE IF NOT EXISTS tasks_archive (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    status VARCHAR(50) NOT NULL,
+    priority VARCHAR(50) NOT NULL,
+    due_date TIMESTAMP,
+    created_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_archive_user_id ON tasks_archive(user_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_archive_project_id ON tasks_archive(project_id);
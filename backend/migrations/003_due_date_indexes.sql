@@ -0,0 +1,8 @@
+-- Due-date calendar and overdue queries
+-- Run with psql outside a transaction block (CONCURRENTLY index builds).
+-- PostgreSQL cannot build indexes CONCURRENTLY on a partitioned table;
+-- drop that keyword if tasks is partitioned.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_user_due_date ON tasks(user_id, due_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_user_open_due_date ON tasks(user_id, due_date)
+    WHERE status <> 'completed' AND due_date IS NOT NULL;
@@ -0,0 +1,54 @@
+-- Store task status and priority as SMALLINT codes instead of VARCHAR(50)
+--   status:   0 todo, 1 in_progress, 2 completed, 3 blocked
+--   priority: 0 low, 1 medium, 2 high, 3 urgent
+-- ALTER COLUMN ... TYPE rewrites the table and its indexes under an
+-- ACCESS EXCLUSIVE lock; run it in a maintenance window.
+
+BEGIN;
+
+ALTER TABLE tasks DROP CONSTRAINT IF EXISTS chk_task_status;
+ALTER TABLE tasks DROP CONSTRAINT IF EXISTS chk_task_priority;
+-- The partial index predicate compares against the old text value
+DROP INDEX IF EXISTS idx_tasks_user_open_due_date;
+
+ALTER TABLE tasks
+    ALTER COLUMN status DROP DEFAULT,
+    ALTER COLUMN priority DROP DEFAULT,
+    ALTER COLUMN status TYPE SMALLINT USING CASE status
+        WHEN 'todo' THEN 0
+        WHEN 'in_progress' THEN 1
+        WHEN 'completed' THEN 2
+        WHEN 'blocked' THEN 3
+    END,
+    ALTER COLUMN priority TYPE SMALLINT USING CASE priority
+        WHEN 'low' THEN 0
+        WHEN 'medium' THEN 1
+        WHEN 'high' THEN 2
+        WHEN 'urgent' THEN 3
+    END,
+    ALTER COLUMN status SET DEFAULT 0,
+    ALTER COLUMN priority SET DEFAULT 1;
+
+ALTER TABLE tasks ADD CONSTRAINT chk_task_status CHECK (status IN (0, 1, 2, 3));
+ALTER TABLE tasks ADD CONSTRAINT chk_task_priority CHECK (priority IN (0, 1, 2, 3));
+
+CREATE INDEX idx_tasks_user_open_due_date ON tasks(user_id, due_date)
+    WHERE status <> 2 AND due_date IS NOT NULL;
+
+ALTER TABLE tasks_archive
+    ALTER COLUMN status TYPE SMALLINT USING CASE status
+        WHEN 'todo' THEN 0
+        WHEN 'in_progress' THEN 1
+        WHEN 'completed' THEN 2
+        WHEN 'blocked' THEN 3
+    END,
+    ALTER COLUMN priority TYPE SMALLINT USING CASE priority
+        WHEN 'low' THEN 0
+        WHEN 'medium' THEN 1
+        WHEN 'high' THEN 2
+        WHEN 'urgent' THEN 3
+    END;
+
+COMMIT;
+
+ANALYZE tasks;
@@ -0,0 +1,34 @@
+-- Manual task ordering with fractional order keys (app/utils/ordering.py)
+-- Existing tasks get keys in creation order within each (project, status)
+-- column: a zero-padded row number plus a trailing "V", which is a valid key.
+-- `python -m scripts.rebalance_order_keys` shortens them afterwards.
+-- Run with psql outside a transaction block (CONCURRENTLY index build).
+-- PostgreSQL cannot build indexes CONCURRENTLY on a partitioned table;
+-- drop that keyword if tasks is partitioned.
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS order_key VARCHAR(255) COLLATE "C";
+
+UPDATE tasks t
+SET order_key = lpad(o.position::text, 10, '0') || 'V'
+FROM (
+    SELECT id, user_id, row_number() OVER (PARTITION BY project_id, status ORDER BY created_at, id) AS position
+    FROM tasks
+) o
+WHERE t.id = o.id AND t.user_id = o.user_id AND t.order_key IS NULL;
+
+ALTER TABLE tasks ALTER COLUMN order_key SET NOT NULL;
+
+ALTER TABLE tasks_archive ADD COLUMN IF NOT EXISTS order_key VARCHAR(255) COLLATE "C";
+
+UPDATE tasks_archive t
+SET order_key = lpad(o.position::text, 10, '0') || 'V'
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY project_id, status ORDER BY created_at, id) AS position
+    FROM tasks_archive
+) o
+WHERE t.id = o.id AND t.order_key IS NULL;
+
+ALTER TABLE tasks_archive ALTER COLUMN order_key SET NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_project_status_order_key
+    ON tasks(project_id, status, order_key);
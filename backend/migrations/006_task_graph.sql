@@ -0,0 +1,29 @@
+-- Subtasks (tasks.parent_id) and "blocked by" dependencies (task_dependencies)
+-- Run with psql outside a transaction block (CONCURRENTLY index builds).
+-- PostgreSQL cannot build indexes CONCURRENTLY on a partitioned table;
+-- drop that keyword if tasks is partitioned. A partitioned tasks table
+-- already has the (id, user_id) primary key, so skip the unique constraint.
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS parent_id UUID;
+ALTER TABLE tasks_archive ADD COLUMN IF NOT EXISTS parent_id UUID;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_parent_id ON tasks(parent_id);
+
+-- Build the index first so adding the constraint does not lock tasks for a full build
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_tasks_id_user_id ON tasks(id, user_id);
+ALTER TABLE tasks ADD CONSTRAINT uq_tasks_id_user_id UNIQUE USING INDEX uq_tasks_id_user_id;
+
+CREATE TABLE IF NOT EXISTS task_dependencies (
+    task_id UUID NOT NULL,
+    depends_on_id UUID NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (task_id, depends_on_id),
+    CONSTRAINT fk_task_dependencies_task FOREIGN KEY (task_id, user_id)
+        REFERENCES tasks(id, user_id) ON DELETE CASCADE,
+    CONSTRAINT fk_task_dependencies_depends_on FOREIGN KEY (depends_on_id, user_id)
+        REFERENCES tasks(id, user_id) ON DELETE CASCADE,
+    CONSTRAINT chk_task_dependency_not_self CHECK (task_id <> depends_on_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_dependencies_depends_on_id ON task_dependencies(depends_on_id);
@@ -0,0 +1,33 @@
+-- Append-only task event log and its daily rollups (/analytics)
+-- History starts when this migration runs; existing tasks have no events.
+
+CREATE TABLE IF NOT EXISTS task_events (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    task_id UUID NOT NULL,
+    kind SMALLINT NOT NULL CONSTRAINT chk_task_event_kind CHECK (kind IN (0, 1, 2, 3)),
+    from_value SMALLINT,
+    to_value SMALLINT,
+    occurred_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_events_occurred_at ON task_events(occurred_at);
+CREATE INDEX IF NOT EXISTS idx_task_events_task_id_occurred_at ON task_events(task_id, occurred_at);
+
+CREATE TABLE IF NOT EXISTS task_daily_stats (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    created INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    in_progress_count INTEGER NOT NULL DEFAULT 0,
+    in_progress_seconds BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, project_id)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    rolled_up_to TIMESTAMP NOT NULL
+);
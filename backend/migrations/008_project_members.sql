@@ -0,0 +1,37 @@
+-- Shared projects: membership roles, permission cache versions, and
+-- project-keyed task indexes for reads across several owners' projects.
+-- Run with psql outside a transaction block (CONCURRENTLY index builds).
+-- PostgreSQL cannot build indexes CONCURRENTLY on a partitioned table;
+-- drop that keyword if tasks is partitioned.
+
+CREATE TABLE IF NOT EXISTS project_members (
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    role SMALLINT NOT NULL CONSTRAINT chk_project_member_role CHECK (role IN (0, 1, 2)),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (project_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_project_members_user_project_role
+    ON project_members(user_id, project_id, role);
+
+-- Every existing project's owner becomes its owner member
+INSERT INTO project_members (project_id, user_id, role, created_at)
+SELECT id, user_id, 2, created_at FROM projects
+ON CONFLICT (project_id, user_id) DO NOTHING;
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS permissions_version INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE tombstones ADD COLUMN IF NOT EXISTS project_id UUID;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tombstones_project_deleted_at ON tombstones(project_id, deleted_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_project_updated_at ON tasks(project_id, updated_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_project_created_at ON tasks(project_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_project_due_date ON tasks(project_id, due_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_project_open_due_date ON tasks(project_id, due_date)
+    WHERE status <> 2 AND due_date IS NOT NULL;
+
+-- Superseded by the project-keyed indexes above
+DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_user_updated_at;
+DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_user_due_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_user_open_due_date;
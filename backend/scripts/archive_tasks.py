@@ -0,0 +1,42 @@
+"""
+Move completed tasks older than N days from `tasks` into `tasks_archive`.
+    
+    python -m scripts.archive_tasks --older-than-days 30 --batch-size 1000
+
+Each batch is its own short transaction, so the job can run alongside
+normal traffic (e.g. nightly from cron). Defaults come from
+ARCHIVE_AFTER_DAYS and ARCHIVE_BATCH_SIZE.
+"""
+import argparse
+import time
+
+from app.db.session import SessionLocal
+from app.services.archive_service import ArchiveService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+    
+    if args.batch_size is not None and args.batch_size < 1:
+        raise SystemExit("--batch-size must be at least 1")
+    
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        total = ArchiveService.archive_completed_tasks(
+            db,
+            older_than_days=args.older_than_days,
+            batch_size=args.batch_size,
+            on_batch=lambda archived: print(f"Archived {archived} tasks", flush=True)
+        )
+    finally:
+        db.close()
+    
+    print(f"Archived {total} tasks in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Pick the strongest password hashing cost that meets a latency target on this host.
+    
+    python -m scripts.calibrate_password_hash --target-ms 250
+    python -m scripts.calibrate_password_hash --scheme argon2 --memory-cost 65536 --parallelism 4
+
+Run it on the hardware the API is deployed to. The cost is raised one step
+at a time; each step is timed as the median of several hashes, and the last
+one at or under the target wins. Prints the settings to put in `.env`;
+existing users are rehashed with the new cost on their next login.
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import argon2, bcrypt
+
+from app.core.config import settings
+from app.core.security import ARGON2_AVAILABLE
+
+PASSWORD = "calibration-password-1234"
+
+# Search bounds: bcrypt's minimum cost, and costs far beyond any sane login budget
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 20
+ARGON2_MAX_TIME_COST = 20
+
+
+def median_ms(handler, samples: int) -> float:
+    handler.hash(PASSWORD)  # warm up
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(candidates, target_ms: float, samples: int):
+    """Return (cost, ms) of the last candidate meeting the target, or None."""
+    best = None
+    for cost, handler in candidates:
+        elapsed = median_ms(handler, samples)
+        print(f"  cost {cost:>2}: {elapsed:8.1f} ms", flush=True)
+        if elapsed > target_ms:
+            break
+        best = (cost, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default=settings.password_hash_scheme)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Per-hash latency budget")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--memory-cost", type=int, default=settings.argon2_memory_cost, help="argon2 memory in KiB")
+    parser.add_argument("--parallelism", type=int, default=settings.argon2_parallelism)
+    args = parser.parse_args()
+    
+    if args.scheme == "bcrypt":
+        print(f"Calibrating bcrypt rounds for {args.target_ms:.0f} ms per hash ...")
+        best = calibrate(
+            ((rounds, bcrypt.using(rounds=rounds)) for rounds in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1)),
+            args.target_ms,
+            args.samples
+        )
+        if best is None:
+            raise SystemExit("Even the minimum bcrypt cost exceeds the target")
+        print(f"\nBest: {best[1]:.1f} ms per hash\n")
+        print("PASSWORD_HASH_SCHEME=bcrypt")
+        print(f"BCRYPT_ROUNDS={best[0]}")
+        return
+    
+    if not ARGON2_AVAILABLE:
+        raise SystemExit("argon2 needs the argon2-cffi package: pip install argon2-cffi")
+    
+    print(
+        f"Calibrating argon2 time cost for {args.target_ms:.0f} ms per hash "
+        f"({args.memory_cost} KiB, parallelism {args.parallelism}) ..."
+    )
+    best = calibrate(
+        (
+            (time_cost, argon2.using(rounds=time_cost, memory_cost=args.memory_cost, parallelism=args.parallelism))
+            for time_cost in range(1, ARGON2_MAX_TIME_COST + 1)
+        ),
+        args.target_ms,
+        args.samples
+    )
+    if best is None:
+        raise SystemExit("Even a time cost of 1 exceeds the target; lower --memory-cost")
+    print(f"\nBest: {best[1]:.1f} ms per hash\n")
+    print("PASSWORD_HASH_SCHEME=argon2")
+    print(f"ARGON2_TIME_COST={best[0]}")
+    print(f"ARGON2_MEMORY_COST={args.memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Online migration of the tasks table to hash partitioning by user_id.
+    
+    python -m scripts.partition_tasks --partitions 16
+
+Steps:
+  1. Create `tasks_partitioned` with the same columns, constraints and
+     indexes as `tasks`, partitioned by HASH (user_id).
+  2. Install a trigger that mirrors every write on `tasks` into it.
+  3. Backfill existing rows in bounded batches, one short transaction each.
+  4. Remove rows a concurrent delete (or change of user_id) may have
+     raced past the backfill.
+  5. Swap the tables in one short transaction holding an exclusive lock.
+     Foreign keys referencing tasks (id, user_id), such as those of
+     task_dependencies, are re-pointed at the new table as NOT VALID and
+     validated afterwards without blocking writes.
+
+The old table is kept as `tasks_unpartitioned` unless --drop-old is given.
+Set TASKS_PARTITION_COUNT to the same value afterwards so newly created
+databases match.
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db.partitioning import task_partition_ddl, task_partition_name
+
+NEW_TABLE = "tasks_partitioned"
+OLD_TABLE = "tasks_unpartitioned"
+MIRROR_FUNCTION = "tasks_partition_mirror"
+
+# The mirror is an upsert so that it cannot fail on a row a backfill batch
+# has copied but not committed yet: the trigger's DELETE does not see that
+# row, and its INSERT waits on the primary key until the batch commits. It
+# then updates the copy with NEW instead of raising a unique violation.
+# Either order against BACKFILL_BATCH keeps the newest version: the
+# backfill's ON CONFLICT DO NOTHING never overwrites a row the trigger has
+# written, and the trigger overwrites whatever the backfill copied. Rows
+# are only deleted for a DELETE or a change of user_id, the partition key.
+MIRROR_DDL = """
+CREATE OR REPLACE FUNCTION {function}()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id) THEN
+        DELETE FROM {table} WHERE id = OLD.id AND user_id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO {table} SELECT (NEW).*
+        ON CONFLICT (id, user_id) DO UPDATE SET {assignments};
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS {function} ON tasks;
+CREATE TRIGGER {function}
+    AFTER INSERT OR UPDATE OR DELETE ON tasks
+    FOR EACH ROW
+    EXECUTE FUNCTION {function}();
+"""
+
+BACKFILL_BATCH = f"""
+WITH batch AS (
+    SELECT * FROM tasks WHERE id > :after ORDER BY id LIMIT :limit
+), copied AS (
+    INSERT INTO {NEW_TABLE} SELECT * FROM batch ON CONFLICT DO NOTHING
+)
+SELECT id FROM batch ORDER BY id DESC LIMIT 1
+"""
+
+RECONCILE_BATCH = f"""
+WITH batch AS (
+    SELECT id, user_id FROM {NEW_TABLE} WHERE id > :after ORDER BY id LIMIT :limit
+), stale AS (
+    DELETE FROM {NEW_TABLE} p USING batch b
+    WHERE p.id = b.id AND p.user_id = b.user_id
+      AND NOT EXISTS (SELECT 1 FROM tasks t WHERE t.id = b.id AND t.user_id = b.user_id)
+)
+SELECT id FROM batch ORDER BY id DESC LIMIT 1
+"""
+
+MIN_UUID = "00000000-0000-0000-0000-000000000000"
+
+# Unique (id, user_id) target of foreign keys on an unpartitioned tasks
+# table; the partitioned primary key takes over that role
+ID_USER_ID_CONSTRAINT = "uq_tasks_id_user_id"
+
+
+def log(message: str):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+def task_indexes(conn):
+    """Secondary index definitions of `tasks` (everything except the primary key)."""
+    return conn.execute(text("""
+        SELECT i.relname, pg_get_indexdef(x.indexrelid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = 'tasks'::regclass AND NOT x.indisprimary AND i.relname <> :skip
+    """), {"skip": ID_USER_ID_CONSTRAINT}).all()
+
+
+def mirror_ddl(conn) -> str:
+    """MIRROR_DDL for the current columns of `tasks`; the upsert sets every column but the key."""
+    columns = conn.execute(text("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = 'tasks'::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+    """)).scalars().all()
+    assignments = ", ".join(
+        f"{column} = EXCLUDED.{column}" for column in columns if column not in ("id", "user_id")
+    )
+    return MIRROR_DDL.format(function=MIRROR_FUNCTION, table=NEW_TABLE, assignments=assignments)
+
+
+def referencing_foreign_keys(conn):
+    """(name, table, definition, referenced columns) of every foreign key referencing `tasks`."""
+    return conn.execute(text("""
+        SELECT c.conname, c.conrelid::regclass::text, pg_get_constraintdef(c.oid),
+               array(
+                   SELECT a.attname FROM pg_attribute a
+                   WHERE a.attrelid = c.confrelid AND a.attnum = ANY(c.confkey)
+                   ORDER BY a.attname
+               )
+        FROM pg_constraint c
+        WHERE c.confrelid = 'tasks'::regclass AND c.contype = 'f'
+    """)).all()
+
+
+def check_preconditions(conn):
+    partitioned = conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'tasks'::regclass"
+    )).first()
+    if partitioned:
+        raise SystemExit("tasks is already partitioned")
+    
+    # Keys on (id, user_id) can be re-pointed; keys on id alone have no
+    # unique target on a table partitioned by user_id
+    referencing = [
+        (name, table) for name, table, _, columns in referencing_foreign_keys(conn)
+        if sorted(columns) != ["id", "user_id"]
+    ]
+    if referencing:
+        names = ", ".join(f"{table}.{name}" for name, table in referencing)
+        raise SystemExit(
+            f"Foreign keys reference tasks(id) ({names}); they must reference "
+            f"(id, user_id) before tasks can be partitioned"
+        )
+
+
+def create_partitioned_table(conn, partitions: int):
+    log(f"Creating {NEW_TABLE} with {partitions} hash partitions")
+    conn.execute(text(
+        f"CREATE TABLE {NEW_TABLE} (LIKE tasks INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY HASH (user_id)"
+    ))
+    conn.execute(text(f"ALTER TABLE {NEW_TABLE} ADD PRIMARY KEY (id, user_id)"))
+    conn.execute(text(
+        f"ALTER TABLE {NEW_TABLE} ADD FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE"
+    ))
+    conn.execute(text(
+        f"ALTER TABLE {NEW_TABLE} ADD FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE"
+    ))
+    for statement in task_partition_ddl(partitions, parent=NEW_TABLE):
+        conn.execute(text(statement))
+    
+    for name, definition in task_indexes(conn):
+        definition = definition.replace(f"INDEX {name} ON", f"INDEX {name}_p ON", 1)
+        definition = definition.replace(" ON public.tasks ", f" ON public.{NEW_TABLE} ", 1)
+        definition = definition.replace(" ON tasks ", f" ON {NEW_TABLE} ", 1)
+        conn.execute(text(definition))
+
+
+def run_batches(engine, statement: str, batch_size: int, label: str):
+    after, total, started = MIN_UUID, 0, time.monotonic()
+    while True:
+        with engine.begin() as conn:
+            last = conn.execute(text(statement), {"after": after, "limit": batch_size}).scalar()
+        if last is None:
+            break
+        after = str(last)
+        total += batch_size
+        log(f"{label}: ~{total} rows scanned ({total / (time.monotonic() - started):.0f} rows/s)")
+
+
+def swap_tables(conn, partitions: int, drop_old: bool):
+    log("Swapping tables")
+    conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    conn.execute(text("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f"DROP TRIGGER {MIRROR_FUNCTION} ON tasks"))
+    
+    index_names = [name for name, _ in task_indexes(conn)]
+    foreign_keys = referencing_foreign_keys(conn)
+    conn.execute(text(f"ALTER TABLE tasks RENAME TO {OLD_TABLE}"))
+    conn.execute(text(f"ALTER TABLE {NEW_TABLE} RENAME TO tasks"))
+    conn.execute(text(f"ALTER INDEX tasks_pkey RENAME TO {OLD_TABLE}_pkey"))
+    conn.execute(text(f"ALTER INDEX {NEW_TABLE}_pkey RENAME TO tasks_pkey"))
+    for name in index_names:
+        conn.execute(text(f"ALTER INDEX {name} RENAME TO {name}_old"))
+        conn.execute(text(f"ALTER INDEX {name}_p RENAME TO {name}"))
+    for remainder in range(partitions):
+        conn.execute(text(
+            f"ALTER TABLE {task_partition_name(remainder, NEW_TABLE)} "
+            f"RENAME TO {task_partition_name(remainder)}"
+        ))
+    
+    # The definitions were read before the rename, so "REFERENCES tasks"
+    # now names the new table. NOT VALID skips the scan under this lock.
+    for name, table, definition, _ in foreign_keys:
+        conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {name}"))
+        conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition} NOT VALID"))
+    
+    conn.execute(text(f"DROP TRIGGER IF EXISTS update_tasks_updated_at ON {OLD_TABLE}"))
+    conn.execute(text(
+        "CREATE TRIGGER update_tasks_updated_at BEFORE UPDATE ON tasks "
+        "FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+    ))
+    if drop_old:
+        conn.execute(text(f"DROP TABLE {OLD_TABLE}"))
+    return [(name, table) for name, table, _, _ in foreign_keys]
+
+
+def validate_foreign_keys(engine, foreign_keys):
+    """Check existing rows against the re-pointed keys; this lock does not block writes."""
+    for name, table in foreign_keys:
+        log(f"Validating {table}.{name}")
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partitions", type=int, required=True, help="Number of hash partitions")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows copied per transaction")
+    parser.add_argument("--drop-old", action="store_true", help="Drop the unpartitioned table after the swap")
+    args = parser.parse_args()
+    
+    if args.partitions < 2:
+        raise SystemExit("--partitions must be at least 2")
+    
+    engine = create_engine(settings.database_url)
+    with engine.begin() as conn:
+        check_preconditions(conn)
+        create_partitioned_table(conn, args.partitions)
+        conn.execute(text(mirror_ddl(conn)))
+    log("Mirror trigger installed; new writes now reach both tables")
+    
+    run_batches(engine, BACKFILL_BATCH, args.batch_size, "Backfill")
+    run_batches(engine, RECONCILE_BATCH, args.batch_size, "Reconcile")
+    
+    with engine.begin() as conn:
+        foreign_keys = swap_tables(conn, args.partitions, args.drop_old)
+        conn.execute(text(f"DROP FUNCTION {MIRROR_FUNCTION}()"))
+    validate_foreign_keys(engine, foreign_keys)
+    
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE tasks"))
+    log(f"Done. Set TASKS_PARTITION_COUNT={args.partitions} in the environment.")
+
+
+if __name__ == "__main__":
+    main()
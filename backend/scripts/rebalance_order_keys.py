@@ -0,0 +1,36 @@
+"""
+Shorten task order keys that have grown long.
+    
+    python -m scripts.rebalance_order_keys --max-length 32
+
+Keys grow when tasks keep being dropped into the same gap on a board.
+Every (project, status) column holding a key longer than --max-length
+(default ORDER_KEY_REBALANCE_LENGTH) gets short, evenly spread keys in
+the same order, one short transaction per column. Moves already trigger
+this for their own column in the background; run the script from cron
+to catch the rest, e.g. columns filled by bulk imports.
+"""
+import argparse
+import time
+
+from app.db.session import SessionLocal
+from app.services.task_service import TaskService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-length", type=int, default=None)
+    args = parser.parse_args()
+    
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        total = TaskService.rebalance_long_keys(db, args.max_length)
+    finally:
+        db.close()
+    
+    print(f"Rebalanced {total} columns in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
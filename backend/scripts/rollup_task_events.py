@@ -0,0 +1,40 @@
+"""
+Fold task_events into the task_daily_stats rollups read by /analytics.
+    
+    python -m scripts.rollup_task_events
+    python -m scripts.rollup_task_events --since 2024-01-01
+
+Run it from cron (e.g. every 15 minutes). Each run recomputes whole days,
+from ANALYTICS_ROLLUP_LOOKBACK_DAYS before the previous run onwards, in a
+single transaction, so it is idempotent and picks up late commits. The
+first run, or one with --since, rebuilds from that point (or from the
+first event).
+"""
+import argparse
+import time
+from datetime import datetime
+
+from app.db.session import SessionLocal
+from app.services.analytics_service import AnalyticsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="Recompute from this day")
+    args = parser.parse_args()
+    
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        start_day, written = AnalyticsService.rollup(db, since=args.since)
+    finally:
+        db.close()
+    
+    print(
+        f"Rolled up task events from {start_day or 'the first event'}: "
+        f"{written} daily rows in {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()